@@ -0,0 +1,142 @@
+"""
+run the benchmarks and store the results per version, so regressions between
+versions show up: python -m benchmarks [--quick] [--compare RESULTS]
+"""
+
+import argparse
+import configparser
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from fnmatch import fnmatch
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SETUP_CFG = os.path.join(os.path.dirname(__file__), os.pardir, "setup.cfg")
+
+
+def get_version() -> str:
+    """version of the checked out package"""
+    config = configparser.ConfigParser()
+    config.read(SETUP_CFG)
+    return config.get("metadata", "version", fallback="unknown")
+
+
+def measure(run, rounds: int) -> dict:
+    run()  # warm up connections and caches
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "rounds": rounds,
+    }
+
+
+def run_benchmarks(args) -> dict:
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    from .cases import CASES
+
+    setup_test_environment()
+    databases = setup_databases(verbosity=0, interactive=False)
+    results = {}
+    try:
+        for name, func, params, quick_params in CASES:
+            for param in quick_params if args.quick else params:
+                key = f"{name}[{param}]"
+                if args.filter and not fnmatch(key, args.filter):
+                    continue
+                with ExitStack() as stack:
+                    results[key] = measure(func(stack, param), args.rounds)
+                print(f"{key:45} {results[key]['median'] * 1000:10.2f} ms")
+    finally:
+        teardown_databases(databases, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """print the change of the medians; return the regressed benchmarks"""
+    regressions = []
+    print(f"\ncompared to {baseline['version']} ({baseline['created']}):")
+    for key, result in results.items():
+        before = baseline["results"].get(key)
+        if before is None:
+            continue
+        change = result["median"] / before["median"] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(key)
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{key:45} {change * 100:+8.1f} %{marker}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--quick", action="store_true", help="only the small sizes")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--filter", help="only run benchmarks matching the pattern")
+    parser.add_argument("--compare", help="results file to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown of the median reported as a regression",
+    )
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const="",
+        help="store the results, by default as results/<version>.json",
+    )
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testapp.settings")
+    import django
+
+    django.setup()
+    package_version = get_version()
+    results = run_benchmarks(args)
+    report = {
+        "version": package_version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "quick": args.quick,
+        "results": results,
+    }
+
+    if args.save is not None:
+        path = args.save or os.path.join(RESULTS_DIR, f"{package_version}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nresults stored in {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+benchmark cases; each case returns the function that is timed, after doing
+its setup outside of the timing
+"""
+
+import json
+from contextlib import ExitStack
+
+from django.urls import reverse
+
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.files import ExportPayload
+from sharing_configs.models import SharingConfigsConfig
+from sharing_configs.utils import FolderList, get_str_from_encoded64_object
+
+CASES = []
+
+MB = 1024 * 1024
+
+
+def case(name: str, params: list, quick_params: list = None):
+    """register a benchmark, run once per parameter"""
+
+    def decorator(func):
+        CASES.append((name, func, params, quick_params or params[:1]))
+        return func
+
+    return decorator
+
+
+def make_folder_tree(size: int, fanout: int = 10) -> list:
+    """a tree of folders with size nodes, filled breadth first"""
+    roots = [{"name": "folder-0", "children": []}]
+    level, count = roots, 1
+    while count < size:
+        next_level = []
+        for parent in level:
+            for _ in range(fanout):
+                if count == size:
+                    break
+                child = {"name": f"folder-{count}", "children": []}
+                parent["children"].append(child)
+                next_level.append(child)
+                count += 1
+        level = next_level
+    return roots
+
+
+def make_content(size: int) -> bytes:
+    return bytes(range(256)) * (size // 256)
+
+
+def start_api(stack: ExitStack, latency: float = 0, files: dict = None):
+    """start a stand-in API and point the config at it"""
+    from tests.mock_data_api.server import StandInApi
+
+    api = stack.enter_context(StandInApi(latency=latency, files=files))
+    config = SharingConfigsConfig.get_solo()
+    config.api_endpoint = api.api_endpoint
+    config.label = api.label
+    config.api_key = "12345"
+    config.save()
+    return api
+
+
+def theme_file(name: str) -> bytes:
+    theme = {
+        "name": name,
+        "primary": "#8d979c",
+        "secondary": "#315980",
+        "accent": "#f8f8f8",
+        "primary_fg": "#1a2b3c",
+    }
+    return json.dumps(theme).encode("utf-8")
+
+
+@case("folder_list", params=[10_000, 100_000], quick_params=[10_000])
+def folder_list(stack, size):
+    tree = make_folder_tree(size)
+
+    def run():
+        FolderList().folder_collector(tree)
+
+    return run
+
+
+@case("encode_base64_mb", params=[1, 10, 100], quick_params=[1])
+def encode_base64(stack, size):
+    content = make_content(size * MB)
+
+    def run():
+        get_str_from_encoded64_object(content)
+
+    return run
+
+
+@case("client_get_folders_latency_ms", params=[0, 10])
+def client_get_folders(stack, latency):
+    api = start_api(stack, latency / 1000)
+    client = SharingConfigsClient()
+
+    def run():
+        client.get_folders(permission="write")
+        api.requests.clear()
+
+    return run
+
+
+@case("client_export_mb_latency_10ms", params=[1, 10], quick_params=[1])
+def client_export(stack, size):
+    api = start_api(stack, 0.01)
+    client = SharingConfigsClient()
+    content = make_content(size * MB)
+
+    def run():
+        client.export("folder_one", ExportPayload(content, "file.bin", "benchmark"))
+        api.requests.clear()
+
+    return run
+
+
+@case("client_import_mb_latency_10ms", params=[1, 10], quick_params=[1])
+def client_import(stack, size):
+    files = {"folder_one": {"file.bin": make_content(size * MB)}}
+    api = start_api(stack, 0.01, files)
+    client = SharingConfigsClient()
+
+    def run():
+        client.import_file("folder_one", "file.bin").close()
+        api.requests.clear()
+
+    return run
+
+
+def admin_client(stack):
+    from django.test import Client
+
+    from testapp.models import Configuration, Theme
+    from tests.factories import SuperUserFactory, ThemeFactory
+
+    theme = ThemeFactory(name="benchmark")
+    Configuration.objects.update_or_create(defaults={"theme": theme})
+    stack.callback(Theme.objects.all().delete)
+    client = Client()
+    client.force_login(SuperUserFactory())
+    return client, theme
+
+
+@case("admin_export_view_latency_ms", params=[0, 10])
+def admin_export_view(stack, latency):
+    api = start_api(stack, latency / 1000)
+    client, theme = admin_client(stack)
+    url = reverse("admin:testapp_theme_sc_export", kwargs={"object_id": theme.pk})
+    data = {"folder": "folder_one", "file_name": "theme.json", "force": "on"}
+
+    def run():
+        resp = client.post(url, data=data)
+        assert resp.status_code == 302, resp.status_code
+        api.requests.clear()
+
+    return run
+
+
+@case("admin_import_view_files", params=[1, 10], quick_params=[1])
+def admin_import_view(stack, count):
+    files = {f"theme-{i}.json": theme_file(f"theme-{i}") for i in range(count)}
+    api = start_api(stack, 0.01, {"folder_one": files})
+    client, theme = admin_client(stack)
+    url = reverse("admin:testapp_theme_sc_import")
+    data = {"folder": "folder_one", "file_name": list(files), "force": "on"}
+
+    def run():
+        resp = client.post(url, data=data)
+        assert resp.status_code == 302, resp.status_code
+        api.requests.clear()
+
+    return run
@@ -0,0 +1 @@
+default_app_config = "sharing_configs.apps.SharingConfigsConfig"
@@ -1,19 +1,136 @@
+import asyncio
+import logging
+import time
+from functools import update_wrapper
+from typing import IO, Optional, Tuple, Union
+
 from django.contrib import admin, messages
-from django.http import JsonResponse
-from django.shortcuts import redirect, render
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IS_POPUP_VAR
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.db import transaction
+from django.http import Http404, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.response import TemplateResponse
 from django.urls import path, reverse
+from django.utils.cache import add_never_cache_headers
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from solo.admin import SingletonModelAdmin
 
-from sharing_configs.client_util import SharingConfigsClient
 from sharing_configs.exceptions import ApiException
-from sharing_configs.models import SharingConfigsConfig
+from sharing_configs.models import Job, SharingConfigsConfig
 
+from .backends import aget_client, get_client
+from .conf import get_setting
 from .exceptions import ApiException
-from .forms import ExportToForm, ImportForm
-from .utils import get_imported_files_choices, get_str_from_encoded64_object
+from .files import ExportPayload
+from .forms import BulkExportForm, ExportToForm, ImportForm, load_folders_snapshot
+from .jobs import JOB_PARAM, enqueue_job, get_job_status
+from .ledger import (
+    ImportLedger,
+    annotate_imported_from,
+    get_content_hash,
+    get_exported_hashes,
+    is_unchanged,
+    record_export,
+)
+from .utils import (
+    aget_files_index,
+    aget_imported_files_choices,
+    aget_imported_folders_choices,
+    export_concurrently,
+    get_file_picker_page,
+    get_files_index,
+    import_concurrently,
+    iter_filenames,
+)
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # pragma: no cover
+    sync_to_async = None
+
+logger = logging.getLogger(__name__)
+
+
+def async_admin_view(admin_site, view):
+    """
+    async counterpart of AdminSite.admin_view: check the admin permission and
+    the CSRF token and mark the response as non-cacheable
+    """
+    csrf_middleware = CsrfViewMiddleware(lambda request: None)
+
+    async def inner(request, *args, **kwargs):
+        if not await sync_to_async(admin_site.has_permission)(request):
+            return redirect_to_login(
+                request.get_full_path(),
+                reverse("admin:login", current_app=admin_site.name),
+            )
+        reason = await sync_to_async(csrf_middleware.process_view)(
+            request, view, args, kwargs
+        )
+        if reason is not None:
+            return reason
+        response = await view(request, *args, **kwargs)
+        add_never_cache_headers(response)
+        return csrf_middleware.process_response(request, response)
+
+    return update_wrapper(inner, view)
+
+
+async def aget_folder_choices(client, permission, data=None) -> list:
+    """
+    retrieve folder choices for a form; an API failure results in no choices.
+    With the data of a submitted form, the choices of its snapshot are used
+    while it is valid.
+    """
+    if data is not None:
+        folder_choices = load_folders_snapshot(data, permission)
+        if folder_choices is not None:
+            return folder_choices
+    try:
+        return await aget_imported_folders_choices(client, permission)
+    except ApiException as err:
+        logger.exception("Could not retrieve folders: %s" % err)
+        return []
+
+
+async def adownload_files(
+    client, folder, filenames, import_folder, get_ledger=None
+) -> Tuple[list, Optional[ImportLedger]]:
+    """
+    download files concurrently, or all files of the folder if import_folder is set;
+    return (filename, file) tuples, file is the error if a download failed or None
+    if it did not change since the last import, and the import ledger of the files
+    """
+    if not folder:
+        return [], None
+    if import_folder:
+        try:
+            filenames = await aget_imported_files_choices(client, folder)
+        except ApiException as exc:
+            return [(None, exc)], None
+    ledger = await sync_to_async(get_ledger)(filenames) if get_ledger else None
+    etags = ledger.get_etags() if ledger else {}
+    contents = await asyncio.gather(
+        *(
+            client.import_file(folder, filename, etag=etags.get(filename))
+            for filename in filenames
+        ),
+        return_exceptions=True,
+    )
+    for content in contents:
+        if isinstance(content, Exception) and not isinstance(content, ApiException):
+            for file in contents:
+                if isinstance(file, File):
+                    file.close()
+            raise content
+    return list(zip(filenames, contents)), ledger
 
 
 @admin.register(SharingConfigsConfig)
@@ -21,7 +138,61 @@ class SharingConfigsConfig(SingletonModelAdmin):
     pass
 
 
-class SharingConfigsExportMixin:
+class SharingConfigsJobsMixin:
+    """
+    Run exports and imports as background jobs, whose status is polled by the
+    admin templates, if sharing_configs_background_jobs is set
+    """
+
+    sharing_configs_background_jobs = False
+
+    def get_sharing_configs_job_status_url(self, job: Job) -> str:
+        info = (
+            self.model._meta.app_label,
+            self.model._meta.model_name,
+        )
+        return reverse(
+            f"{self.admin_site.name}:{info[0]}_{info[1]}_sc_job", args=[job.pk]
+        )
+
+    def add_sharing_configs_job_context(self, request, extra_context: dict) -> None:
+        """add the status url of the job in the query string to the context"""
+        job_id = request.GET.get(JOB_PARAM)
+        if job_id and job_id.isdigit():
+            extra_context["job_status_url"] = self.get_sharing_configs_job_status_url(
+                Job(pk=int(job_id))
+            )
+
+    def sharing_configs_job_status_view(self, request, job_id):
+        """return the status and messages of a job of the user as JSON"""
+        job = get_object_or_404(
+            Job,
+            pk=job_id,
+            content_type=ContentType.objects.get_for_model(self.model),
+        )
+        if job.user_id != request.user.pk and not request.user.is_superuser:
+            raise Http404
+        response = JsonResponse(get_job_status(job))
+        add_never_cache_headers(response)
+        return response
+
+    def get_urls(self):
+        urls = super().get_urls()
+        info = (
+            self.model._meta.app_label,
+            self.model._meta.model_name,
+        )
+        add_urls = [
+            path(
+                "sc_jobs/<int:job_id>/",
+                self.admin_site.admin_view(self.sharing_configs_job_status_view),
+                name=f"{info[0]}_{info[1]}_sc_job",
+            ),
+        ]
+        return add_urls + urls
+
+
+class SharingConfigsExportMixin(SharingConfigsJobsMixin):
     """
     A class that prepares data and privides interface to make API call using credentials;
     The  get_sharing_configs_export_data() method raise NotImplementedError and should be
@@ -30,12 +201,16 @@ class SharingConfigsExportMixin:
 
     change_form_template = "sharing_configs/admin/change_form.html"
     change_form_export_template = "sharing_configs/admin/export.html"
+    bulk_export_template = "sharing_configs/admin/bulk_export.html"
     sharing_configs_export_form = ExportToForm
+    sharing_configs_bulk_export_form = BulkExportForm
+    sharing_configs_async_views = False
 
-    def get_sharing_configs_export_data(self, obj: object) -> bytes:
+    def get_sharing_configs_export_data(self, obj: object) -> Union[bytes, IO[bytes]]:
         """
         The developer should override this method for export converting model object into bytes
-        that will be futher base64 encoded before sent to the API
+        that will be futher base64 encoded before sent to the API; a binary file-like object
+        can be returned instead to stream large exports
 
         """
         raise NotImplemented
@@ -54,43 +229,31 @@ class SharingConfigsExportMixin:
         extra_context = extra_context or {}
         extra_context["main_url"] = main_url
         obj = self.get_object(request, object_id)
-        initial = {"file_name": f"{obj}.json"}
+        initial = {"file_name": self.get_sharing_configs_export_filename(obj)}
         if request.method == "POST":
 
             form = self.get_sharing_configs_export_form(request.POST, initial=initial)
             if form.is_valid():
-
-                author = str(request.user)
-                byte_content = self.get_sharing_configs_export_data(obj)
-                str_content_64_encoded = get_str_from_encoded64_object(byte_content)
-                filename = form.cleaned_data.get("file_name")
-                folder = form.cleaned_data.get("folder")
-                data = {
+                parameters = {
+                    "object_ids": [str(obj.pk)],
+                    "folder": form.cleaned_data.get("folder"),
+                    "filename": form.cleaned_data.get("file_name"),
                     "overwrite": form.cleaned_data.get("overwrite"),
-                    "content": str_content_64_encoded,
-                    "author": author,
-                    "filename": filename,
+                    "force": form.cleaned_data.get("force"),
                 }
-
-                client = SharingConfigsClient()
-                try:
-                    resp = client.export(folder, data)
-                    msg = format_html(
-                        _("The object {object} has been exported successfully"),
-                        object=obj,
-                    )
-                    self.message_user(request, msg, level=messages.SUCCESS)
-                    return redirect(
-                        reverse(
-                            main_url,
-                            kwargs={"object_id": obj.id},
-                        )
-                    )
-                except ApiException:
-                    msg = format_html(
-                        _("Export of object failed"),
-                    )
-                    self.message_user(request, msg, level=messages.ERROR)
+                url = reverse(main_url, kwargs={"object_id": obj.id})
+                if self.sharing_configs_background_jobs:
+                    job = enqueue_job(request, self, Job.EXPORT, parameters)
+                    return redirect(f"{url}?{JOB_PARAM}={job.pk}")
+                if self.sharing_configs_export_object(
+                    request,
+                    obj,
+                    parameters["folder"],
+                    parameters["filename"],
+                    parameters["overwrite"],
+                    parameters["force"],
+                ):
+                    return redirect(url)
 
             if not form.is_valid():
                 msg = format_html(
@@ -110,6 +273,7 @@ class SharingConfigsExportMixin:
             )
         else:
             form = self.sharing_configs_export_form(initial=initial)
+            self.add_sharing_configs_job_context(request, extra_context)
 
             return render(
                 request,
@@ -122,16 +286,320 @@ class SharingConfigsExportMixin:
                 },
             )
 
+    def sharing_configs_export_object(
+        self, request, obj, folder, filename, overwrite, force=False
+    ) -> bool:
+        """
+        export an object to a file and report the outcome; return whether the
+        object has been exported or did not change since its last export
+        """
+        byte_content = self.get_sharing_configs_export_data(obj)
+        client = get_client()
+        content_hash = get_content_hash(byte_content)
+        if not force and is_unchanged(
+            client.label, obj, folder, filename, content_hash
+        ):
+            self.message_sharing_configs_unchanged(request, obj)
+            return True
+
+        data = self.get_sharing_configs_export_payload(
+            request, byte_content, filename, overwrite
+        )
+        try:
+            resp = client.export(folder, data)
+        except ApiException:
+            msg = format_html(
+                _("Export of object failed"),
+            )
+            self.message_user(request, msg, level=messages.ERROR)
+            return False
+        record_export(client.label, obj, folder, filename, content_hash, resp)
+        msg = format_html(
+            _("The object {object} has been exported successfully"),
+            object=obj,
+        )
+        self.message_user(request, msg, level=messages.SUCCESS)
+        return True
+
+    def run_sharing_configs_export_job(self, request, parameters: dict) -> None:
+        """export objects in a background job"""
+        queryset = self.get_queryset(request).filter(pk__in=parameters["object_ids"])
+        if parameters.get("filename"):
+            self.sharing_configs_export_object(
+                request,
+                queryset.get(),
+                parameters["folder"],
+                parameters["filename"],
+                parameters["overwrite"],
+                parameters["force"],
+            )
+        else:
+            self.sharing_configs_export_queryset(
+                request,
+                queryset,
+                parameters["folder"],
+                parameters["overwrite"],
+                parameters["force"],
+            )
+
+    async def asharing_configs_export_view(
+        self, request, object_id, extra_context=None
+    ):
+        """
+        async variant of sharing_configs_export_view: the object and the list of
+        folders are retrieved concurrently and the upload does not block a thread
+        """
+        info = (
+            self.model._meta.app_label,
+            self.model._meta.model_name,
+        )
+        main_url = f"admin:{info[0]}_{info[1]}_sc_export"
+        extra_context = extra_context or {}
+        extra_context["main_url"] = main_url
+        client = await aget_client()
+        obj, folder_choices = await asyncio.gather(
+            sync_to_async(self.get_object)(request, object_id),
+            aget_folder_choices(
+                client,
+                self.sharing_configs_export_form.permission,
+                request.POST if request.method == "POST" else None,
+            ),
+        )
+        initial = {"file_name": self.get_sharing_configs_export_filename(obj)}
+        if request.method == "POST":
+            form = self.get_sharing_configs_export_form(
+                request.POST,
+                initial=initial,
+                folder_choices=folder_choices,
+                available=client.is_available(),
+            )
+            if form.is_valid() and self.sharing_configs_background_jobs:
+                parameters = {
+                    "object_ids": [str(obj.pk)],
+                    "folder": form.cleaned_data.get("folder"),
+                    "filename": form.cleaned_data.get("file_name"),
+                    "overwrite": form.cleaned_data.get("overwrite"),
+                    "force": form.cleaned_data.get("force"),
+                }
+                job = await sync_to_async(enqueue_job)(
+                    request, self, Job.EXPORT, parameters
+                )
+                url = reverse(main_url, kwargs={"object_id": obj.id})
+                return redirect(f"{url}?{JOB_PARAM}={job.pk}")
+            elif form.is_valid():
+                byte_content = await sync_to_async(
+                    self.get_sharing_configs_export_data
+                )(obj)
+                folder = form.cleaned_data.get("folder")
+                filename = form.cleaned_data.get("file_name")
+                content_hash = get_content_hash(byte_content)
+                if not form.cleaned_data.get("force") and await sync_to_async(
+                    is_unchanged
+                )(client.label, obj, folder, filename, content_hash):
+                    self.message_sharing_configs_unchanged(request, obj)
+                    return redirect(reverse(main_url, kwargs={"object_id": obj.id}))
+
+                data = self.get_sharing_configs_export_payload(
+                    request,
+                    byte_content,
+                    filename,
+                    form.cleaned_data.get("overwrite"),
+                )
+                try:
+                    resp = await client.export(folder, data)
+                    await sync_to_async(record_export)(
+                        client.label, obj, folder, filename, content_hash, resp
+                    )
+                    msg = format_html(
+                        _("The object {object} has been exported successfully"),
+                        object=obj,
+                    )
+                    self.message_user(request, msg, level=messages.SUCCESS)
+                    return redirect(reverse(main_url, kwargs={"object_id": obj.id}))
+                except ApiException:
+                    msg = format_html(_("Export of object failed"))
+                    self.message_user(request, msg, level=messages.ERROR)
+            else:
+                msg = format_html(
+                    _("The object {object} has been not exported"),
+                    object=obj,
+                )
+                self.message_user(request, msg, level=messages.ERROR)
+        else:
+            form = self.get_sharing_configs_export_form(
+                initial=initial,
+                folder_choices=folder_choices,
+                available=client.is_available(),
+            )
+            self.add_sharing_configs_job_context(request, extra_context)
+
+        return await sync_to_async(render)(
+            request,
+            self.change_form_export_template,
+            {
+                "object": obj,
+                "form": form,
+                "extra_context": extra_context,
+                "opts": self.model._meta,
+            },
+        )
+
+    def get_sharing_configs_export_payload(
+        self, request, content: Union[bytes, IO[bytes]], filename: str, overwrite: bool
+    ) -> ExportPayload:
+        """return the data to send to the API to export content to a file"""
+        return ExportPayload(
+            content,
+            filename=filename,
+            author=str(request.user),
+            overwrite=overwrite,
+        )
+
+    def message_sharing_configs_unchanged(self, request, obj: object) -> None:
+        msg = format_html(
+            _("The object {object} has not changed since its last export"),
+            object=obj,
+        )
+        self.message_user(request, msg, level=messages.INFO)
+
+    def get_sharing_configs_export_filename(self, obj: object) -> str:
+        """return the default name of the file an object is exported to"""
+        return f"{obj}.json"
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if self.actions is None or IS_POPUP_VAR in request.GET:
+            return actions
+        if self.sharing_configs_bulk_export_form is not None:
+            name = "sharing_configs_bulk_export"
+            actions[name] = self.get_action(name)
+        return actions
+
+    def sharing_configs_bulk_export(self, request, queryset):
+        """
+        admin action: ask for a folder, then export the selected objects to it;
+        the uploads run concurrently and share one client
+        """
+        job_status_url = None
+        if "apply" in request.POST:
+            form = self.sharing_configs_bulk_export_form(request.POST)
+            if form.is_valid() and self.sharing_configs_background_jobs:
+                parameters = {
+                    "object_ids": [
+                        str(pk) for pk in queryset.values_list("pk", flat=True)
+                    ],
+                    "folder": form.cleaned_data["folder"],
+                    "overwrite": form.cleaned_data["overwrite"],
+                    "force": form.cleaned_data.get("force", False),
+                }
+                job = enqueue_job(request, self, Job.EXPORT, parameters)
+                job_status_url = self.get_sharing_configs_job_status_url(job)
+            elif form.is_valid():
+                self.sharing_configs_export_queryset(
+                    request,
+                    queryset,
+                    form.cleaned_data["folder"],
+                    form.cleaned_data["overwrite"],
+                    form.cleaned_data.get("force", False),
+                )
+                return None
+        else:
+            form = self.sharing_configs_bulk_export_form()
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": _("Export to Community"),
+            "form": form,
+            "queryset": queryset,
+            "opts": self.model._meta,
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "job_status_url": job_status_url,
+        }
+        return TemplateResponse(request, self.bulk_export_template, context)
+
+    sharing_configs_bulk_export.short_description = _(
+        "Export selected %(verbose_name_plural)s to Community"
+    )
+
+    def sharing_configs_export_queryset(
+        self, request, queryset, folder, overwrite, force=False
+    ):
+        """
+        export the objects of a queryset and report the outcome per object;
+        objects that did not change since their last export are skipped unless forced
+        """
+        start = time.monotonic()
+        client = get_client()
+        objects = list(queryset)
+        exported = {}
+        if not force:
+            exported = get_exported_hashes(
+                client.label, self.model, folder, [obj.pk for obj in objects]
+            )
+        items, targets, skipped = [], [], 0
+        for obj in objects:
+            content = self.get_sharing_configs_export_data(obj)
+            filename = self.get_sharing_configs_export_filename(obj)
+            content_hash = get_content_hash(content)
+            if content_hash and exported.get((str(obj.pk), filename)) == content_hash:
+                skipped += 1
+                continue
+            payload = self.get_sharing_configs_export_payload(
+                request, content, filename, overwrite
+            )
+            items.append((obj, payload))
+            targets.append((filename, content_hash))
+        results = export_concurrently(client, folder, items)
+        duration = time.monotonic() - start
+
+        with transaction.atomic():
+            for (obj, result), (filename, content_hash) in zip(results, targets):
+                if not isinstance(result, ApiException):
+                    record_export(
+                        client.label, obj, folder, filename, content_hash, result
+                    )
+
+        if skipped:
+            msg = _(
+                "%(count)d of %(total)d objects have not changed since their last export"
+            ) % {"count": skipped, "total": len(objects)}
+            self.message_user(request, msg, level=messages.INFO)
+        failed = [obj for obj, result in results if isinstance(result, ApiException)]
+        for obj in failed:
+            msg = format_html(_("Export of {object} failed"), object=obj)
+            self.message_user(request, msg, level=messages.ERROR)
+        succeeded = [
+            obj for obj, result in results if not isinstance(result, ApiException)
+        ]
+        if succeeded:
+            msg = _(
+                "%(count)d of %(total)d objects have been exported in "
+                "%(duration).1f seconds: %(objects)s"
+            ) % {
+                "count": len(succeeded),
+                "total": len(results),
+                "duration": duration,
+                "objects": ", ".join(str(obj) for obj in succeeded),
+            }
+            self.message_user(request, msg, level=messages.SUCCESS)
+        return results
+
     def get_urls(self):
         urls = super().get_urls()
         info = (
             self.model._meta.app_label,
             self.model._meta.model_name,
         )
+        if self.sharing_configs_async_views:
+            export_view = async_admin_view(
+                self.admin_site, self.asharing_configs_export_view
+            )
+        else:
+            export_view = self.admin_site.admin_view(self.sharing_configs_export_view)
         add_urls = [
             path(
                 "<path:object_id>/sc_export/",
-                self.admin_site.admin_view(self.sharing_configs_export_view),
+                export_view,
                 name=f"{info[0]}_{info[1]}_sc_export",
             ),
         ]
@@ -145,12 +613,13 @@ class SharingConfigsExportMixin:
             return form
 
 
-class SharingConfigsImportMixin:
+class SharingConfigsImportMixin(SharingConfigsJobsMixin):
     """provide methods to download files from the storage using credentials"""
 
     change_list_template = "sharing_configs/admin/change_list.html"
     import_template = "sharing_configs/admin/import.html"
     sharing_configs_import_form = ImportForm
+    sharing_configs_async_views = False
 
     def get_sharing_configs_import_data(self, content: bytes) -> object:
         """
@@ -159,14 +628,41 @@ class SharingConfigsImportMixin:
         """
         raise NotImplemented
 
+    def get_sharing_configs_import_data_from_file(self, file: File) -> object:
+        """
+        create or update a model object from a downloaded file; override this
+        method to parse large files incrementally instead of reading them at once
+        """
+        return self.get_sharing_configs_import_data(file.read())
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if "sharing_configs_imported_from" in self.get_list_display(request):
+            queryset = annotate_imported_from(queryset)
+        return queryset
+
+    def sharing_configs_imported_from(self, obj) -> str:
+        """
+        changelist column with the file an object was last imported from;
+        the paths are annotated on the queryset, so without a query per row
+        """
+        return getattr(obj, "sharing_configs_imported_path", None) or "-"
+
+    sharing_configs_imported_from.short_description = _("imported from")
+
     def get_ajax_fetch_files(self, request, *args, **kwargs):
-        """ajax call to pass chosen folder to a view"""
+        """
+        ajax call of the file picker: one page (offset, limit) of the files of
+        the chosen folder matching the search term q, prefix matches first
+        """
         folder = request.GET.get("folder_name")
-        api_response_list_files = get_imported_files_choices(folder)
-        if api_response_list_files:
-            return JsonResponse({"resp": api_response_list_files, "status_code": 200})
-        else:
+        try:
+            index = get_files_index(get_client(), folder) if folder else None
+        except ApiException:
+            index = None
+        if index is None:
             return JsonResponse({"status_code": 400, "error": "Unable to get folders"})
+        return JsonResponse(get_file_picker_page(index, request.GET))
 
     def import_from_view(self, request, extra_context=None):
         """
@@ -183,30 +679,23 @@ class SharingConfigsImportMixin:
         extra_context = extra_context or {}
         extra_context["main_url"] = main_url
         extra_context["ajax_url"] = ajax_url
+        # the browser reuses the files of a folder as long as they are cached here
+        extra_context["files_cache_ttl"] = get_setting("FILES_INDEX_CACHE_TIMEOUT")
         if request.method == "POST":
             form = self.get_sharing_configs_import_form(request.POST)
             if form.is_valid():
-
-                folder = form.cleaned_data.get("folder")
-                filename = form.cleaned_data.get("file_name")
-                client = SharingConfigsClient()
-                try:
-                    content = client.import_data(folder, filename)
-                    obj = self.get_sharing_configs_import_data(content)
-                    msg = format_html(
-                        _("The item {object} has been imported successfully!"),
-                        object=obj,
-                    )
-                    self.message_user(request, msg, level=messages.SUCCESS)
+                parameters = {
+                    "folder": form.cleaned_data.get("folder"),
+                    "filenames": form.cleaned_data.get("file_name"),
+                    "import_folder": form.cleaned_data.get("import_folder"),
+                    "force": form.cleaned_data.get("force"),
+                }
+                if self.sharing_configs_background_jobs:
+                    job = enqueue_job(request, self, Job.IMPORT, parameters)
+                    return redirect(f"{reverse(main_url)}?{JOB_PARAM}={job.pk}")
+                if self.sharing_configs_import_files(request, **parameters):
                     return redirect(reverse(main_url))
 
-                except ApiException:
-
-                    msg = format_html(
-                        _("The import of the selected item failed."),
-                    )
-                    self.message_user(request, msg, level=messages.ERROR)
-
             if not form.is_valid():
 
                 msg = format_html(
@@ -227,6 +716,7 @@ class SharingConfigsImportMixin:
 
         else:
             form = self.get_sharing_configs_import_form()
+            self.add_sharing_configs_job_context(request, extra_context)
             return render(
                 request,
                 self.import_template,
@@ -237,22 +727,227 @@ class SharingConfigsImportMixin:
                 },
             )
 
+    def sharing_configs_import_files(
+        self, request, folder, filenames, import_folder=False, force=False
+    ) -> bool:
+        """
+        download and import files of a folder, or all its files, and report the
+        outcome; return whether any file has been imported or did not change
+        """
+        client = get_client()
+        try:
+            if import_folder:
+                filenames = list(iter_filenames(client, folder))
+            ledger = ImportLedger(
+                client.label, self.model, folder, filenames, force=force
+            )
+            downloads = import_concurrently(
+                client, folder, filenames, ledger.get_etags()
+            )
+        except ApiException:
+            msg = format_html(
+                _("The import of the selected item failed."),
+            )
+            self.message_user(request, msg, level=messages.ERROR)
+            return False
+        changed = self.sharing_configs_skip_unchanged(request, downloads, ledger)
+        imported = self.sharing_configs_apply_import(request, changed, ledger)
+        return bool(imported) or len(changed) < len(downloads)
+
+    def run_sharing_configs_import_job(self, request, parameters: dict) -> None:
+        """import files in a background job"""
+        self.sharing_configs_import_files(request, **parameters)
+
+    def sharing_configs_skip_unchanged(
+        self, request, downloads: list, ledger: ImportLedger
+    ) -> list:
+        """
+        report the downloaded files that did not change since their last import;
+        return the other (filename, file) tuples
+        """
+        changed = []
+        with transaction.atomic():
+            for filename, file in downloads:
+                if file is None or (
+                    not isinstance(file, ApiException)
+                    and ledger.is_unchanged(filename, file)
+                ):
+                    if file is not None:
+                        file.close()
+                    msg = format_html(
+                        _("The file {filename} has not changed since its last import"),
+                        filename=filename,
+                    )
+                    self.message_user(request, msg, level=messages.INFO)
+                else:
+                    changed.append((filename, file))
+        return changed
+
+    def sharing_configs_apply_import(
+        self, request, downloads: list, ledger: Optional[ImportLedger] = None
+    ) -> list:
+        """
+        create objects from the downloaded (filename, file) tuples in one
+        transaction with a savepoint per file, so one failing file does not
+        prevent the others from being imported; return the imported objects
+        """
+        imported = []
+        with transaction.atomic():
+            for filename, file in downloads:
+                if not isinstance(file, ApiException):
+                    try:
+                        with file, transaction.atomic():
+                            obj = self.get_sharing_configs_import_data_from_file(file)
+                    except Exception:
+                        logger.exception("Could not import %s", filename)
+                    else:
+                        imported.append(obj)
+                        if ledger is not None:
+                            ledger.record(filename, obj, file)
+                        msg = format_html(
+                            _("The item {object} has been imported successfully!"),
+                            object=obj,
+                        )
+                        self.message_user(request, msg, level=messages.SUCCESS)
+                        continue
+
+                if len(downloads) == 1:
+                    msg = format_html(_("The import of the selected item failed."))
+                else:
+                    msg = format_html(
+                        _("The import of {filename} failed."), filename=filename
+                    )
+                self.message_user(request, msg, level=messages.ERROR)
+        return imported
+
+    async def aget_ajax_fetch_files(self, request, *args, **kwargs):
+        """async variant of get_ajax_fetch_files"""
+        folder = request.GET.get("folder_name")
+        client = await aget_client()
+        try:
+            index = await aget_files_index(client, folder) if folder else None
+        except ApiException:
+            index = None
+        if index is None:
+            return JsonResponse({"status_code": 400, "error": "Unable to get folders"})
+        # the files of the local catalog are searched in the database
+        page = await sync_to_async(get_file_picker_page)(index, request.GET)
+        return JsonResponse(page)
+
+    async def aimport_from_view(self, request, extra_context=None):
+        """
+        async variant of import_from_view: on POST the selected files are downloaded
+        concurrently once the form is validated against the folder choices
+        """
+        info = (
+            self.model._meta.app_label,
+            self.model._meta.model_name,
+        )
+        main_url = f"admin:{info[0]}_{info[1]}_sc_import"
+        ajax_url = f"admin:{info[0]}_{info[1]}_sc_ajax"
+        extra_context = extra_context or {}
+        extra_context["main_url"] = main_url
+        extra_context["ajax_url"] = ajax_url
+        # the browser reuses the files of a folder as long as they are cached here
+        extra_context["files_cache_ttl"] = get_setting("FILES_INDEX_CACHE_TIMEOUT")
+        client = await aget_client()
+        permission = self.sharing_configs_import_form.permission
+        if request.method == "POST" and self.sharing_configs_background_jobs:
+            folder_choices = await aget_folder_choices(client, permission, request.POST)
+            form = self.get_sharing_configs_import_form(
+                request.POST,
+                folder_choices=folder_choices,
+                available=client.is_available(),
+            )
+            if form.is_valid():
+                parameters = {
+                    "folder": form.cleaned_data.get("folder"),
+                    "filenames": form.cleaned_data.get("file_name"),
+                    "import_folder": form.cleaned_data.get("import_folder"),
+                    "force": form.cleaned_data.get("force"),
+                }
+                job = await sync_to_async(enqueue_job)(
+                    request, self, Job.IMPORT, parameters
+                )
+                return redirect(f"{reverse(main_url)}?{JOB_PARAM}={job.pk}")
+            msg = format_html(_("Something went wrong during object import"))
+            self.message_user(request, msg, level=messages.ERROR)
+        elif request.method == "POST":
+            folder_choices = await aget_folder_choices(client, permission, request.POST)
+            form = self.get_sharing_configs_import_form(
+                request.POST,
+                folder_choices=folder_choices,
+                available=client.is_available(),
+            )
+            if form.is_valid():
+                folder = form.cleaned_data.get("folder")
+
+                def get_ledger(filenames):
+                    return ImportLedger(
+                        client.label,
+                        self.model,
+                        folder,
+                        filenames,
+                        force=form.cleaned_data.get("force"),
+                    )
+
+                downloads, ledger = await adownload_files(
+                    client,
+                    folder,
+                    form.cleaned_data.get("file_name"),
+                    form.cleaned_data.get("import_folder"),
+                    get_ledger,
+                )
+                changed = await sync_to_async(self.sharing_configs_skip_unchanged)(
+                    request, downloads, ledger
+                )
+                imported = await sync_to_async(self.sharing_configs_apply_import)(
+                    request, changed, ledger
+                )
+                if imported or len(changed) < len(downloads):
+                    return redirect(reverse(main_url))
+            else:
+                msg = format_html(_("Something went wrong during object import"))
+                self.message_user(request, msg, level=messages.ERROR)
+        else:
+            folder_choices = await aget_folder_choices(client, permission)
+            form = self.get_sharing_configs_import_form(
+                folder_choices=folder_choices, available=client.is_available()
+            )
+            self.add_sharing_configs_job_context(request, extra_context)
+
+        return await sync_to_async(render)(
+            request,
+            self.import_template,
+            {
+                "form": form,
+                "extra_context": extra_context,
+                "opts": self.model._meta,
+            },
+        )
+
     def get_urls(self):
         urls = super().get_urls()
         info = (
             self.model._meta.app_label,
             self.model._meta.model_name,
         )
+        if self.sharing_configs_async_views:
+            ajax_view = async_admin_view(self.admin_site, self.aget_ajax_fetch_files)
+            import_view = async_admin_view(self.admin_site, self.aimport_from_view)
+        else:
+            ajax_view = self.admin_site.admin_view(self.get_ajax_fetch_files)
+            import_view = self.admin_site.admin_view(self.import_from_view)
 
         add_urls = [
             path(
                 "sc_fetch/files/",
-                self.admin_site.admin_view(self.get_ajax_fetch_files),
+                ajax_view,
                 name=f"{info[0]}_{info[1]}_sc_ajax",
             ),
             path(
                 "sc_import/",
-                self.admin_site.admin_view(self.import_from_view),
+                import_view,
                 name=f"{info[0]}_{info[1]}_sc_import",
             ),
         ]
@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class SharingConfigsConfig(AppConfig):
     name = "sharing_configs"
     verbose_name = "Sharing Configs"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .backends import invalidate_config
+        from .metrics import record_metrics
+        from .models import SharingConfigsConfig
+        from .signals import api_call
+
+        api_call.connect(record_metrics, dispatch_uid="sharing_configs_metrics")
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_config,
+                sender=SharingConfigsConfig,
+                dispatch_uid="sharing_configs_invalidate_config",
+            )
@@ -0,0 +1,467 @@
+import asyncio
+import base64
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.request import pathname2url
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+from .cache import get_cache, invalidate_folders_cache
+from .conf import get_setting
+from .exceptions import ApiException
+from .files import ExportPayload, FileSpool, ImportedFile
+from .models import SharingConfigsConfig
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # pragma: no cover
+    sync_to_async = None
+
+CHUNK_SIZE = 64 * 1024
+# listings of directories changed this recently (in ns) are not cached, since
+# another change within the timestamp granularity of the filesystem would
+# leave the modification time unchanged
+RACY_MTIME = 2 * 10**9
+
+# directory path -> (modification time, sub-directories, files)
+_listings = {}
+
+CONFIG_VERSION_KEY = "sharing_configs:config:version"
+
+
+class BaseBackend:
+    """
+    storage of the shared configurations of a label: folders of files that are
+    listed, read and written; the API client is the default backend
+    """
+
+    def get_folders(self, permission: Optional[str]) -> dict:
+        """
+        return dict with attr "results" containing list of folders
+        """
+        raise NotImplementedError
+
+    def get_files(self, folder: str) -> dict:
+        """
+        return dict with attr "results" containing file names
+        """
+        raise NotImplementedError
+
+    def get_page(self, operation: str, url: str) -> dict:
+        """return the page of a listing the "next" link of the previous page points to"""
+        raise NotImplementedError
+
+    def get_next_url(self, page: dict) -> Optional[str]:
+        """return the "next" link of a page of a listing, None on the last page"""
+        return page.get("next")
+
+    def iter_folders(self, permission: Optional[str]) -> Iterator[dict]:
+        """
+        yield the (top level) folders, following the pages of the listing lazily
+        """
+        return iter_results(self, "get_folders", lambda: self.get_folders(permission))
+
+    def iter_files(self, folder: str) -> Iterator[dict]:
+        """
+        yield the file items of a folder, following the pages of the listing
+        lazily
+        """
+        return iter_results(self, "get_files", lambda: self.get_files(folder))
+
+    def import_file(
+        self, folder: str, filename: str, etag: Optional[str] = None
+    ) -> Optional[ImportedFile]:
+        """
+        return a file; with the ETag of a previous import, None is returned if
+        the file did not change
+        """
+        raise NotImplementedError
+
+    def import_data(self, folder: str, filename: str) -> bytes:
+        """return the content of a file"""
+        with self.import_file(folder, filename) as file:
+            return file.read()
+
+    def export(self, folder: str, data: Union[dict, ExportPayload]) -> dict:
+        """write a file to a folder"""
+        raise NotImplementedError
+
+    def is_available(self) -> bool:
+        """whether calls are made, or fail fast because the storage is down"""
+        return True
+
+
+def iter_results(
+    backend: BaseBackend, operation: str, get_first: Callable[[], dict]
+) -> Iterator[dict]:
+    """
+    yield the results of a paginated listing; the next page is fetched in a
+    thread while the current one is consumed, and no further pages are fetched
+    once the caller stops iterating
+    """
+    page = get_first()
+    executor = None
+    try:
+        while True:
+            next_url = backend.get_next_url(page)
+            prefetch = None
+            if next_url:
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="sharing_configs_pages"
+                    )
+                prefetch = executor.submit(backend.get_page, operation, next_url)
+            yield from page.get("results") or []
+            if prefetch is None:
+                return
+            page = prefetch.result()
+    finally:
+        if executor is not None:
+            # a prefetched page that is not consumed is dropped
+            executor.shutdown(wait=False)
+
+
+async def aiter_results(
+    backend, operation: str, get_first: Callable[[], Awaitable[dict]]
+) -> AsyncIterator[dict]:
+    """async variant of iter_results, prefetching the next page in a task"""
+    page = await get_first()
+    prefetch = None
+    try:
+        while True:
+            next_url = backend.get_next_url(page)
+            prefetch = None
+            if next_url:
+                prefetch = asyncio.ensure_future(backend.get_page(operation, next_url))
+            for item in page.get("results") or []:
+                yield item
+            if prefetch is None:
+                return
+            page = await prefetch
+    finally:
+        if prefetch is not None and not prefetch.done():
+            prefetch.cancel()
+
+
+def get_config_values(config: SharingConfigsConfig) -> tuple:
+    return tuple(
+        field.value_from_object(config) for field in config._meta.concrete_fields
+    )
+
+
+class ConfigCache:
+    """
+    the config memoised in the process, with the client built from it. Saving
+    the config drops it in the process and bumps its version in the Django
+    cache, which other processes check every SHARING_CONFIGS_CONFIG_CHECK_INTERVAL
+    seconds. A cache of the process is not seen by the others, so with it the
+    row is read again instead.
+    """
+
+    def __init__(self) -> None:
+        # reentrant, as get_solo creating the config invalidates it
+        self._lock = threading.RLock()
+        self._config = None
+        self._client = None
+        self._version = None
+        self._checked = 0.0
+
+    def is_fresh(self) -> bool:
+        return (
+            self._config is not None
+            and time.monotonic() - self._checked < get_setting("CONFIG_CHECK_INTERVAL")
+        )
+
+    def get_config(self) -> SharingConfigsConfig:
+        if self.is_fresh():
+            return self._config
+        with self._lock:
+            cache = get_cache()
+            if isinstance(cache, (LocMemCache, DummyCache)):
+                config = SharingConfigsConfig.get_solo()
+                values = get_config_values(config)
+                if self._config is None or values != get_config_values(self._config):
+                    self._config = config
+                    self._client = None
+            elif self._config is None or cache.get(CONFIG_VERSION_KEY) != self._version:
+                self._config = SharingConfigsConfig.get_solo()
+                self._client = None
+                self._version = cache.get(CONFIG_VERSION_KEY)
+            self._checked = time.monotonic()
+            return self._config
+
+    def get_client(self) -> BaseBackend:
+        config = self.get_config()
+        with self._lock:
+            if self._client is None or self._client.config is not config:
+                backend_class = import_string(get_setting("BACKENDS")[config.backend])
+                self._client = backend_class(config)
+            return self._client
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._config = None
+            self._client = None
+        cache = get_cache()
+        cache.add(CONFIG_VERSION_KEY, 0, timeout=None)
+        try:
+            cache.incr(CONFIG_VERSION_KEY)
+        except ValueError:
+            # evicted between add and incr
+            cache.set(CONFIG_VERSION_KEY, 1, timeout=None)
+
+
+config_cache = ConfigCache()
+
+
+def get_config() -> SharingConfigsConfig:
+    """return the config, memoised in the process until it is saved"""
+    return config_cache.get_config()
+
+
+async def aget_config() -> SharingConfigsConfig:
+    """async variant of get_config"""
+    if config_cache.is_fresh():
+        return config_cache.get_config()
+    return await sync_to_async(config_cache.get_config)()
+
+
+def invalidate_config(sender=None, **kwargs) -> None:
+    """receiver of post_save and post_delete of the config"""
+    config_cache.invalidate()
+
+
+def get_client(config: Optional[SharingConfigsConfig] = None) -> BaseBackend:
+    """
+    return the backend selected in the config; without a config, one client is
+    shared in the process until the config is saved
+    """
+    if config is None:
+        return config_cache.get_client()
+    backend_class = import_string(get_setting("BACKENDS")[config.backend])
+    return backend_class(config)
+
+
+async def aget_client():
+    """return the async variant of the backend selected in the config"""
+    config = await aget_config()
+    backend_class = import_string(get_setting("ASYNC_BACKENDS")[config.backend])
+    return backend_class(config)
+
+
+def list_directory(path: str) -> Tuple[List[str], List[str]]:
+    """
+    return the sorted sub-directories and files of a directory, skipping hidden
+    ones; listings are cached until the modification time of the directory changes
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _listings.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    directories, files = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                directories.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    directories.sort()
+    files.sort()
+    if time.time_ns() - mtime > RACY_MTIME:
+        _listings[path] = (mtime, directories, files)
+    return directories, files
+
+
+def get_file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def remove_file(path: str) -> None:
+    """remove a temporary file; a failure does not hide the error being handled"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class FilesystemBackend(BaseBackend):
+    """
+    stores the folders of the label in a local directory tree:
+    <storage path>/<label>/<folder>/<filename>
+    """
+
+    def __init__(self, config: Optional[SharingConfigsConfig] = None) -> None:
+        self.config = config or get_config()
+        self.label = self.config.label
+        self.root = os.path.join(self.config.storage_path, self.label)
+
+    def get_path(self, folder: str, filename: Optional[str] = None) -> str:
+        """path of a folder or file; names leaving the folders are refused"""
+        parts = folder.split("/")
+        if filename is not None:
+            parts.append(filename)
+        for part in parts:
+            if (
+                not part
+                or part.startswith(".")
+                or os.sep in part
+                or (os.altsep and os.altsep in part)
+            ):
+                raise ApiException(f"Invalid path {'/'.join(parts)}")
+        return os.path.join(self.root, *parts)
+
+    def get_folders(self, permission: Optional[str]) -> dict:
+        """
+        return the nested directories the process can read, or write with the
+        write permission
+        """
+        access = os.W_OK if permission == "write" else os.R_OK
+        results = []
+        stack = [(self.root, results)]
+        try:
+            while stack:
+                path, siblings = stack.pop()
+                for name in list_directory(path)[0]:
+                    child = os.path.join(path, name)
+                    if not os.access(child, access):
+                        continue
+                    writable = os.access(child, os.W_OK)
+                    item = {
+                        "name": name,
+                        "children": [],
+                        "permission": "write" if writable else "read",
+                    }
+                    siblings.append(item)
+                    stack.append((child, item["children"]))
+        except OSError:
+            raise ApiException("Could not retrieve any folders from the storage path.")
+        return {"count": len(results), "next": None, "results": results}
+
+    def get_files(self, folder: str) -> dict:
+        try:
+            filenames = list_directory(self.get_path(folder))[1]
+        except OSError:
+            raise ApiException("Could not retrieve any files from the storage path.")
+        results = [{"filename": filename} for filename in filenames]
+        return {"count": len(results), "next": None, "results": results}
+
+    def import_file(
+        self, folder: str, filename: str, etag: Optional[str] = None
+    ) -> Optional[ImportedFile]:
+        """
+        read a file into a (spooled) temporary file; the ETag is derived from
+        the modification time and size of the file
+        """
+        path = self.get_path(folder, filename)
+        try:
+            with open(path, "rb") as f:
+                file_etag = get_file_etag(os.fstat(f.fileno()))
+                if etag is not None and etag == file_etag:
+                    return None
+                spool = FileSpool(filename, os.fstat(f.fileno()).st_size)
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    spool.write(chunk)
+        except OSError:
+            raise ApiException("Could not import the item from the storage path.")
+        return spool.finish(file_etag)
+
+    def export(self, folder: str, data: Union[dict, ExportPayload]) -> dict:
+        """
+        write the file atomically: the content is written to a temporary file
+        in the folder, which then replaces the file, or is linked to its name
+        without overwrite, so a file created meanwhile is not replaced
+        """
+        if isinstance(data, ExportPayload):
+            filename, overwrite = data.filename, data.overwrite
+            chunks = data.iter_content()
+        else:
+            filename, overwrite = data["filename"], data.get("overwrite", False)
+            chunks = [base64.b64decode(data["content"])]
+        directory = self.get_path(folder)
+        path = self.get_path(folder, filename)
+        if not overwrite and os.path.exists(path):
+            raise ApiException(f"The file {filename} already exists.")
+
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        except OSError:
+            raise ApiException("Could not export the item to the storage path.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(temp_path, 0o644)
+            if overwrite:
+                os.replace(temp_path, path)
+            else:
+                os.link(temp_path, path)
+        except OSError as exc:
+            remove_file(temp_path)
+            if isinstance(exc, FileExistsError):
+                raise ApiException(f"The file {filename} already exists.")
+            raise ApiException("Could not export the item to the storage path.")
+        if not overwrite:
+            remove_file(temp_path)
+        invalidate_folders_cache(self.label, folder)
+        return {"download_url": f"file://{pathname2url(path)}", "filename": filename}
+
+
+class AsyncFilesystemBackend:
+    """asyncio variant of FilesystemBackend, accessing the disk in a thread"""
+
+    def __init__(self, config: Optional[SharingConfigsConfig] = None) -> None:
+        self.backend = FilesystemBackend(config)
+        self.config = self.backend.config
+        self.label = self.backend.label
+
+    async def get_folders(self, permission: Optional[str]) -> dict:
+        return await sync_to_async(self.backend.get_folders)(permission)
+
+    async def get_files(self, folder: str) -> dict:
+        return await sync_to_async(self.backend.get_files)(folder)
+
+    async def get_page(self, operation: str, url: str) -> dict:
+        return await sync_to_async(self.backend.get_page)(operation, url)
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def get_next_url(self, page: dict) -> Optional[str]:
+        return self.backend.get_next_url(page)
+
+    def iter_folders(self, permission: Optional[str]) -> AsyncIterator[dict]:
+        return aiter_results(self, "get_folders", lambda: self.get_folders(permission))
+
+    def iter_files(self, folder: str) -> AsyncIterator[dict]:
+        return aiter_results(self, "get_files", lambda: self.get_files(folder))
+
+    async def import_file(
+        self, folder: str, filename: str, etag: Optional[str] = None
+    ) -> Optional[ImportedFile]:
+        return await sync_to_async(self.backend.import_file)(folder, filename, etag)
+
+    async def import_data(self, folder: str, filename: str) -> bytes:
+        return await sync_to_async(self.backend.import_data)(folder, filename)
+
+    async def export(self, folder: str, data: Union[dict, ExportPayload]) -> dict:
+        return await sync_to_async(self.backend.export)(folder, data)
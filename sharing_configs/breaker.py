@@ -0,0 +1,117 @@
+import logging
+import time
+from hashlib import sha256
+from typing import Optional, Tuple
+
+from .cache import get_cache
+from .conf import get_setting
+from .exceptions import ApiException
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpen(ApiException):
+    """
+    get raised without calling the API while the circuit breaker is open
+    """
+
+
+class CircuitBreaker:
+    """
+    circuit breaker of an API endpoint, shared by all processes through the
+    Django cache. After SHARING_CONFIGS_CIRCUIT_BREAKER_THRESHOLD failed calls
+    within the cooldown, the breaker opens and calls fail fast for
+    SHARING_CONFIGS_CIRCUIT_BREAKER_COOLDOWN seconds. Then it is half-open: one
+    probe call is let through, which closes the breaker when it succeeds and
+    opens it again when it fails.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        digest = sha256(endpoint.encode("utf-8")).hexdigest()[:16]
+        prefix = f"sharing_configs:breaker:{digest}"
+        self.failures_key = f"{prefix}:failures"
+        self.opened_key = f"{prefix}:opened"
+        self.probe_key = f"{prefix}:probe"
+        self.threshold = get_setting("CIRCUIT_BREAKER_THRESHOLD")
+        self.cooldown = get_setting("CIRCUIT_BREAKER_COOLDOWN")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.threshold)
+
+    def get_state(self) -> str:
+        """return "closed", "open" or "half-open" """
+        if not self.enabled:
+            return "closed"
+        opened = get_cache().get(self.opened_key)
+        if opened is None:
+            return "closed"
+        return "open" if time.time() - opened < self.cooldown else "half-open"
+
+    def is_open(self) -> bool:
+        """whether calls currently fail fast"""
+        return self.get_state() == "open"
+
+    def before_call(self) -> Tuple[int, bool]:
+        """
+        raise CircuitOpen if the call may not be made; return the number of
+        failures so far and whether the call probes a half-open breaker, to be
+        passed to after_call
+        """
+        if not self.enabled:
+            return (0, False)
+        cache = get_cache()
+        state = cache.get_many([self.failures_key, self.opened_key])
+        failures = state.get(self.failures_key, 0)
+        opened = state.get(self.opened_key)
+        if opened is None:
+            return (failures, False)
+        if time.time() - opened < self.cooldown:
+            raise CircuitOpen("The Sharing Configs API is unavailable.")
+        # half-open: only one process probes whether the API is back
+        if not cache.add(self.probe_key, 1, timeout=self.cooldown):
+            raise CircuitOpen("The Sharing Configs API is unavailable.")
+        return (failures, True)
+
+    def after_call(
+        self,
+        state: Tuple[int, bool],
+        status: Optional[int],
+        error: Optional[Exception],
+    ) -> None:
+        """
+        record the outcome of a call; connection errors and 5xx responses are
+        failures, any other response shows the API is available
+        """
+        if not self.enabled:
+            return
+        failures, probing = state
+        failed = isinstance(error, ApiException) and (status is None or status >= 500)
+        if failed:
+            self.record_failure(probing)
+        elif failures or probing:
+            get_cache().delete_many(
+                [self.failures_key, self.opened_key, self.probe_key]
+            )
+            if probing:
+                logger.info("The Sharing Configs API is available again.")
+
+    def record_failure(self, probing: bool = False) -> None:
+        cache = get_cache()
+        if probing:
+            failures = self.threshold
+        else:
+            cache.add(self.failures_key, 0, timeout=self.cooldown)
+            try:
+                failures = cache.incr(self.failures_key)
+            except ValueError:
+                # expired between add and incr
+                failures = 1
+        if failures >= self.threshold:
+            cache.set(self.opened_key, time.time(), timeout=None)
+            cache.delete_many([self.failures_key, self.probe_key])
+            logger.warning(
+                "The Sharing Configs API failed %d times, failing fast for %s s.",
+                failures,
+                self.cooldown,
+            )
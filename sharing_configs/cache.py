@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Mapping, Optional
+from urllib.parse import quote, urlencode
+
+from django.core.cache import caches
+
+from .conf import get_setting
+from .exceptions import ApiException
+
+logger = logging.getLogger(__name__)
+
+# refreshes stale lists of folders outside of the request/response cycle
+revalidation_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def get_cache():
+    return caches[get_setting("CACHE_ALIAS")]
+
+
+def get_folders_version_key(label: str) -> str:
+    return f"sharing_configs:folders:{quote(label)}:version"
+
+
+def get_folders_version(label: str) -> int:
+    cache = get_cache()
+    version_key = get_folders_version_key(label)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, 1, timeout=None)
+        version = cache.get(version_key, 1)
+    return version
+
+
+def get_folders_cache_key(label: str, permission: Optional[str]) -> str:
+    """cache key of the folders of a label; changes when the cache is invalidated"""
+    version = get_folders_version(label)
+    return f"sharing_configs:folders:{quote(label)}:{version}:{permission or ''}"
+
+
+def get_files_index_cache_key(label: str, folder: str) -> str:
+    """
+    cache key of the file index of a folder; changes when the folders cache of
+    the label is invalidated, e.g. by an export
+    """
+    version = get_folders_version(label)
+    return f"sharing_configs:files:{quote(label)}:{version}:{quote(folder)}"
+
+
+def get_catalog_synced_key(label: str) -> str:
+    return f"sharing_configs:catalog:{quote(label)}:synced"
+
+
+def get_catalog_changed_key(label: str, folder: str) -> str:
+    """cache key of the time a folder was changed since the catalog synced it"""
+    return f"sharing_configs:catalog:{quote(label)}:changed:{quote(folder)}"
+
+
+def invalidate_folders_cache(label: str, folder: Optional[str] = None) -> None:
+    """
+    drop the cached folders of a label for all permissions; the files of the
+    changed folder are read from the API until the local catalog synced it again
+    """
+    cache = get_cache()
+    if folder is not None:
+        cache.set(get_catalog_changed_key(label, folder), time.time(), timeout=None)
+    try:
+        cache.incr(get_folders_version_key(label))
+    except ValueError:
+        # nothing has been cached for this label yet
+        pass
+
+
+def get_cached_folders_choices(
+    label: str,
+    permission: Optional[str],
+    fetch: Callable[[], list],
+    refetch: Optional[Callable[[], list]] = None,
+) -> list:
+    """
+    return the folder choices of a label from cache; fetch them when missing.
+    An expired entry is still returned while it is refreshed in the background,
+    with refetch if given.
+    """
+    cache = get_cache()
+    key = get_folders_cache_key(label, permission)
+    entry = cache.get(key)
+
+    if entry is None:
+        return _store(key, fetch())
+
+    if entry["expires"] <= time.time() and cache.add(f"{key}:lock", 1, timeout=60):
+        revalidation_executor.submit(_revalidate, key, refetch or fetch)
+    return entry["choices"]
+
+
+def _store(key: str, choices: list) -> list:
+    timeout = get_setting("FOLDERS_CACHE_TIMEOUT")
+    stale_timeout = get_setting("FOLDERS_CACHE_STALE_TIMEOUT")
+    entry = {"choices": choices, "expires": time.time() + timeout}
+    get_cache().set(key, entry, timeout=timeout + stale_timeout)
+    return choices
+
+
+def _revalidate(key: str, fetch: Callable[[], list]) -> None:
+    try:
+        _store(key, fetch())
+    except ApiException as err:
+        logger.warning("Could not refresh folders: %s", err)
+    finally:
+        get_cache().delete(f"{key}:lock")
+
+
+def get_response_cache_key(url: str, params: Optional[dict], api_key: str) -> str:
+    """cache key of an API response; credentials are part of the key"""
+    query = urlencode(sorted((params or {}).items()))
+    digest = hashlib.sha256(f"{api_key} {url}?{query}".encode("utf-8")).hexdigest()
+    return f"sharing_configs:response:{digest}"
+
+
+def get_cached_response(key: str) -> Optional[dict]:
+    """
+    return the cached response as a dict with the validators ("etag",
+    "last_modified"), the parsed "body" and the time it "expires"
+    """
+    return get_cache().get(key)
+
+
+def get_conditional_headers(entry: dict) -> dict:
+    """request headers to revalidate a cached response"""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def get_max_age(headers: Mapping) -> Optional[int]:
+    """
+    return the max-age of a response in seconds or None if it may not be cached;
+    responses without Cache-Control have to be revalidated (max-age 0)
+    """
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _sep, value = directive.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    try:
+        return max(int(directives.get("max-age", 0)), 0)
+    except ValueError:
+        return 0
+
+
+def store_response(key: str, headers: Mapping, body, entry: Optional[dict] = None):
+    """
+    cache a 200 response, or refresh the entry revalidated by a 304 response;
+    responses without validators or freshness are not stored
+    """
+    max_age = get_max_age(headers)
+    if max_age is None:
+        get_cache().delete(key)
+        return
+    etag = headers.get("ETag") or (entry or {}).get("etag")
+    last_modified = headers.get("Last-Modified") or (entry or {}).get("last_modified")
+    if not (etag or last_modified or max_age):
+        return
+    new_entry = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "body": body,
+        "expires": time.time() + max_age,
+    }
+    timeout = max(get_setting("RESPONSE_CACHE_TIMEOUT"), max_age)
+    get_cache().set(key, new_entry, timeout=timeout)
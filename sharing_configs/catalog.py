@@ -0,0 +1,336 @@
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone as dt_timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .backends import BaseBackend, get_client
+from .cache import get_cache, get_catalog_changed_key, get_catalog_synced_key
+from .conf import get_setting
+from .exceptions import ApiException
+from .models import CatalogFile, CatalogFolder
+
+logger = logging.getLogger(__name__)
+
+# fields of CatalogFile taken from the items of the file listing
+FILE_FIELDS = ("key", "size", "author", "modified")
+
+# syncs the catalog periodically, apart from the revalidation of the folders cache
+sync_executor = ThreadPoolExecutor(max_workers=1)
+
+
+class SyncResult:
+    """numbers of changed rows of a sync of the catalog"""
+
+    def __init__(self) -> None:
+        self.folders_created = 0
+        self.folders_updated = 0
+        self.folders_deleted = 0
+        self.folders_unchanged = 0
+        self.files_created = 0
+        self.files_updated = 0
+        self.files_deleted = 0
+        # paths of the folders whose files could not be listed
+        self.failed = []
+
+
+def iter_remote_folders(
+    results: list,
+) -> Iterator[Tuple[str, str, Optional[str], str]]:
+    """
+    yield (path, name, parent path, permission) of the nested folders of the
+    folder listing in depth-first order; folders without a permission have the
+    permission of their parent
+    """
+    stack = [(None, "", item) for item in reversed(results)]
+    while stack:
+        parent, parent_permission, item = stack.pop()
+        name = item["name"]
+        path = f"{parent}/{name}" if parent is not None else name
+        permission = item.get("permission") or parent_permission
+        yield path, name, parent, permission
+        children = item.get("children") or ()
+        stack.extend((path, permission, child) for child in reversed(children))
+
+
+def get_file_values(item: dict) -> dict:
+    """values of a CatalogFile from an item of the file listing"""
+    try:
+        size = int(item["size"])
+    except (KeyError, TypeError, ValueError):
+        size = None
+    try:
+        modified = parse_datetime(item.get("modified") or "")
+    except ValueError:
+        modified = None
+    if modified is not None:
+        if settings.USE_TZ and timezone.is_naive(modified):
+            modified = timezone.make_aware(modified, dt_timezone.utc)
+        elif not settings.USE_TZ and timezone.is_aware(modified):
+            modified = timezone.make_naive(modified)
+    return {
+        "key": item["filename"].casefold(),
+        "size": size,
+        "author": item.get("author") or "",
+        "modified": modified,
+    }
+
+
+def sync_folders(client: BaseBackend, result: SyncResult) -> List[CatalogFolder]:
+    """mirror the folder tree of the label; return the folders in listing order"""
+    max_length = CatalogFolder._meta.get_field("path").max_length
+    remote = []
+    for path, name, parent, permission in iter_remote_folders(
+        list(client.iter_folders(None))
+    ):
+        # the paths of sub-folders are longer, so they are skipped as well
+        if len(path) > max_length:
+            logger.warning("Could not sync the folder %s: its path is too long", path)
+            continue
+        remote.append((path, name, parent, permission))
+    with transaction.atomic():
+        existing = {
+            folder.path: folder
+            for folder in CatalogFolder.objects.filter(label=client.label)
+        }
+        synced = {}
+        for position, (path, name, parent, permission) in enumerate(remote):
+            if path in synced:
+                continue
+            values = {
+                "name": name,
+                "parent_id": synced[parent].pk if parent is not None else None,
+                "permission": permission,
+                "position": position,
+            }
+            folder = existing.pop(path, None)
+            if folder is None:
+                folder = CatalogFolder.objects.create(
+                    label=client.label, path=path, **values
+                )
+                result.folders_created += 1
+            elif any(
+                getattr(folder, field) != value for field, value in values.items()
+            ):
+                for field, value in values.items():
+                    setattr(folder, field, value)
+                folder.save(update_fields=list(values))
+                result.folders_updated += 1
+            synced[path] = folder
+        # the files and sub-folders of removed folders are removed with them
+        CatalogFolder.objects.filter(
+            pk__in=[folder.pk for folder in existing.values()]
+        ).delete()
+        result.folders_deleted += len(existing)
+    return list(synced.values())
+
+
+def sync_files(
+    client: BaseBackend, folder: CatalogFolder, result: SyncResult, full: bool = False
+) -> None:
+    """
+    mirror the files of a folder; only the changed rows are written, and
+    nothing at all if the listing did not change since the last sync
+    """
+    started = time.time()
+    items = [item for item in client.iter_files(folder.path) if item.get("filename")]
+    listing = json.dumps(items, sort_keys=True, default=str).encode("utf-8")
+    files_hash = hashlib.sha256(listing).hexdigest()
+    if not full and folder.synced is not None and folder.files_hash == files_hash:
+        result.folders_unchanged += 1
+        mark_folder_synced(client.label, folder.path, started)
+        return
+
+    with transaction.atomic():
+        existing = {file.filename: file for file in folder.files.all()}
+        created, updated, seen = [], [], set()
+        for item in items:
+            filename = item["filename"]
+            if filename in seen:
+                continue
+            seen.add(filename)
+            values = get_file_values(item)
+            file = existing.pop(filename, None)
+            if file is None:
+                created.append(CatalogFile(folder=folder, filename=filename, **values))
+            elif any(getattr(file, field) != values[field] for field in FILE_FIELDS):
+                for field in FILE_FIELDS:
+                    setattr(file, field, values[field])
+                updated.append(file)
+        CatalogFile.objects.bulk_create(created, batch_size=500)
+        CatalogFile.objects.bulk_update(updated, FILE_FIELDS, batch_size=500)
+        CatalogFile.objects.filter(
+            pk__in=[file.pk for file in existing.values()]
+        ).delete()
+        folder.files_hash = files_hash
+        folder.synced = timezone.now()
+        folder.save(update_fields=["files_hash", "synced"])
+    result.files_created += len(created)
+    result.files_updated += len(updated)
+    result.files_deleted += len(existing)
+    mark_folder_synced(client.label, folder.path, started)
+
+
+def mark_folder_synced(label: str, folder: str, started: float) -> None:
+    """forget an export to the folder before its files were listed"""
+    cache = get_cache()
+    key = get_catalog_changed_key(label, folder)
+    changed = cache.get(key)
+    if changed is not None and changed <= started:
+        cache.delete(key)
+
+
+def sync_catalog(
+    client: Optional[BaseBackend] = None,
+    folders: Optional[Iterable[str]] = None,
+    full: bool = False,
+) -> SyncResult:
+    """
+    mirror the folders and files of the label of the config in the local catalog;
+    with folders, only the files of those folders are synced. A folder whose
+    files cannot be listed keeps the files of its last sync.
+    """
+    client = client or get_client()
+    result = SyncResult()
+    folders = set(folders) if folders is not None else None
+    for folder in sync_folders(client, result):
+        if folders is not None and folder.path not in folders:
+            continue
+        try:
+            sync_files(client, folder, result, full=full)
+        except ApiException as exc:
+            logger.warning("Could not sync the files of %s: %s", folder.path, exc)
+            result.failed.append(folder.path)
+    if folders is None:
+        get_cache().set(get_catalog_synced_key(client.label), time.time(), timeout=None)
+    return result
+
+
+def _sync_in_background(label: str) -> None:
+    key = get_catalog_synced_key(label)
+    try:
+        sync_catalog()
+    except ApiException as exc:
+        logger.warning("Could not sync the catalog: %s", exc)
+    except Exception:
+        logger.exception("Could not sync the catalog")
+    finally:
+        get_cache().delete(f"{key}:lock")
+        close_old_connections()
+
+
+def maybe_sync_catalog(label: str) -> None:
+    """
+    the periodic hook: sync the catalog in the background when its last sync is
+    older than SHARING_CONFIGS_CATALOG_SYNC_INTERVAL
+    """
+    interval = get_setting("CATALOG_SYNC_INTERVAL")
+    if interval is None:
+        return
+    cache = get_cache()
+    key = get_catalog_synced_key(label)
+    synced = cache.get(key)
+    if synced is not None and time.time() - synced < interval:
+        return
+    if cache.add(f"{key}:lock", 1, timeout=max(interval, 60)):
+        sync_executor.submit(_sync_in_background, label)
+
+
+def is_catalog_used(label: str) -> bool:
+    """whether the folders and files are read from the catalog instead of the API"""
+    if not get_setting("CATALOG"):
+        return False
+    maybe_sync_catalog(label)
+    return CatalogFolder.objects.filter(label=label).exists()
+
+
+def get_catalog_folders_choices(
+    label: str, permission: Optional[str]
+) -> Optional[list]:
+    """
+    return the folder choices of a label from the catalog, like the choices from
+    the API; only the writable folders for the write permission. None if the
+    catalog is not used.
+    """
+    if not is_catalog_used(label):
+        return None
+    folders = CatalogFolder.objects.filter(label=label)
+    if permission == "write":
+        folders = folders.filter(permission="write")
+    paths = folders.order_by("position").values_list("path", flat=True)
+    return [(path, path) for path in paths]
+
+
+class CatalogMatches:
+    """
+    the filenames of a catalog folder matching a search term, prefix matches
+    first; only the sliced rows are read from the database
+    """
+
+    def __init__(self, folder: CatalogFolder, q: str) -> None:
+        key = q.casefold()
+        files = folder.files.order_by("key", "filename")
+        self.prefix = files.filter(key__startswith=key)
+        if key:
+            self.contained = files.filter(key__contains=key).exclude(
+                key__startswith=key
+            )
+        else:
+            self.contained = files.none()
+        self._counts = None
+
+    @property
+    def counts(self) -> Tuple[int, int]:
+        if self._counts is None:
+            self._counts = (self.prefix.count(), self.contained.count())
+        return self._counts
+
+    def __len__(self) -> int:
+        return sum(self.counts)
+
+    def __getitem__(self, index: slice) -> List[str]:
+        start, stop, _step = index.indices(len(self))
+        prefix_count = self.counts[0]
+        names = []
+        if start < prefix_count:
+            names += self.prefix[start:stop].values_list("filename", flat=True)
+        if stop > prefix_count:
+            contained = self.contained[
+                max(start - prefix_count, 0) : stop - prefix_count
+            ]
+            names += contained.values_list("filename", flat=True)
+        return names
+
+
+class CatalogFileIndex:
+    """search of the files of a catalog folder, like utils.FileIndex"""
+
+    def __init__(self, folder: CatalogFolder) -> None:
+        self.folder = folder
+
+    def search(self, q: str) -> CatalogMatches:
+        return CatalogMatches(self.folder, q)
+
+
+def get_catalog_files_index(label: str, folder: str) -> Optional[CatalogFileIndex]:
+    """
+    return the file index of a folder in the catalog; None if the catalog is not
+    used or the files of the folder have not been synced since it was exported to
+    """
+    if not is_catalog_used(label):
+        return None
+    if get_cache().get(get_catalog_changed_key(label, folder)) is not None:
+        return None
+    catalog_folder = CatalogFolder.objects.filter(
+        label=label, path=folder, synced__isnull=False
+    ).first()
+    if catalog_folder is None:
+        return None
+    return CatalogFileIndex(catalog_folder)
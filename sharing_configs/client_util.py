@@ -1,16 +1,109 @@
-from typing import Optional
-from urllib.parse import urljoin
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from sharing_configs.models import SharingConfigsConfig
 
+from .backends import BaseBackend, aget_config, aiter_results, get_config
+from .breaker import CircuitBreaker, CircuitOpen
+from .cache import (
+    get_cached_response,
+    get_conditional_headers,
+    get_response_cache_key,
+    invalidate_folders_cache,
+    store_response,
+)
+from .coalesce import SingleFlight, coalesce
+from .conf import get_setting
 from .exceptions import ApiException
+from .files import (
+    ExportPayload,
+    FileSpool,
+    ImportedFile,
+    acompress_chunks,
+    compress_chunks,
+    get_accept_encoding,
+    get_body_chunks,
+    get_content_length,
+)
+from .metrics import ApiCall
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # pragma: no cover
+    sync_to_async = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (502, 503, 504)
+RETRY_BACKOFF_FACTOR = 0.3
+CHUNK_SIZE = 64 * 1024
+# ports of urls without one, to compare them with the API endpoint
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+# API endpoints that answered a compressed request body with 415
+_uncompressed_endpoints = set()
+# GET requests in flight, shared by concurrent identical calls
+_in_flight = SingleFlight()
+
+
+def get_session(config: SharingConfigsConfig) -> requests.Session:
+    """
+    return a keep-alive session shared by all clients in this process;
+    one session is kept per pool size and retry policy
+    """
+    key = (config.pool_size, config.max_retries)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            retries = Retry(
+                total=config.max_retries,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=config.pool_size,
+                pool_maxsize=config.pool_size,
+                max_retries=retries,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+    return session
+
+
+class BaseSharingConfigsClient:
+    """url building and credentials shared by the sync and async clients"""
 
+    # urls of the operations, as reported with the api_call signal
+    url_templates = {
+        "get_folders": "config/{label}/folder/",
+        "get_files": "config/{label}/folder/{folder}/files/",
+        "import_file": "config/{label}/folder/{folder}/files/{filename}",
+        "export": "config/{label}/folder/{folder}/files/",
+    }
 
-class SharingConfigsClient:
-    def __init__(self) -> None:
-        self.config = SharingConfigsConfig.get_solo()
+    def __init__(self, config: Optional[SharingConfigsConfig] = None) -> None:
+        self.config = config or get_config()
         self.label = self.config.label
         label_url = f"config/{str(self.label)}/folder/"
         self.base_url = urljoin(self.config.api_endpoint, label_url)
@@ -18,6 +111,30 @@ class SharingConfigsClient:
             "content-type": "application/json",
             "authorization": f"Token {self.config.api_key}",
         }
+        self.timeout = (self.config.connect_timeout, self.config.read_timeout)
+        self.compression = self.config.compression
+        self.breaker = CircuitBreaker(self.config.api_endpoint)
+        if self.compression:
+            self.headers["accept-encoding"] = get_accept_encoding(self.compression)
+
+    def is_available(self) -> bool:
+        """whether calls are made, or fail fast because the API is down"""
+        return not self.breaker.is_open()
+
+    def compress_uploads(self) -> bool:
+        """whether to compress request bodies; off once the API rejected them"""
+        return (
+            bool(self.compression)
+            and self.config.api_endpoint not in _uncompressed_endpoints
+        )
+
+    def fall_back_to_uncompressed(self, data: Union[dict, ExportPayload]) -> bool:
+        """
+        remember that the API does not accept compressed bodies;
+        return whether the upload can be sent again uncompressed
+        """
+        _uncompressed_endpoints.add(self.config.api_endpoint)
+        return not isinstance(data, ExportPayload) or data.seekable()
 
     def get_list_folders_url(self) -> str:
         """url to get available folders and subfolders"""
@@ -36,68 +153,469 @@ class SharingConfigsClient:
         """url to upload a file"""
         return urljoin(self.base_url, f"{folder}/files/")
 
-    def export(self, folder, data) -> dict:
+    def get_next_url(self, page: dict) -> Optional[str]:
         """
-        expect path required param folder
+        return the "next" link of a page of a listing; links outside the API
+        endpoint are not followed, as the API key would be sent along
         """
+        next_url = page.get("next")
+        if not next_url:
+            return None
+        next_url = urljoin(self.base_url, next_url)
+        if not is_within_endpoint(next_url, self.config.api_endpoint):
+            logger.warning("Not following the next page %s outside the API", next_url)
+            return None
+        return next_url
 
-        try:
-            resp = requests.post(
-                url=self.get_export_url(folder), headers=self.headers, json=data
-            )
-            resp.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.ConnectionError) as e:
-            raise ApiException("Could not export the item due to a connection error.")
+
+def get_origin(url: str) -> Optional[tuple]:
+    """(scheme, host, port) of an url, None if the url has no host or a bad port"""
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return None
+    try:
+        port = parts.port or DEFAULT_PORTS.get(parts.scheme.lower())
+    except ValueError:
+        return None
+    return parts.scheme.lower(), parts.hostname.lower(), port
+
+
+def is_within_endpoint(url: str, api_endpoint: str) -> bool:
+    """whether an url has the scheme, host and port of the endpoint, below its path"""
+    if not api_endpoint:
+        return False
+    origin = get_origin(api_endpoint)
+    if origin is None or get_origin(url) != origin:
+        return False
+    path = urlsplit(api_endpoint).path
+    if not path.endswith("/"):
+        path += "/"
+    return urlsplit(url).path.startswith(path)
+
+
+class SharingConfigsClient(BaseSharingConfigsClient, BaseBackend):
+    def __init__(self, config: Optional[SharingConfigsConfig] = None) -> None:
+        super().__init__(config)
+        self.session = get_session(self.config)
+
+    def export(self, folder, data: Union[dict, ExportPayload]) -> dict:
+        """
+        expect path required param folder; an ExportPayload is streamed
+        """
+        compress = self.compress_uploads()
+        with ApiCall(self, "export", "POST") as call:
+            try:
+                resp = self._post(folder, data, compress, call)
+                if compress and resp.status_code == 415:
+                    if self.fall_back_to_uncompressed(data):
+                        call.retries += 1
+                        resp = self._post(folder, data, False, call)
+                call.received(resp, resp.content)
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                raise ApiException(
+                    "Could not export the item due to a connection error."
+                )
+        invalidate_folders_cache(self.label, folder)
         return resp.json()
 
+    def _post(
+        self,
+        folder,
+        data: Union[dict, ExportPayload],
+        compress: bool,
+        call: Optional[ApiCall] = None,
+    ):
+        if compress:
+            chunks = compress_chunks(get_body_chunks(data), self.compression)
+            body = {
+                "data": call.counted(chunks) if call else chunks,
+                "headers": {**self.headers, "content-encoding": self.compression},
+            }
+        elif isinstance(data, ExportPayload):
+            body = {"data": data, "headers": self.headers}
+        else:
+            body = {"json": data, "headers": self.headers}
+        resp = self.session.post(
+            url=self.get_export_url(folder), timeout=self.timeout, **body
+        )
+        if call and not compress:
+            call.sent(resp.request)
+        return resp
+
     def import_data(self, folder: str, filename: str) -> bytes:
         """expect required path params: label,folder,filename to get binary data from API"""
+        with self.import_file(folder, filename) as file:
+            return file.read()
+
+    def import_file(
+        self, folder: str, filename: str, etag: Optional[str] = None
+    ) -> Optional[ImportedFile]:
+        """
+        download a file in chunks into a (spooled) temporary file;
+        the size and checksum are computed while downloading. With the ETag
+        of a previous download, None is returned if the file did not change.
+        """
+        error = "Could not import the item due to a connection error."
+        headers = (
+            self.headers if etag is None else {**self.headers, "If-None-Match": etag}
+        )
+        with ApiCall(self, "import_file", "GET") as call:
+            try:
+                with self.session.get(
+                    url=self.get_import_url(folder, filename),
+                    headers=headers,
+                    timeout=self.timeout,
+                    stream=True,
+                ) as resp:
+                    call.received(resp)
+                    if resp.status_code == 304:
+                        return None
+                    resp.raise_for_status()
+                    spool = FileSpool(filename, get_content_length(resp.headers))
+                    try:
+                        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                            call.response_bytes += len(chunk)
+                            spool.write(chunk)
+                    except requests.RequestException:
+                        spool.discard()
+                        raise
+            except requests.RequestException as e:
+                raise ApiException(error)
+        return spool.finish(resp.headers.get("ETag"))
 
+    def get_folders(self, permission: Optional[str]) -> dict:
+        """
+        return dict with attr "results" containing list of folders
+        """
+        params = {"permission": permission} if permission is not None else None
+        return self._get_json(
+            "get_folders",
+            self.get_list_folders_url(),
+            "Could not retrieve any folders due to a connection error.",
+            params=params,
+        )
+
+    def get_files(self, folder) -> dict:
+        """
+        expect required path param folder;
+        return dict with attr "results" containing file names
+        """
+        return self._get_json(
+            "get_files",
+            self.get_folder_files_url(folder),
+            "Could not retrieve any files due to a connection error.",
+        )
+
+    def get_page(self, operation: str, url: str) -> dict:
+        return self._get_json(
+            operation,
+            url,
+            "Could not retrieve the next page due to a connection error.",
+        )
+
+    def _get_json(
+        self, operation: str, url: str, error: str, params: Optional[dict] = None
+    ) -> dict:
+        """
+        GET a JSON document; concurrent identical calls of the process share one
+        request, and with SHARING_CONFIGS_COALESCE_ACROSS_PROCESSES those of other
+        processes too
+        """
+        key = get_response_cache_key(url, params, self.config.api_key)
+        timeout = (
+            sum(self.timeout) if get_setting("COALESCE_ACROSS_PROCESSES") else None
+        )
+        return coalesce(
+            _in_flight,
+            key,
+            lambda: self._get_cached_json(key, operation, url, error, params),
+            timeout=timeout,
+        )
+
+    def _get_cached_json(
+        self,
+        key: str,
+        operation: str,
+        url: str,
+        error: str,
+        params: Optional[dict] = None,
+    ) -> dict:
+        """
+        GET a JSON document through the response cache: fresh responses are served
+        without a request, others are revalidated with their ETag/Last-Modified
+        and served from cache on a 304 response or while the API is down
+        """
+        entry = get_cached_response(key)
+        if entry is not None and entry["expires"] > time.time():
+            return entry["body"]
+
+        headers = self.headers
+        if entry is not None:
+            headers = {**self.headers, **get_conditional_headers(entry)}
+        kwargs = {"params": params} if params is not None else {}
         try:
+            with ApiCall(self, operation, "GET") as call:
+                try:
+                    resp = self.session.get(
+                        url=url, headers=headers, timeout=self.timeout, **kwargs
+                    )
+                    call.received(resp, resp.content)
+                    if entry is not None and resp.status_code == 304:
+                        body = entry["body"]
+                    else:
+                        resp.raise_for_status()
+                        body = resp.json()
+                except requests.RequestException as exc:
+                    raise ApiException(error)
+        except CircuitOpen:
+            if entry is None:
+                raise
+            # the API is down, serve the last known response instead
+            return entry["body"]
 
-            resp = requests.get(
-                url=self.get_import_url(folder, filename), headers=self.headers
-            )
+        if resp.status_code in (200, 304):
+            store_response(key, resp.headers, body, entry)
+        return body
 
-            resp.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.ConnectionError) as e:
 
-            raise ApiException("Could not import the item due to a connection error.")
-        return resp.content
+_async_clients = weakref.WeakKeyDictionary()
 
-    def get_folders(self, permission: Optional[str]) -> dict:
+
+def get_async_client(config: SharingConfigsConfig) -> "httpx.AsyncClient":
+    """
+    return a keep-alive httpx client shared by all async clients running in the
+    current event loop; one client is kept per pool size and retry policy
+    """
+    if httpx is None:
+        raise ImproperlyConfigured(
+            "The async client requires httpx, install sharing-configs[async]."
+        )
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    key = (config.pool_size, config.max_retries)
+    client = clients.get(key)
+    if client is None:
+        transport = httpx.AsyncHTTPTransport(
+            retries=config.max_retries,
+            limits=httpx.Limits(
+                max_connections=config.pool_size,
+                max_keepalive_connections=config.pool_size,
+            ),
+        )
+        client = clients[key] = httpx.AsyncClient(transport=transport)
+    return client
+
+
+class AsyncSharingConfigsClient(BaseSharingConfigsClient):
+    """
+    asyncio counterpart of SharingConfigsClient;
+    the config should be passed in when the client is created from async code
+    """
+
+    def __init__(
+        self,
+        config: Optional[SharingConfigsConfig] = None,
+        client: Optional["httpx.AsyncClient"] = None,
+    ) -> None:
+        super().__init__(config)
+        self._client = client
+
+    @classmethod
+    async def create(cls, **kwargs) -> "AsyncSharingConfigsClient":
+        """create a client, loading the config without blocking the event loop"""
+        config = await aget_config()
+        return cls(config, **kwargs)
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            self._client = get_async_client(self.config)
+        return self._client
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        error: str,
+        stream: bool = False,
+        check: bool = True,
+        call: Optional[ApiCall] = None,
+        **kwargs,
+    ):
         """
-        return dict with attr "results" containing list of folders
+        make a request and retry idempotent ones on 502, 503 and 504 responses;
+        connection errors are retried by the transport. With stream, the body is
+        not read and the caller has to close the response. Without check, error
+        responses are returned instead of raised. The call, if any, records the
+        status, sizes and retries.
         """
+        timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        attempts = self.config.max_retries + 1 if method == "GET" else 1
+        for attempt in range(attempts):
+            request = self.client.build_request(
+                method, url, headers=headers, timeout=timeout, **kwargs
+            )
+            if call is not None:
+                if attempt:
+                    call.retries += 1
+                call.sent(request)
+            try:
+                resp = await self.client.send(request, stream=stream)
+            except httpx.HTTPError:
+                raise ApiException(error)
+            if call is not None:
+                call.received(resp, None if stream else resp.content)
+            if resp.status_code not in RETRY_STATUS_CODES or attempt == attempts - 1:
+                break
+            await resp.aclose()
+            await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2**attempt))
+        if not check:
+            return resp
         try:
-            if permission is not None:
-                resp = requests.get(
-                    url=self.get_list_folders_url(),
-                    headers=self.headers,
-                    params={"permission": permission},
-                )
-            else:
-                resp = requests.get(
-                    url=self.get_list_folders_url(), headers=self.headers
-                )
             resp.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.ConnectionError) as exc:
-            raise ApiException(
-                "Could not retrieve any folders due to a connection error."
+        except httpx.HTTPStatusError:
+            await resp.aclose()
+            raise ApiException(error)
+        return resp
+
+    async def export(self, folder, data: Union[dict, ExportPayload]) -> dict:
+        """
+        expect path required param folder; an ExportPayload is streamed
+        """
+        error = "Could not export the item due to a connection error."
+        compress = self.compress_uploads()
+        with ApiCall(self, "export", "POST") as call:
+            resp = await self._post(folder, data, error, compress, call)
+            if compress and resp.status_code == 415:
+                if self.fall_back_to_uncompressed(data):
+                    call.retries += 1
+                    resp = await self._post(folder, data, error, False, call)
+            try:
+                resp.raise_for_status()
+            except httpx.HTTPStatusError:
+                raise ApiException(error)
+        await sync_to_async(invalidate_folders_cache)(self.label, folder)
+        return resp.json()
+
+    async def _post(
+        self,
+        folder,
+        data,
+        error: str,
+        compress: bool,
+        call: Optional[ApiCall] = None,
+    ):
+        if compress:
+            chunks = acompress_chunks(get_body_chunks(data), self.compression)
+            body = {
+                "content": call.acounted(chunks) if call else chunks,
+                "headers": {"content-encoding": self.compression},
+            }
+        elif isinstance(data, ExportPayload):
+            length = data.len
+            headers = {} if length is None else {"Content-Length": str(length)}
+            body = {"content": data.aiter_bytes(), "headers": headers}
+        else:
+            body = {"json": data}
+        return await self._request(
+            "POST", self.get_export_url(folder), error, check=False, call=call, **body
+        )
+
+    async def import_data(self, folder: str, filename: str) -> bytes:
+        """expect required path params: label,folder,filename to get binary data from API"""
+        with await self.import_file(folder, filename) as file:
+            return file.read()
+
+    async def import_file(
+        self, folder: str, filename: str, etag: Optional[str] = None
+    ) -> Optional[ImportedFile]:
+        """
+        download a file in chunks into a (spooled) temporary file;
+        the size and checksum are computed while downloading. With the ETag
+        of a previous download, None is returned if the file did not change.
+        """
+        error = "Could not import the item due to a connection error."
+        with ApiCall(self, "import_file", "GET") as call:
+            resp = await self._request(
+                "GET",
+                self.get_import_url(folder, filename),
+                error,
+                stream=True,
+                check=False,
+                call=call,
+                headers={} if etag is None else {"If-None-Match": etag},
             )
+            if resp.status_code == 304:
+                await resp.aclose()
+                return None
+            try:
+                resp.raise_for_status()
+            except httpx.HTTPStatusError:
+                await resp.aclose()
+                raise ApiException(error)
+            try:
+                spool = FileSpool(filename, get_content_length(resp.headers))
+                try:
+                    async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                        call.response_bytes += len(chunk)
+                        spool.write(chunk)
+                except httpx.HTTPError:
+                    spool.discard()
+                    raise ApiException(error)
+            finally:
+                await resp.aclose()
+        return spool.finish(resp.headers.get("ETag"))
 
+    async def get_folders(self, permission: Optional[str]) -> dict:
+        """
+        return dict with attr "results" containing list of folders
+        """
+        params = {"permission": permission} if permission is not None else None
+        with ApiCall(self, "get_folders", "GET") as call:
+            resp = await self._request(
+                "GET",
+                self.get_list_folders_url(),
+                "Could not retrieve any folders due to a connection error.",
+                call=call,
+                params=params,
+            )
         return resp.json()
 
-    def get_files(self, folder) -> dict:
+    async def get_files(self, folder) -> dict:
         """
         expect required path param folder;
         return dict with attr "results" containing file names
         """
-        resp = requests.get(self.get_folder_files_url(folder), headers=self.headers)
-        try:
-            resp.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.ConnectionError) as exc:
-            raise ApiException(
-                "Could not retrieve any files due to a connection error."
+        with ApiCall(self, "get_files", "GET") as call:
+            resp = await self._request(
+                "GET",
+                self.get_folder_files_url(folder),
+                "Could not retrieve any files due to a connection error.",
+                call=call,
+            )
+        return resp.json()
+
+    async def get_page(self, operation: str, url: str) -> dict:
+        with ApiCall(self, operation, "GET") as call:
+            resp = await self._request(
+                "GET",
+                url,
+                "Could not retrieve the next page due to a connection error.",
+                call=call,
             )
         return resp.json()
+
+    def iter_folders(self, permission: Optional[str]) -> AsyncIterator[dict]:
+        """
+        yield the (top level) folders, following the pages of the listing lazily
+        """
+        return aiter_results(self, "get_folders", lambda: self.get_folders(permission))
+
+    def iter_files(self, folder: str) -> AsyncIterator[dict]:
+        """
+        yield the file items of a folder, following the pages of the listing
+        lazily
+        """
+        return aiter_results(self, "get_files", lambda: self.get_files(folder))
@@ -0,0 +1,89 @@
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .cache import get_cache
+
+# seconds the result of a call is kept for the processes waiting for it
+SHARED_RESULT_TIMEOUT = 10
+# seconds between the checks of a process waiting for the result of another one
+POLL_INTERVAL = 0.05
+
+
+class SingleFlight:
+    """
+    concurrent calls with the same key share a single call in flight: the first
+    caller makes the call, the others wait for its result or exception
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, func: Callable):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            # the result is copied, so a caller changing it does not affect others
+            return copy.deepcopy(future.result())
+
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def share_across_processes(key: str, func: Callable, timeout: float):
+    """
+    make a call in one process at a time: while another process holds the lock
+    of the key, wait up to timeout seconds for the result it shares through the
+    cache. If it failed or did not finish in time, the call is made here, so
+    errors are raised in every process as without sharing.
+    """
+    cache = get_cache()
+    lock_key = f"{key}:flight"
+    result_key = f"{key}:flight:result"
+    if not cache.add(lock_key, 1, timeout=max(int(timeout) + 1, 1)):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            # the result is stored before the lock is released
+            locked = cache.get(lock_key) is not None
+            entry = cache.get(result_key)
+            if entry is not None:
+                return entry["result"]
+            if not locked:
+                break
+        return func()
+
+    try:
+        cache.delete(result_key)
+        result = func()
+        cache.set(result_key, {"result": result}, timeout=SHARED_RESULT_TIMEOUT)
+        return result
+    finally:
+        cache.delete(lock_key)
+
+
+def coalesce(
+    flight: SingleFlight, key: str, func: Callable, timeout: Optional[float] = None
+):
+    """
+    make a call shared by the concurrent identical calls of the process, and
+    with a timeout also by those of other processes
+    """
+    if timeout is None:
+        return flight.do(key, func)
+    return flight.do(key, lambda: share_across_processes(key, func, timeout))
@@ -0,0 +1,62 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # alias of the Django cache used by sharing configs
+    "CACHE_ALIAS": "default",
+    # seconds the list of folders is served from cache without asking the API
+    "FOLDERS_CACHE_TIMEOUT": 300,
+    # seconds an expired list of folders is still served while it is refreshed
+    "FOLDERS_CACHE_STALE_TIMEOUT": 3600,
+    # seconds the sorted filenames of a folder are cached for the file picker
+    "FILES_INDEX_CACHE_TIMEOUT": 60,
+    # whether the forms and the file picker read the folders and files from the
+    # local catalog instead of the API, once it has been synced
+    "CATALOG": False,
+    # seconds after which reading the catalog syncs it in the background, None to
+    # only sync it with the sharing_configs_sync_catalog command
+    "CATALOG_SYNC_INTERVAL": None,
+    # number of filenames the file picker shows at once
+    "FILE_PICKER_PAGE_SIZE": 50,
+    # seconds a form is validated against the folders it was rendered with
+    "FOLDERS_SNAPSHOT_MAX_AGE": 600,
+    # seconds API responses with an ETag or Last-Modified are kept for revalidation
+    "RESPONSE_CACHE_TIMEOUT": 24 * 60 * 60,
+    # number of concurrent uploads or downloads of a bulk export or import
+    "MAX_WORKERS": 4,
+    # maximum size in bytes of an imported file, None for no limit
+    "IMPORT_MAX_SIZE": 50 * 1024 * 1024,
+    # size in bytes from which a downloaded file is spooled to disk
+    "IMPORT_SPOOL_SIZE": 1024 * 1024,
+    # dotted path of the executor running background jobs
+    "JOB_EXECUTOR": "sharing_configs.jobs.ThreadPoolJobExecutor",
+    # number of background jobs run concurrently by the thread pool executor
+    "JOB_WORKERS": 2,
+    # whether the built-in aggregator collects metrics of the calls to the API
+    "COLLECT_METRICS": True,
+    # bearer token Prometheus sends to read the metrics, besides staff users
+    "METRICS_TOKEN": None,
+    # seconds the config is memoised before checking whether another process saved it
+    "CONFIG_CHECK_INTERVAL": 5,
+    # whether identical concurrent GET requests are shared by processes through the
+    # cache, besides by the threads of a process
+    "COALESCE_ACROSS_PROCESSES": False,
+    # failed calls within the cooldown after which the API is not called, 0 to disable
+    "CIRCUIT_BREAKER_THRESHOLD": 5,
+    # seconds calls fail fast once the circuit breaker opened
+    "CIRCUIT_BREAKER_COOLDOWN": 30,
+    # dotted paths of the classes of the backends selectable in the config
+    "BACKENDS": {
+        "api": "sharing_configs.client_util.SharingConfigsClient",
+        "filesystem": "sharing_configs.backends.FilesystemBackend",
+    },
+    # dotted paths of the classes of the backends used by the async views
+    "ASYNC_BACKENDS": {
+        "api": "sharing_configs.client_util.AsyncSharingConfigsClient",
+        "filesystem": "sharing_configs.backends.AsyncFilesystemBackend",
+    },
+}
+
+
+def get_setting(name: str):
+    """return the SHARING_CONFIGS_<name> Django setting or its default"""
+    return getattr(settings, f"SHARING_CONFIGS_{name}", DEFAULTS[name])
@@ -0,0 +1,242 @@
+import base64
+import hashlib
+import json
+import zlib
+from tempfile import SpooledTemporaryFile
+from typing import IO, AsyncIterator, Iterator, Optional, Union
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+
+from .conf import get_setting
+from .exceptions import ApiException
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class ImportedFile(File):
+    """
+    downloaded file, kept in memory when small and spooled to disk otherwise,
+    with its size, sha256 checksum and the ETag of the remote file
+    """
+
+    def __init__(
+        self, file, name: str, size: int, checksum: str, etag: Optional[str] = None
+    ) -> None:
+        super().__init__(file, name)
+        self.size = size
+        self.checksum = checksum
+        self.etag = etag
+
+
+class FileSpool:
+    """
+    collect the chunks of a download into an ImportedFile, computing the size and
+    checksum on the fly and enforcing the maximum import size
+    """
+
+    def __init__(self, name: str, expected_size: Optional[int] = None) -> None:
+        self.name = name
+        self.max_size = get_setting("IMPORT_MAX_SIZE")
+        self.size = 0
+        self._checksum = hashlib.sha256()
+        self._file = SpooledTemporaryFile(max_size=get_setting("IMPORT_SPOOL_SIZE"))
+        if expected_size is not None:
+            self._check_size(expected_size)
+
+    def _check_size(self, size: int) -> None:
+        if self.max_size is not None and size > self.max_size:
+            self.discard()
+            raise ApiException(
+                f"The file {self.name} is larger than the maximum import size."
+            )
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        self._check_size(self.size)
+        self._checksum.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self, etag: Optional[str] = None) -> ImportedFile:
+        self._file.seek(0)
+        return ImportedFile(
+            self._file, self.name, self.size, self._checksum.hexdigest(), etag
+        )
+
+    def discard(self) -> None:
+        self._file.close()
+
+
+def get_content_length(headers) -> Optional[int]:
+    try:
+        return int(headers["Content-Length"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ExportPayload:
+    """
+    JSON body of an export, sent as a stream: the content is base64 encoded
+    chunk by chunk from bytes or a file-like object, so neither the encoded
+    content nor the JSON document is held in memory at once
+    """
+
+    # a multiple of 3, so the encoded chunks can be concatenated without padding
+    chunk_size = 48 * 1024
+
+    def __init__(
+        self,
+        content: Union[bytes, IO[bytes]],
+        filename: str,
+        author: str,
+        overwrite: bool = False,
+    ) -> None:
+        self.content = content
+        self.filename = filename
+        self.author = author
+        self.overwrite = overwrite
+        self._start = None
+        if not isinstance(content, (bytes, bytearray, memoryview)):
+            if content.seekable():
+                self._start = content.tell()
+
+    def _head(self) -> bytes:
+        head = json.dumps(
+            {
+                "overwrite": self.overwrite,
+                "author": self.author,
+                "filename": self.filename,
+            }
+        )
+        return f'{head[:-1]}, "content": "'.encode("utf-8")
+
+    def seekable(self) -> bool:
+        """whether the body can be sent more than once"""
+        return (
+            isinstance(self.content, (bytes, bytearray, memoryview))
+            or self._start is not None
+        )
+
+    @property
+    def len(self) -> Optional[int]:
+        """size of the body in bytes, None if the content is not seekable"""
+        if isinstance(self.content, (bytes, bytearray, memoryview)):
+            size = len(self.content)
+        elif self._start is not None:
+            end = self.content.seek(0, 2)
+            self.content.seek(self._start)
+            size = end - self._start
+        else:
+            return None
+        return len(self._head()) + (size + 2) // 3 * 4 + 2
+
+    def iter_content(self) -> Iterator[bytes]:
+        """the raw content in chunks"""
+        if isinstance(self.content, (bytes, bytearray, memoryview)):
+            view = memoryview(self.content)
+            for start in range(0, len(view), self.chunk_size):
+                yield view[start : start + self.chunk_size]
+            return
+
+        if self._start is not None:
+            self.content.seek(self._start)
+        rest = b""
+        while True:
+            chunk = self.content.read(self.chunk_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            end = len(chunk) - len(chunk) % 3
+            rest = chunk[end:]
+            if end:
+                yield chunk[:end]
+        if rest:
+            yield rest
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head()
+        for chunk in self.iter_content():
+            yield base64.b64encode(chunk)
+        yield b'"}'
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        for chunk in self:
+            yield chunk
+
+
+def zstd_decoding_supported() -> bool:
+    """whether requests (urllib3) and httpx, if installed, decode zstd responses"""
+    try:
+        from urllib3.response import HAS_ZSTD
+    except ImportError:  # urllib3 < 2
+        return False
+    if not HAS_ZSTD:
+        return False
+    try:
+        from httpx._decoders import SUPPORTED_DECODERS
+    except ImportError:  # httpx is not installed
+        return True
+    return "zstd" in SUPPORTED_DECODERS
+
+
+def get_accept_encoding(compression: str) -> str:
+    """
+    value of the Accept-Encoding header for a compression setting; zstd is only
+    asked for when the HTTP libraries can decode it
+    """
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImproperlyConfigured(
+                "zstd compression requires the zstandard package"
+            )
+        if zstd_decoding_supported():
+            return "zstd, gzip"
+    return "gzip"
+
+
+class Compressor:
+    """incremental gzip or zstd compression of a request body"""
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        elif encoding == "zstd":
+            if zstandard is None:
+                raise ImproperlyConfigured(
+                    "zstd compression requires the zstandard package"
+                )
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+        else:
+            raise ValueError(f"Unknown encoding {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def get_body_chunks(data: Union[dict, ExportPayload]) -> Iterator[bytes]:
+    """chunks of the JSON body of an export"""
+    if isinstance(data, ExportPayload):
+        return iter(data)
+    return iter([json.dumps(data).encode("utf-8")])
+
+
+def compress_chunks(chunks, encoding: str) -> Iterator[bytes]:
+    """compress an iterable of chunks into a stream of compressed chunks"""
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def acompress_chunks(chunks, encoding: str) -> AsyncIterator[bytes]:
+    """async variant of compress_chunks"""
+    for data in compress_chunks(chunks, encoding):
+        yield data
@@ -1,13 +1,52 @@
 import logging
+from typing import Optional
 
 from django import forms
+from django.core import signing
 from django.utils.translation import gettext_lazy as _
 
+from .backends import get_client
+from .conf import get_setting
 from .exceptions import ApiException
 from .utils import get_imported_folders_choices
 
 logger = logging.getLogger(__name__)
 
+# name of the hidden input with the signed folder choices a form was rendered with
+FOLDERS_SNAPSHOT_FIELD = "folders_snapshot"
+
+
+def get_folders_snapshot_salt(permission: Optional[str]) -> str:
+    return f"sharing_configs.forms.folders.{permission}"
+
+
+def dump_folders_snapshot(choices: list, permission: Optional[str]) -> str:
+    """sign the folder choices shown in a form"""
+    return signing.dumps(
+        [list(choice) for choice in choices],
+        salt=get_folders_snapshot_salt(permission),
+        compress=True,
+    )
+
+
+def load_folders_snapshot(data, permission: Optional[str]) -> Optional[list]:
+    """
+    return the folder choices of the snapshot submitted with a form, None if
+    there is none or it has been tampered with or expired
+    """
+    value = data.get(FOLDERS_SNAPSHOT_FIELD)
+    if not value:
+        return None
+    try:
+        choices = signing.loads(
+            value,
+            salt=get_folders_snapshot_salt(permission),
+            max_age=get_setting("FOLDERS_SNAPSHOT_MAX_AGE"),
+        )
+    except signing.BadSignature:
+        return None
+    return [tuple(choice) for choice in choices]
+
 
 class FolderForm(forms.Form):
     """
@@ -18,33 +57,99 @@ class FolderForm(forms.Form):
 
     folder = forms.ChoiceField(label=_("Folders"), required=True, choices=[])
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, folder_choices=None, available=True, **kwargs):
         """provide a list of folders(from API) for a drop-down menu based on permission.
-        if api call fails raise custom exception"""
+        if api call fails raise custom exception;
+        folder_choices can be passed when the folders were already retrieved,
+        with whether the API was available then.
+        A bound form is validated against the folders it was rendered with while
+        their signed snapshot has not expired, and renders that same snapshot so
+        its age keeps counting from the first render."""
         super().__init__(*args, **kwargs)
 
+        snapshot_choices = None
+        if self.is_bound:
+            snapshot_choices = load_folders_snapshot(self.data, self.permission)
+        if folder_choices is None:
+            folder_choices = snapshot_choices
+
         folder_list = [(None, _("Choose a folder"))]
-        try:
-            folder_list.extend(get_imported_folders_choices(self.permission))
-        except ApiException as err:
-            logger.exception("Could not retrieve folders: %s" % err)
+        if folder_choices is not None:
+            folder_list.extend(folder_choices)
+        else:
+            try:
+                folder_choices = get_imported_folders_choices(self.permission)
+                folder_list.extend(folder_choices)
+            except ApiException as err:
+                logger.exception("Could not retrieve folders: %s" % err)
+            available = get_client().is_available()
+        if not available:
+            self.fields["folder"].help_text = _(
+                "The Sharing Configs API is currently unavailable. The folders "
+                "shown were retrieved earlier and may be out of date."
+            )
+
+        if not folder_choices:
+            self.folders_snapshot = ""
+        elif folder_choices == snapshot_choices:
+            self.folders_snapshot = self.data[FOLDERS_SNAPSHOT_FIELD]
+        else:
+            self.folders_snapshot = dump_folders_snapshot(
+                folder_choices, self.permission
+            )
 
         self.fields["folder"].choices = folder_list
 
 
+class FileNamesField(forms.Field):
+    """
+    multiple file names; the choices are retrieved by the browser so only
+    empty values are dropped
+    """
+
+    widget = forms.SelectMultiple
+
+    def to_python(self, value) -> list:
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = [value]
+        return [file_name for file_name in value if file_name]
+
+
 class ImportForm(FolderForm):
     """Provide form  with a list of readable folders"""
 
-    file_name = forms.CharField(
+    file_name = FileNamesField(
         label=_("File name"),
-        widget=forms.Select,
         required=True,
-        help_text=_("Select one of the available files from the community."),
+        help_text=_("Select one or more of the available files from the community."),
+    )
+    import_folder = forms.BooleanField(
+        label=_("Import all files"),
+        required=False,
+        initial=False,
+        help_text=_("Import all files in the folder instead of the selected files."),
     )
+    force = forms.BooleanField(
+        label=_("Force"),
+        required=False,
+        initial=False,
+        help_text=_(
+            "Import files even if they have not changed since their last import."
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.is_bound and self.fields["import_folder"].widget.value_from_datadict(
+            self.data, self.files, self.add_prefix("import_folder")
+        ):
+            self.fields["file_name"].required = False
 
     def clean_file_name(self):
         file_name = self.cleaned_data["file_name"]
-        if file_name == "":
+        if not file_name and self.fields["file_name"].required:
             raise forms.ValidationError(_("You must select a file to import."))
         return file_name
 
@@ -66,3 +171,30 @@ class ExportToForm(FolderForm):
         initial=False,
         help_text=_("Overwrite an existing file if present."),
     )
+    force = forms.BooleanField(
+        label=_("Force"),
+        required=False,
+        initial=False,
+        help_text=_("Export even if the object has not changed since its last export."),
+    )
+
+
+class BulkExportForm(FolderForm):
+    """Provide form with a list of writable folders to export several objects to"""
+
+    permission = "write"
+
+    overwrite = forms.BooleanField(
+        label=_("Overwrite"),
+        required=False,
+        initial=False,
+        help_text=_("Overwrite existing files if present."),
+    )
+    force = forms.BooleanField(
+        label=_("Force"),
+        required=False,
+        initial=False,
+        help_text=_(
+            "Export objects even if they have not changed since their last export."
+        ),
+    )
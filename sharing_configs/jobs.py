@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib import messages
+from django.contrib.admin.sites import all_sites
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.html import conditional_escape
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# query parameter of the admin views with the job to show the status of
+JOB_PARAM = "sc_job"
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+class BaseJobExecutor:
+    """
+    Runs background jobs by calling run_job with the id of a job. Subclass it
+    and point SHARING_CONFIGS_JOB_EXECUTOR to the subclass to run jobs with
+    Celery or a similar task queue.
+    """
+
+    def submit(self, job: Job) -> None:
+        raise NotImplementedError
+
+
+class ThreadPoolJobExecutor(BaseJobExecutor):
+    """run jobs on a pool of threads of the web process"""
+
+    def __init__(self) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=get_setting("JOB_WORKERS"),
+            thread_name_prefix="sharing-configs-job",
+        )
+
+    def submit(self, job: Job) -> None:
+        # the job is only visible to other connections once it is committed
+        job_id = job.pk
+        transaction.on_commit(lambda: self.executor.submit(self._run, job_id))
+
+    @staticmethod
+    def _run(job_id: int) -> None:
+        close_old_connections()
+        try:
+            run_job(job_id)
+        finally:
+            close_old_connections()
+
+
+class ImmediateJobExecutor(BaseJobExecutor):
+    """run jobs in the process and request that submit them, e.g. in tests"""
+
+    def submit(self, job: Job) -> None:
+        run_job(job.pk)
+
+
+def get_executor() -> BaseJobExecutor:
+    """return the executor configured with SHARING_CONFIGS_JOB_EXECUTOR"""
+    path = get_setting("JOB_EXECUTOR")
+    with _executors_lock:
+        if path not in _executors:
+            _executors[path] = import_string(path)()
+        return _executors[path]
+
+
+class JobMessages:
+    """message storage collecting the messages of the admin during a job"""
+
+    def __init__(self) -> None:
+        self.messages = []
+
+    def add(self, level: int, message, extra_tags: str = "") -> None:
+        self.messages.append(
+            {
+                "level": messages.DEFAULT_TAGS.get(level, ""),
+                "message": conditional_escape(message),
+            }
+        )
+
+
+def get_model_admin(model, admin_site: str = "admin"):
+    """return the model admin of a model on the admin site with the given name"""
+    for site in all_sites:
+        if site.name == admin_site and model in site._registry:
+            return site._registry[model]
+    raise LookupError(f"No admin for {model} on the admin site {admin_site}")
+
+
+def get_admin_request(user=None) -> HttpRequest:
+    """
+    return a request to run the export and import logic of a model admin outside
+    a view with; its messages are collected in request._messages.messages
+    """
+    request = HttpRequest()
+    request.method = "POST"
+    request.user = user or AnonymousUser()
+    request._messages = JobMessages()
+    return request
+
+
+def run_job(job_id: int) -> None:
+    """
+    run a pending job with the model admin that created it; the messages of the
+    admin are stored as the result of the job
+    """
+    updated = Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+        status=Job.RUNNING, started=timezone.now()
+    )
+    if not updated:
+        return
+    job = Job.objects.select_related("content_type", "user").get(pk=job_id)
+
+    request = get_admin_request(job.user)
+    try:
+        model_admin = get_model_admin(job.content_type.model_class(), job.admin_site)
+        run = getattr(model_admin, f"run_sharing_configs_{job.kind}_job")
+        run(request, json.loads(job.parameters))
+    except Exception:
+        logger.exception("Sharing configs job %s failed", job_id)
+        request._messages.add(messages.ERROR, "The job failed unexpectedly.")
+
+    result = request._messages.messages
+    failed = any(message["level"] == "error" for message in result)
+    job.status = Job.FAILED if failed else Job.SUCCEEDED
+    job.result = json.dumps(result)
+    job.finished = timezone.now()
+    job.save(update_fields=["status", "result", "finished"])
+
+
+def enqueue_job(request, model_admin, kind: str, parameters: dict) -> Job:
+    """create a job for a model admin and submit it to the executor"""
+    job = Job.objects.create(
+        kind=kind,
+        content_type=ContentType.objects.get_for_model(model_admin.model),
+        admin_site=model_admin.admin_site.name,
+        user=request.user if request.user.is_authenticated else None,
+        parameters=json.dumps(parameters),
+    )
+    get_executor().submit(job)
+    return job
+
+
+def get_job_status(job: Job) -> dict:
+    """the status of a job as returned by the status endpoint"""
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "finished": job.status in (Job.SUCCEEDED, Job.FAILED),
+        "messages": json.loads(job.result),
+    }
@@ -0,0 +1,173 @@
+import hashlib
+import json
+from typing import IO, Dict, Iterable, List, Optional, Tuple, Union
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.db import models
+from django.db.models.functions import Cast, Concat
+
+from .models import ExportLedgerEntry, ImportLedgerEntry
+
+CHUNK_SIZE = 64 * 1024
+
+
+def get_content_hash(content: Union[bytes, IO[bytes]]) -> Optional[str]:
+    """
+    return the sha256 of the data of an export; None for file-like objects
+    that can only be read once
+    """
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(content).hexdigest()
+    if not content.seekable():
+        return None
+    start = content.tell()
+    checksum = hashlib.sha256()
+    for chunk in iter(lambda: content.read(CHUNK_SIZE), b""):
+        checksum.update(chunk)
+    content.seek(start)
+    return checksum.hexdigest()
+
+
+def get_exported_hashes(
+    label: str, model, folder: str, object_ids: Iterable
+) -> Dict[Tuple[str, str], str]:
+    """
+    return the hashes of the last exports of several objects to a folder,
+    by (object id, filename), in one query
+    """
+    entries = ExportLedgerEntry.objects.filter(
+        label=label,
+        content_type=ContentType.objects.get_for_model(model),
+        folder=folder,
+        object_id__in=[str(object_id) for object_id in object_ids],
+    ).values_list("object_id", "filename", "content_hash")
+    return {
+        (object_id, filename): content_hash
+        for object_id, filename, content_hash in entries
+    }
+
+
+def is_unchanged(
+    label: str, obj, folder: str, filename: str, content_hash: Optional[str]
+) -> bool:
+    """whether the content was already exported to the file by the last upload"""
+    if content_hash is None:
+        return False
+    hashes = get_exported_hashes(label, type(obj), folder, [obj.pk])
+    return hashes.get((str(obj.pk), filename)) == content_hash
+
+
+def record_export(
+    label: str,
+    obj,
+    folder: str,
+    filename: str,
+    content_hash: Optional[str],
+    response: dict,
+) -> None:
+    """record a successful upload of the content of an object"""
+    if content_hash is None:
+        return
+    ExportLedgerEntry.objects.update_or_create(
+        label=label,
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=str(obj.pk),
+        folder=folder,
+        filename=filename,
+        defaults={"content_hash": content_hash, "response": json.dumps(response)},
+    )
+
+
+class ImportLedger:
+    """
+    the last imports of files of a folder into a model, looked up in bulk;
+    imports whose object was deleted since are ignored, and all of them if forced
+    """
+
+    def __init__(
+        self, label: str, model, folder: str, filenames: List[str], force=False
+    ) -> None:
+        self.label = label
+        self.model = model
+        self.folder = folder
+        self.force = force
+        self.content_type = ContentType.objects.get_for_model(model)
+        entries = ImportLedgerEntry.objects.filter(
+            label=label,
+            content_type=self.content_type,
+            folder=folder,
+            filename__in=filenames,
+        )
+        entries = list(entries)
+        existing = {
+            str(pk)
+            for pk in model._default_manager.filter(
+                pk__in={entry.object_id for entry in entries}
+            ).values_list("pk", flat=True)
+        }
+        # several files can have been imported into the same object
+        self.entries = {
+            entry.filename: entry for entry in entries if entry.object_id in existing
+        }
+
+    def get_etags(self) -> Dict[str, str]:
+        """ETags of the last imports, to download the files conditionally"""
+        if self.force:
+            return {}
+        return {
+            filename: entry.etag
+            for filename, entry in self.entries.items()
+            if entry.etag
+        }
+
+    def is_unchanged(self, filename: str, file: File) -> bool:
+        """
+        whether a downloaded file has the content of its last import; the ETag
+        of the entry is updated, as the remote version changed
+        """
+        entry = self.entries.get(filename)
+        checksum = getattr(file, "checksum", None)
+        if (
+            self.force
+            or entry is None
+            or not checksum
+            or entry.content_hash != checksum
+        ):
+            return False
+        entry.etag = getattr(file, "etag", None) or ""
+        entry.save(update_fields=["etag", "imported"])
+        return True
+
+    def record(self, filename: str, obj, file: File) -> None:
+        """record the import of a file into an object"""
+        entry, _ = ImportLedgerEntry.objects.update_or_create(
+            label=self.label,
+            content_type=self.content_type,
+            folder=self.folder,
+            filename=filename,
+            defaults={
+                "etag": getattr(file, "etag", None) or "",
+                "content_hash": getattr(file, "checksum", None) or "",
+                "object_id": str(obj.pk),
+            },
+        )
+        self.entries[filename] = entry
+
+
+def annotate_imported_from(queryset: models.QuerySet) -> models.QuerySet:
+    """
+    annotate the objects with the path of the file they were last imported from,
+    as "sharing_configs_imported_path"
+    """
+    entries = (
+        ImportLedgerEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(queryset.model),
+            object_id=Cast(models.OuterRef("pk"), models.CharField()),
+        )
+        .order_by("-imported")
+        .annotate(path=Concat("folder", models.Value("/"), "filename"))
+    )
+    return queryset.annotate(
+        sharing_configs_imported_path=models.Subquery(entries.values("path")[:1])
+    )
@@ -0,0 +1,105 @@
+import math
+import time
+from typing import List
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ..jobs import get_admin_request, get_model_admin
+
+
+def get_percentile(values: List[float], percentile: float) -> float:
+    """nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+
+class SharingConfigsCommand(BaseCommand):
+    """
+    base of the commands exporting or importing with the hooks of the admin of
+    a model; reports progress and a throughput summary
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="the model, as app_label.ModelName")
+        parser.add_argument("--folder", required=True, help="the folder of the API")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="number of concurrent requests, defaults to SHARING_CONFIGS_MAX_WORKERS",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="transfer objects and files even if they did not change",
+        )
+        parser.add_argument(
+            "--admin-site",
+            default="admin",
+            help="name of the admin site the model is registered on",
+        )
+        parser.add_argument(
+            "--user",
+            help="username to export or import as, e.g. as the author of exports",
+        )
+
+    def get_model_admin(self, options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(exc)
+        try:
+            model_admin = get_model_admin(model, options["admin_site"])
+        except LookupError as exc:
+            raise CommandError(exc)
+        return model_admin
+
+    def get_request(self, options):
+        user = None
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User._default_manager.get_by_natural_key(options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user {options['user']}")
+        return get_admin_request(user)
+
+    def get_workers(self, options, default: int) -> int:
+        workers = options["workers"] or default
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        return workers
+
+    def progress(self, options, done: int, total: int, msg: str) -> None:
+        if options["verbosity"] >= 1:
+            self.stdout.write(f"[{done}/{total}] {msg}")
+
+    def write_messages(self, request) -> None:
+        """write the messages the admin reported"""
+        styles = {
+            "error": self.style.ERROR,
+            "warning": self.style.WARNING,
+            "success": self.style.SUCCESS,
+        }
+        for message in request._messages.messages:
+            style = styles.get(message["level"], str)
+            self.stdout.write(style(message["message"]))
+
+    def write_summary(
+        self,
+        verb: str,
+        count: int,
+        total: int,
+        size: int,
+        latencies: List[float],
+        start: float,
+    ) -> None:
+        duration = max(time.monotonic() - start, 1e-6)
+        self.stdout.write(
+            f"{verb} {count} of {total} in {duration:.2f} s: "
+            f"{count / duration:.1f} objects/s, {size / duration / 1024:.1f} KiB/s, "
+            f"p95 latency {get_percentile(latencies, 95):.3f} s"
+        )
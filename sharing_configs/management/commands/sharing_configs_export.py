@@ -0,0 +1,119 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import CommandError
+
+from sharing_configs.backends import get_client
+from sharing_configs.exceptions import ApiException
+from sharing_configs.files import ExportPayload
+from sharing_configs.ledger import get_content_hash, get_exported_hashes, record_export
+from sharing_configs.utils import get_max_workers
+
+from ..base import SharingConfigsCommand
+
+
+def get_payload_size(data) -> int:
+    if isinstance(data, ExportPayload):
+        return data.len or 0
+    return len(json.dumps(data))
+
+
+class Command(SharingConfigsCommand):
+    help = (
+        "Export the objects of a model to a folder of the Sharing Configs API with "
+        "the export hooks of its admin"
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="FIELD=VALUE",
+            help="only export objects matching the lookup, can be repeated",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="overwrite existing files",
+        )
+
+    def get_filters(self, options) -> dict:
+        filters = {}
+        for item in options["filter"]:
+            lookup, sep, value = item.partition("=")
+            if not sep or not lookup:
+                raise CommandError(f"Invalid filter {item}, expected FIELD=VALUE")
+            filters[lookup] = value
+        return filters
+
+    def handle(self, *args, **options):
+        model_admin = self.get_model_admin(options)
+        request = self.get_request(options)
+        folder = options["folder"]
+        client = get_client()
+        workers = self.get_workers(options, get_max_workers(client))
+        start = time.monotonic()
+
+        queryset = model_admin.get_queryset(request).filter(**self.get_filters(options))
+        objects = list(queryset)
+        exported = {}
+        if not options["force"]:
+            exported = get_exported_hashes(
+                client.label, model_admin.model, folder, [obj.pk for obj in objects]
+            )
+
+        items = []
+        for obj in objects:
+            content = model_admin.get_sharing_configs_export_data(obj)
+            filename = model_admin.get_sharing_configs_export_filename(obj)
+            content_hash = get_content_hash(content)
+            if content_hash and exported.get((str(obj.pk), filename)) == content_hash:
+                self.progress(options, 0, len(objects), f"{obj} has not changed")
+                continue
+            data = model_admin.get_sharing_configs_export_payload(
+                request, content, filename, options["overwrite"]
+            )
+            items.append((obj, filename, content_hash, data))
+
+        def upload(item):
+            started = time.monotonic()
+            try:
+                result = client.export(folder, item[3])
+            except ApiException as exc:
+                result = exc
+            return item, result, time.monotonic() - started
+
+        latencies, size, failed = [], 0, 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(upload, item) for item in items]
+            for done, future in enumerate(as_completed(futures), 1):
+                (obj, filename, content_hash, data), result, latency = future.result()
+                latencies.append(latency)
+                if isinstance(result, ApiException):
+                    failed += 1
+                    self.progress(
+                        options, done, len(items), self.style.ERROR(f"{obj} failed")
+                    )
+                    continue
+                size += get_payload_size(data)
+                record_export(client.label, obj, folder, filename, content_hash, result)
+                self.progress(
+                    options,
+                    done,
+                    len(items),
+                    f"{obj} exported to {folder}/{filename} in {latency:.3f} s",
+                )
+
+        skipped = len(objects) - len(items)
+        if skipped:
+            self.stdout.write(
+                f"{skipped} objects have not changed since their last export"
+            )
+        self.write_summary(
+            "Exported", len(items) - failed, len(items), size, latencies, start
+        )
+        if failed:
+            raise CommandError(f"{failed} of {len(items)} exports failed")
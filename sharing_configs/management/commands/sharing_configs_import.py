@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fnmatch import fnmatch
+
+from django.core.management.base import CommandError
+
+from sharing_configs.backends import get_client
+from sharing_configs.exceptions import ApiException
+from sharing_configs.ledger import ImportLedger
+from sharing_configs.utils import get_max_workers, iter_filenames
+
+from ..base import SharingConfigsCommand
+
+
+class Command(SharingConfigsCommand):
+    help = (
+        "Import the files of a folder of the Sharing Configs API with the import "
+        "hooks of the admin of a model"
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--pattern",
+            default="*",
+            help="only import files whose name matches the shell-style pattern",
+        )
+
+    def handle(self, *args, **options):
+        model_admin = self.get_model_admin(options)
+        request = self.get_request(options)
+        folder = options["folder"]
+        client = get_client()
+        workers = self.get_workers(options, get_max_workers(client))
+        start = time.monotonic()
+
+        try:
+            filenames = [
+                name
+                for name in iter_filenames(client, folder)
+                if fnmatch(name, options["pattern"])
+            ]
+        except ApiException as exc:
+            raise CommandError(exc)
+        ledger = ImportLedger(
+            client.label, model_admin.model, folder, filenames, force=options["force"]
+        )
+        etags = ledger.get_etags()
+
+        def download(filename):
+            started = time.monotonic()
+            try:
+                result = client.import_file(folder, filename, etag=etags.get(filename))
+            except ApiException as exc:
+                result = exc
+            return filename, result, time.monotonic() - started
+
+        downloads, latencies, size = [], [], 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(download, filename) for filename in filenames]
+            for done, future in enumerate(as_completed(futures), 1):
+                filename, result, latency = future.result()
+                downloads.append((filename, result))
+                latencies.append(latency)
+                if isinstance(result, ApiException):
+                    msg = self.style.ERROR(f"{filename} failed")
+                elif result is None:
+                    msg = f"{filename} has not changed"
+                else:
+                    size += result.size
+                    msg = f"{filename} downloaded in {latency:.3f} s"
+                self.progress(options, done, len(filenames), msg)
+
+        changed = model_admin.sharing_configs_skip_unchanged(request, downloads, ledger)
+        imported = model_admin.sharing_configs_apply_import(request, changed, ledger)
+        if options["verbosity"] >= 1:
+            self.write_messages(request)
+        self.write_summary(
+            "Imported", len(imported), len(changed), size, latencies, start
+        )
+        failed = len(changed) - len(imported)
+        if failed:
+            raise CommandError(f"{failed} of {len(changed)} imports failed")
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sharing_configs.catalog import sync_catalog
+from sharing_configs.exceptions import ApiException
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror the folders and files of the label of the Sharing Configs API in "
+        "the local catalog; only the changes since the last sync are written"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--folder",
+            action="append",
+            dest="folders",
+            metavar="FOLDER",
+            help="only sync the files of the folder, can be repeated",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="compare the files of folders whose listing did not change",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        try:
+            result = sync_catalog(folders=options["folders"], full=options["full"])
+        except ApiException as exc:
+            raise CommandError(exc)
+
+        self.stdout.write(
+            f"Folders: {result.folders_created} created, {result.folders_updated} "
+            f"updated, {result.folders_deleted} deleted"
+        )
+        self.stdout.write(
+            f"Files: {result.files_created} created, {result.files_updated} "
+            f"updated, {result.files_deleted} deleted; {result.folders_unchanged} "
+            f"folders did not change"
+        )
+        self.stdout.write(f"Synced in {time.monotonic() - start:.1f} s")
+        if result.failed:
+            raise CommandError(
+                f"The files of {len(result.failed)} folders could not be synced: "
+                + ", ".join(result.failed)
+            )
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from .conf import get_setting
+from .files import get_content_length
+from .signals import api_call
+
+# upper bounds in seconds of the buckets of the latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class ApiCall:
+    """
+    context manager measuring one call of a client to the API; the api_call
+    signal is sent when it exits, also when the call failed. The call is
+    guarded by the circuit breaker of the client.
+    """
+
+    def __init__(self, client, operation: str, method: str) -> None:
+        self.client = client
+        self.operation = operation
+        self.method = method
+        self.url_template = client.url_templates[operation]
+        self.status = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.duration = None
+
+    def __enter__(self) -> "ApiCall":
+        self._breaker_state = self.client.breaker.before_call()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self._start
+        self.client.breaker.after_call(self._breaker_state, self.status, exc)
+        api_call.send(
+            sender=type(self.client),
+            operation=self.operation,
+            method=self.method,
+            url_template=self.url_template,
+            status=self.status,
+            duration=self.duration,
+            request_bytes=self.request_bytes,
+            response_bytes=self.response_bytes,
+            retries=self.retries,
+            error=exc,
+        )
+
+    def sent(self, request) -> None:
+        """count a request body of a known length"""
+        self.request_bytes += get_content_length(request.headers) or 0
+
+    def received(self, resp, body: Optional[bytes] = None) -> None:
+        """record the status of a response, its body and the retries of urllib3"""
+        self.status = resp.status_code
+        if body is not None:
+            self.response_bytes += len(body)
+        raw = getattr(resp, "raw", None)
+        self.retries += len(getattr(getattr(raw, "retries", None), "history", ()))
+
+    def counted(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """count a request body sent in chunks of unknown total length"""
+        for chunk in chunks:
+            self.request_bytes += len(chunk)
+            yield chunk
+
+    async def acounted(self, chunks) -> AsyncIterator[bytes]:
+        """async variant of counted"""
+        async for chunk in chunks:
+            self.request_bytes += len(chunk)
+            yield chunk
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_labels(**labels) -> str:
+    items = ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items())
+    return f"{{{items}}}"
+
+
+class MetricsAggregator:
+    """
+    in-memory counters and latency histograms of the calls to the API,
+    per operation; thread-safe
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # (operation, method, url_template, status) -> number of calls
+            self.calls = defaultdict(int)
+            # operation -> totals
+            self.request_bytes = defaultdict(int)
+            self.response_bytes = defaultdict(int)
+            self.retries = defaultdict(int)
+            # operation -> (count per bucket, sum of durations, count)
+            self.histograms = {}
+
+    def record(
+        self,
+        sender,
+        operation: str,
+        method: str,
+        url_template: str,
+        status: Optional[int],
+        duration: float,
+        request_bytes: int,
+        response_bytes: int,
+        retries: int,
+        **kwargs,
+    ) -> None:
+        status = "error" if status is None else str(status)
+        with self._lock:
+            self.calls[(operation, method, url_template, status)] += 1
+            self.request_bytes[operation] += request_bytes
+            self.response_bytes[operation] += response_bytes
+            self.retries[operation] += retries
+            counts, total, count = self.histograms.get(
+                operation, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    counts[i] += 1
+                    break
+            self.histograms[operation] = (counts, total + duration, count + 1)
+
+    def snapshot(self) -> dict:
+        """return a copy of the metrics, with cumulative bucket counts"""
+        with self._lock:
+            histograms = {}
+            for operation, (counts, total, count) in self.histograms.items():
+                cumulative, running = [], 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    running += bucket_count
+                    cumulative.append((bound, running))
+                histograms[operation] = {
+                    "buckets": cumulative,
+                    "sum": total,
+                    "count": count,
+                }
+            return {
+                "calls": dict(self.calls),
+                "request_bytes": dict(self.request_bytes),
+                "response_bytes": dict(self.response_bytes),
+                "retries": dict(self.retries),
+                "durations": histograms,
+            }
+
+    def to_prometheus(self) -> str:
+        """return the metrics in the Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = [
+            "# HELP sharing_configs_api_calls_total Calls to the Sharing Configs API.",
+            "# TYPE sharing_configs_api_calls_total counter",
+        ]
+        for (operation, method, url, status), count in sorted(data["calls"].items()):
+            labels = format_labels(
+                operation=operation, method=method, url=url, status=status
+            )
+            lines.append(f"sharing_configs_api_calls_total{labels} {count}")
+
+        counters = [
+            ("request_bytes", "Bytes sent to the Sharing Configs API."),
+            ("response_bytes", "Bytes received from the Sharing Configs API."),
+            ("retries", "Retried calls to the Sharing Configs API."),
+        ]
+        for key, help_text in counters:
+            name = f"sharing_configs_api_{key}_total"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for operation, value in sorted(data[key].items()):
+                lines.append(f"{name}{format_labels(operation=operation)} {value}")
+
+        name = "sharing_configs_api_call_duration_seconds"
+        lines += [
+            f"# HELP {name} Duration of the calls to the Sharing Configs API.",
+            f"# TYPE {name} histogram",
+        ]
+        for operation, histogram in sorted(data["durations"].items()):
+            for bound, count in histogram["buckets"]:
+                labels = format_labels(operation=operation, le=repr(float(bound)))
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = format_labels(operation=operation, le="+Inf")
+            lines.append(f"{name}_bucket{labels} {histogram['count']}")
+            labels = format_labels(operation=operation)
+            lines.append(f"{name}_sum{labels} {histogram['sum']}")
+            lines.append(f"{name}_count{labels} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# aggregates the calls of all clients of the process
+metrics = MetricsAggregator()
+
+
+def record_metrics(sender, **kwargs) -> None:
+    """receiver of api_call feeding the built-in aggregator"""
+    if get_setting("COLLECT_METRICS"):
+        metrics.record(sender, **kwargs)
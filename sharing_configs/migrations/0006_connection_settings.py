@@ -0,0 +1,49 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sharing_configs", "0005_alter_sharingconfigsconfig_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="connect_timeout",
+            field=models.FloatField(
+                default=5,
+                help_text="Seconds to wait for a connection to the API to be established.",
+                verbose_name="connect timeout",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="max_retries",
+            field=models.PositiveSmallIntegerField(
+                default=3,
+                help_text="Number of times a failed request is retried on connection errors or 502, 503 and 504 responses.",
+                verbose_name="max retries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="pool_size",
+            field=models.PositiveSmallIntegerField(
+                default=10,
+                help_text="Maximum number of keep-alive connections to the API.",
+                verbose_name="pool size",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="read_timeout",
+            field=models.FloatField(
+                default=30,
+                help_text="Seconds to wait for the API to send a response.",
+                verbose_name="read timeout",
+            ),
+        ),
+    ]
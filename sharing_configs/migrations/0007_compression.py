@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sharing_configs", "0006_connection_settings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="compression",
+            field=models.CharField(
+                blank=True,
+                choices=[("", "none"), ("gzip", "gzip"), ("zstd", "zstd")],
+                help_text="Compress exported files and ask the API for compressed responses. Uploads fall back to uncompressed bodies if the API does not accept them. zstd requires the zstandard package.",
+                max_length=10,
+                verbose_name="compression",
+            ),
+        ),
+    ]
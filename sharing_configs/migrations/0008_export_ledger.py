@@ -0,0 +1,78 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("sharing_configs", "0007_compression"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportLedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="Label of the Sharing Configs API the object was exported to.",
+                        max_length=50,
+                        verbose_name="label",
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.CharField(max_length=255, verbose_name="object id"),
+                ),
+                ("folder", models.CharField(max_length=250, verbose_name="folder")),
+                ("filename", models.CharField(max_length=250, verbose_name="filename")),
+                (
+                    "content_hash",
+                    models.CharField(
+                        help_text="SHA-256 of the exported content.",
+                        max_length=64,
+                        verbose_name="content hash",
+                    ),
+                ),
+                (
+                    "response",
+                    models.TextField(
+                        blank=True,
+                        help_text="JSON response of the API to the upload.",
+                        verbose_name="response",
+                    ),
+                ),
+                (
+                    "exported",
+                    models.DateTimeField(auto_now=True, verbose_name="exported"),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                        verbose_name="content type",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "export ledger entry",
+                "verbose_name_plural": "export ledger entries",
+                "unique_together": {
+                    ("label", "content_type", "object_id", "folder", "filename")
+                },
+            },
+        ),
+    ]
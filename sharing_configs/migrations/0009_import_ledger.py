@@ -0,0 +1,82 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("sharing_configs", "0008_export_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportLedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="Label of the Sharing Configs API the file was imported from.",
+                        max_length=50,
+                        verbose_name="label",
+                    ),
+                ),
+                ("folder", models.CharField(max_length=250, verbose_name="folder")),
+                ("filename", models.CharField(max_length=250, verbose_name="filename")),
+                (
+                    "etag",
+                    models.CharField(
+                        blank=True,
+                        help_text="Version of the remote file when it was imported.",
+                        max_length=250,
+                        verbose_name="ETag",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        blank=True,
+                        help_text="SHA-256 of the imported content.",
+                        max_length=64,
+                        verbose_name="content hash",
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.CharField(
+                        help_text="The object created or updated by the import.",
+                        max_length=255,
+                        verbose_name="object id",
+                    ),
+                ),
+                (
+                    "imported",
+                    models.DateTimeField(auto_now=True, verbose_name="imported"),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                        verbose_name="content type",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "import ledger entry",
+                "verbose_name_plural": "import ledger entries",
+                "unique_together": {("label", "content_type", "folder", "filename")},
+            },
+        ),
+    ]
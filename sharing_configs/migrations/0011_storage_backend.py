@@ -0,0 +1,57 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sharing_configs", "0010_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="backend",
+            field=models.CharField(
+                choices=[
+                    ("api", "Sharing Configs API"),
+                    ("filesystem", "local filesystem"),
+                ],
+                default="api",
+                help_text="Where the shared configurations are stored.",
+                max_length=20,
+                verbose_name="backend",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sharingconfigsconfig",
+            name="storage_path",
+            field=models.CharField(
+                blank=True,
+                help_text="Absolute path of the directory the local filesystem backend stores the folders of the label in.",
+                max_length=250,
+                verbose_name="storage path",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sharingconfigsconfig",
+            name="api_endpoint",
+            field=models.URLField(
+                blank=True,
+                help_text="Path to API point. For example: https://www.example.com/api/v1/",
+                max_length=250,
+                verbose_name="API endpoint",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sharingconfigsconfig",
+            name="api_key",
+            field=models.CharField(
+                blank=True,
+                help_text="API key for authorization",
+                max_length=128,
+                verbose_name="API key",
+            ),
+        ),
+    ]
@@ -0,0 +1,151 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sharing_configs", "0011_storage_backend"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogFolder",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="Label of the Sharing Configs API the folder belongs to.",
+                        max_length=50,
+                        verbose_name="label",
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(
+                        help_text="Full path of the folder, its parents separated by slashes.",
+                        max_length=500,
+                        verbose_name="path",
+                    ),
+                ),
+                ("name", models.CharField(max_length=500, verbose_name="name")),
+                (
+                    "permission",
+                    models.CharField(
+                        blank=True,
+                        help_text="Permission on the folder reported by the API.",
+                        max_length=10,
+                        verbose_name="permission",
+                    ),
+                ),
+                (
+                    "position",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Position of the folder in the (depth-first) listing.",
+                        verbose_name="position",
+                    ),
+                ),
+                (
+                    "files_hash",
+                    models.CharField(
+                        blank=True,
+                        help_text="SHA-256 of the file listing when the files were last synced.",
+                        max_length=64,
+                        verbose_name="files hash",
+                    ),
+                ),
+                (
+                    "synced",
+                    models.DateTimeField(blank=True, null=True, verbose_name="synced"),
+                ),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="children",
+                        to="sharing_configs.catalogfolder",
+                        verbose_name="parent",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "catalog folder",
+                "verbose_name_plural": "catalog folders",
+                "ordering": ("label", "position"),
+                "unique_together": {("label", "path")},
+            },
+        ),
+        migrations.CreateModel(
+            name="CatalogFile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("filename", models.CharField(max_length=250, verbose_name="filename")),
+                (
+                    "key",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Case-folded filename to search by prefix.",
+                        max_length=250,
+                        verbose_name="key",
+                    ),
+                ),
+                (
+                    "size",
+                    models.BigIntegerField(blank=True, null=True, verbose_name="size"),
+                ),
+                (
+                    "author",
+                    models.CharField(blank=True, max_length=250, verbose_name="author"),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="modified"
+                    ),
+                ),
+                (
+                    "folder",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="files",
+                        to="sharing_configs.catalogfolder",
+                        verbose_name="folder",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "catalog file",
+                "verbose_name_plural": "catalog files",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="catalogfile",
+            index=models.Index(fields=["folder", "key"], name="sc_catalogfile_key_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="catalogfile",
+            unique_together={("folder", "filename")},
+        ),
+    ]
@@ -1,24 +1,58 @@
+import os
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from solo.models import SingletonModel
 
+BACKEND_CHOICES = (
+    ("api", _("Sharing Configs API")),
+    ("filesystem", _("local filesystem")),
+)
+
+COMPRESSION_CHOICES = (
+    ("", _("none")),
+    ("gzip", _("gzip")),
+    ("zstd", _("zstd")),
+)
+
 
 class SharingConfigsConfig(SingletonModel):
     """
     Config for sharing
     """
 
+    backend = models.CharField(
+        _("backend"),
+        max_length=20,
+        choices=BACKEND_CHOICES,
+        default="api",
+        help_text=_("Where the shared configurations are stored."),
+    )
     api_endpoint = models.URLField(
         _("API endpoint"),
         max_length=250,
+        blank=True,
         help_text=_("Path to API point. For example: https://www.example.com/api/v1/"),
     )
     api_key = models.CharField(
         _("API key"),
         max_length=128,
+        blank=True,
         help_text=_("API key for authorization"),
     )
+    storage_path = models.CharField(
+        _("storage path"),
+        max_length=250,
+        blank=True,
+        help_text=_(
+            "Absolute path of the directory the local filesystem backend stores "
+            "the folders of the label in."
+        ),
+    )
     label = models.CharField(
         _("label"),
         max_length=50,
@@ -32,9 +66,304 @@ class SharingConfigsConfig(SingletonModel):
             "The default organisation to use in the description when sharing configurations."
         ),
     )
+    connect_timeout = models.FloatField(
+        _("connect timeout"),
+        default=5,
+        help_text=_("Seconds to wait for a connection to the API to be established."),
+    )
+    read_timeout = models.FloatField(
+        _("read timeout"),
+        default=30,
+        help_text=_("Seconds to wait for the API to send a response."),
+    )
+    max_retries = models.PositiveSmallIntegerField(
+        _("max retries"),
+        default=3,
+        help_text=_(
+            "Number of times a failed request is retried on connection errors "
+            "or 502, 503 and 504 responses."
+        ),
+    )
+    pool_size = models.PositiveSmallIntegerField(
+        _("pool size"),
+        default=10,
+        help_text=_("Maximum number of keep-alive connections to the API."),
+    )
+    compression = models.CharField(
+        _("compression"),
+        max_length=10,
+        blank=True,
+        choices=COMPRESSION_CHOICES,
+        help_text=_(
+            "Compress exported files and ask the API for compressed responses. "
+            "Uploads fall back to uncompressed bodies if the API does not accept "
+            "them. zstd requires the zstandard package."
+        ),
+    )
 
     class Meta:
         verbose_name = _("Sharing Configs configuration")
 
     def __str__(self):
         return self.label
+
+    def clean(self):
+        super().clean()
+        if self.backend == "api":
+            errors = {
+                name: _("This field is required for the API backend.")
+                for name in ("api_endpoint", "api_key")
+                if not getattr(self, name)
+            }
+            if errors:
+                raise ValidationError(errors)
+        elif self.backend == "filesystem" and not os.path.isabs(self.storage_path):
+            raise ValidationError(
+                {
+                    "storage_path": _(
+                        "An absolute path is required for the local filesystem "
+                        "backend."
+                    )
+                }
+            )
+
+
+class ExportLedgerEntry(models.Model):
+    """
+    Last successful export of an object to a file, used to skip re-uploading
+    content that did not change
+    """
+
+    label = models.CharField(
+        _("label"),
+        max_length=50,
+        help_text=_("Label of the Sharing Configs API the object was exported to."),
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("content type"),
+    )
+    object_id = models.CharField(_("object id"), max_length=255)
+    folder = models.CharField(_("folder"), max_length=250)
+    filename = models.CharField(_("filename"), max_length=250)
+    content_hash = models.CharField(
+        _("content hash"),
+        max_length=64,
+        help_text=_("SHA-256 of the exported content."),
+    )
+    response = models.TextField(
+        _("response"),
+        blank=True,
+        help_text=_("JSON response of the API to the upload."),
+    )
+    exported = models.DateTimeField(_("exported"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("export ledger entry")
+        verbose_name_plural = _("export ledger entries")
+        unique_together = ("label", "content_type", "object_id", "folder", "filename")
+
+    def __str__(self):
+        return f"{self.folder}/{self.filename}"
+
+
+class ImportLedgerEntry(models.Model):
+    """
+    Last import of a file into a model, used to skip downloading and applying
+    files that did not change
+    """
+
+    label = models.CharField(
+        _("label"),
+        max_length=50,
+        help_text=_("Label of the Sharing Configs API the file was imported from."),
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("content type"),
+    )
+    folder = models.CharField(_("folder"), max_length=250)
+    filename = models.CharField(_("filename"), max_length=250)
+    etag = models.CharField(
+        _("ETag"),
+        max_length=250,
+        blank=True,
+        help_text=_("Version of the remote file when it was imported."),
+    )
+    content_hash = models.CharField(
+        _("content hash"),
+        max_length=64,
+        blank=True,
+        help_text=_("SHA-256 of the imported content."),
+    )
+    object_id = models.CharField(
+        _("object id"),
+        max_length=255,
+        help_text=_("The object created or updated by the import."),
+    )
+    imported = models.DateTimeField(_("imported"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("import ledger entry")
+        verbose_name_plural = _("import ledger entries")
+        unique_together = ("label", "content_type", "folder", "filename")
+
+    def __str__(self):
+        return f"{self.folder}/{self.filename}"
+
+
+class Job(models.Model):
+    """
+    An export or import running in the background
+    """
+
+    EXPORT = "export"
+    IMPORT = "import"
+    KIND_CHOICES = (
+        (EXPORT, _("export")),
+        (IMPORT, _("import")),
+    )
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, _("pending")),
+        (RUNNING, _("running")),
+        (SUCCEEDED, _("succeeded")),
+        (FAILED, _("failed")),
+    )
+
+    kind = models.CharField(_("kind"), max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(
+        _("status"), max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("content type"),
+    )
+    admin_site = models.CharField(
+        _("admin site"),
+        max_length=100,
+        help_text=_("Name of the admin site of the model admin running the job."),
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("user"),
+    )
+    parameters = models.TextField(
+        _("parameters"),
+        default="{}",
+        help_text=_("JSON parameters of the export or import."),
+    )
+    result = models.TextField(
+        _("result"),
+        default="[]",
+        help_text=_("JSON list of the messages reported by the job."),
+    )
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    started = models.DateTimeField(_("started"), null=True, blank=True)
+    finished = models.DateTimeField(_("finished"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("job")
+        verbose_name_plural = _("jobs")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.pk} ({self.get_status_display()})"
+
+
+class CatalogFolder(models.Model):
+    """
+    A folder of the Sharing Configs API, mirrored in the local catalog
+    """
+
+    label = models.CharField(
+        _("label"),
+        max_length=50,
+        help_text=_("Label of the Sharing Configs API the folder belongs to."),
+    )
+    # folders with longer paths are not synced; unique with the label, so the
+    # index stays within the key length limits of the databases
+    path = models.CharField(
+        _("path"),
+        max_length=500,
+        help_text=_("Full path of the folder, its parents separated by slashes."),
+    )
+    name = models.CharField(_("name"), max_length=500)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="children",
+        verbose_name=_("parent"),
+    )
+    permission = models.CharField(
+        _("permission"),
+        max_length=10,
+        blank=True,
+        help_text=_("Permission on the folder reported by the API."),
+    )
+    position = models.PositiveIntegerField(
+        _("position"),
+        default=0,
+        help_text=_("Position of the folder in the (depth-first) listing."),
+    )
+    files_hash = models.CharField(
+        _("files hash"),
+        max_length=64,
+        blank=True,
+        help_text=_("SHA-256 of the file listing when the files were last synced."),
+    )
+    synced = models.DateTimeField(_("synced"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("catalog folder")
+        verbose_name_plural = _("catalog folders")
+        unique_together = ("label", "path")
+        ordering = ("label", "position")
+
+    def __str__(self):
+        return self.path
+
+
+class CatalogFile(models.Model):
+    """
+    A file of a folder of the Sharing Configs API, mirrored in the local catalog
+    """
+
+    folder = models.ForeignKey(
+        CatalogFolder,
+        on_delete=models.CASCADE,
+        related_name="files",
+        verbose_name=_("folder"),
+    )
+    filename = models.CharField(_("filename"), max_length=250)
+    key = models.CharField(
+        _("key"),
+        max_length=250,
+        db_index=True,
+        help_text=_("Case-folded filename to search by prefix."),
+    )
+    size = models.BigIntegerField(_("size"), null=True, blank=True)
+    author = models.CharField(_("author"), max_length=250, blank=True)
+    modified = models.DateTimeField(_("modified"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("catalog file")
+        verbose_name_plural = _("catalog files")
+        unique_together = ("folder", "filename")
+        indexes = [
+            models.Index(fields=["folder", "key"], name="sc_catalogfile_key_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.folder.path}/{self.filename}"
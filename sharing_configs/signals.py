@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# sent after every call of a client to the Sharing Configs API, with the
+# arguments operation, method, url_template, status (None when no response was
+# received), duration (seconds), request_bytes, response_bytes, retries and error
+api_call = Signal()
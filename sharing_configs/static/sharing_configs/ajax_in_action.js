@@ -9,9 +9,32 @@ function buildHeader() {
 }
 
 const AJAX_SELECT = document.getElementById('id_folder')
+const IMPORT_FORM = document.getElementById("import-form")
+
+// milliseconds pages of files are reused, as long as the server caches them
+const CACHE_TTL = (parseInt(IMPORT_FORM.getAttribute('data-cache-ttl')) || 0) * 1000
+// milliseconds of typing pause before the files are searched
+const SEARCH_DELAY = 250
+// folders before and after the selected one whose files are loaded in advance, 0 to disable
+const PREFETCH_FOLDERS = 1
 
 let filesListMenu = document.getElementById("id_file_name")
-filesListMenu.innerHTML = '<option value="">Files in folder</option>';
+filesListMenu.innerHTML = '';
+
+// type-ahead search of the files, the matches are fetched a page at a time
+let filesSearch = document.createElement("input")
+filesSearch.type = "search"
+filesSearch.id = "id_file_search"
+filesSearch.placeholder = "Files in folder"
+filesSearch.autocomplete = "off"
+filesListMenu.parentNode.insertBefore(filesSearch, filesListMenu)
+
+let loadMoreButton = document.createElement("button")
+loadMoreButton.type = "button"
+loadMoreButton.className = "button"
+loadMoreButton.textContent = "Load more"
+loadMoreButton.hidden = true
+filesListMenu.parentNode.insertBefore(loadMoreButton, filesListMenu.nextSibling)
 
 // error generation
 let firstDivFormRow = document.getElementsByClassName("form-row")[0]
@@ -25,13 +48,84 @@ errorUl.className = "errorlist"
 // get jax url from form attr
 
 
+/**
+ * call a function once the calls stopped for a delay
+ */
+function debounce(func, delay) {
+    let timeout = null
+    return function (...args) {
+        clearTimeout(timeout)
+        timeout = setTimeout(() => func.apply(this, args), delay)
+    }
+}
+
+
+class PageCache {
+    /**
+     * pages of files kept in memory and in the sessionStorage of the tab,
+     * so they survive reloading the import page
+     * @param {string} prefix of the keys, the url of the ajax call
+     * @param {number} ttl milliseconds a page is reused
+     */
+    constructor(prefix, ttl) {
+        this.prefix = `sharing_configs:${prefix}?`
+        this.ttl = ttl
+        this.memory = new Map()
+    }
+
+    key(param) {
+        return this.prefix + new URLSearchParams(param)
+    }
+
+    get(param) {
+        let key = this.key(param)
+        let entry = this.memory.get(key)
+        if (!entry) {
+            try {
+                entry = JSON.parse(sessionStorage.getItem(key))
+            } catch (err) {
+                // storage disabled
+                entry = null
+            }
+        }
+        if (!entry || Date.now() - entry.time > this.ttl) {
+            return null
+        }
+        this.memory.set(key, entry)
+        return entry.data
+    }
+
+    set(param, data) {
+        if (!this.ttl || data.status_code !== 200) {
+            return
+        }
+        let key = this.key(param)
+        let entry = { time: Date.now(), data: data }
+        this.memory.set(key, entry)
+        try {
+            sessionStorage.setItem(key, JSON.stringify(entry))
+        } catch (err) {
+            // storage full or disabled, the page stays cached in memory
+        }
+    }
+}
+
+
 class TrackFolderMenu {
     /**
      * Constructor method.
-     * @param {HTMLSelectElement} node 
+     * @param {HTMLSelectElement} node
      */
     constructor(node) {
         this.node = node;
+        this.url = IMPORT_FORM.getAttribute('data-action')
+        this.cache = new PageCache(this.url, CACHE_TTL)
+        // requests in flight by cache key, shared by prefetching and loading
+        this.pending = new Map()
+        // aborts the request of the page that is shown next
+        this.controller = null
+        // number of files loaded for the current folder and search term
+        this.loaded = 0;
         this.trackChange();
     }
 
@@ -39,49 +133,151 @@ class TrackFolderMenu {
      * Binds change event to callbacks.
      */
     trackChange() {
-        this.node.addEventListener('change', this.update.bind(this));
+        this.node.addEventListener('change', this.changeFolder.bind(this));
+        this.node.addEventListener('focus', this.prefetch.bind(this));
+        filesSearch.addEventListener('input', debounce(this.update.bind(this), SEARCH_DELAY));
+        loadMoreButton.addEventListener('click', this.loadMore.bind(this));
+    }
 
+    /**
+     * the files selected in another folder are dropped
+     */
+    changeFolder() {
+        filesListMenu.innerHTML = ''
+        filesListMenu.dispatchEvent(new Event('change'))
+        this.update()
+        this.prefetch()
     }
 
     /**
-     * make ajax POST call to SharingConfigsImportMixin to pass user choice (folder name)
-     * TODO: determine DOM elem to show error msg
+     * load the first page of the files of the chosen folder matching the search term
      */
     update() {
-        let importForm = document.getElementById("import-form")
-        let importFormUrlAjax = importForm.getAttribute('data-action')
-        let folder = this.node.value
-        let param = { folder_name: folder }
-        // /admin/auth/user/fetch/files/?folder_name=folder_two
-        let importFormUrl = `${importFormUrlAjax}?` + new URLSearchParams(param)
-        fetch(importFormUrl,
+        this.loaded = 0
+        this.fetchPage(0)
+    }
+
+    /**
+     * load the next page of the files
+     */
+    loadMore() {
+        this.fetchPage(this.loaded)
+    }
+
+    /**
+     * load the first page of the files of the folders next to the selected one
+     * while the browser is idle, as they are likely chosen next
+     */
+    prefetch() {
+        let options = Array.from(this.node.options).filter(option => option.value)
+        let selected = Math.max(options.findIndex(option => option.value === this.node.value), 0)
+        let folders = options.slice(Math.max(selected - PREFETCH_FOLDERS, 0), selected + PREFETCH_FOLDERS + 1)
+            .map(option => option.value)
+            .filter(folder => folder !== this.node.value)
+        let idle = window.requestIdleCallback || (callback => setTimeout(callback, 0))
+        idle(() => {
+            folders.forEach((folder) => {
+                let param = { folder_name: folder, q: "", offset: 0 }
+                if (!this.cache.get(param)) {
+                    this.request(param).catch(err => null)
+                }
+            })
+        })
+    }
+
+    /**
+     * make ajax GET call to SharingConfigsImportMixin to pass user choice (folder name),
+     * the search term and the offset of the page; a request in flight for the same
+     * page is reused
+     */
+    request(param, signal) {
+        let key = this.cache.key(param)
+        if (this.pending.has(key)) {
+            return this.pending.get(key)
+        }
+        // /admin/auth/user/sc_fetch/files/?folder_name=folder_two&q=theme&offset=0
+        let importFormUrl = `${this.url}?` + new URLSearchParams(param)
+        let promise = fetch(importFormUrl,
             {
                 headers: buildHeader(),
-                method: "GET"
+                method: "GET",
+                signal: signal,
             }
         )
             .then(resp => resp.json())
             .then((data) => {
-                this.populateList(data)
+                this.cache.set(param, data)
+                return data
             })
-            //this.populateList.bind(this))
-            .catch((err) => {
-                // url in ajax request is not correct                       
-                this.populateList(data)
+            .finally(() => {
+                if (this.pending.get(key) === promise) {
+                    this.pending.delete(key)
+                }
+            })
+        this.pending.set(key, promise)
+        if (signal) {
+            // an aborted request is not reused
+            signal.addEventListener('abort', () => this.pending.delete(key))
+        }
+        return promise
+    }
 
+    /**
+     * show a page of files from cache, or fetch it; the request of a page that
+     * is no longer wanted is aborted
+     */
+    fetchPage(offset) {
+        if (this.controller) {
+            this.controller.abort()
+            this.controller = null
+        }
+        let folder = this.node.value
+        if (!folder) {
+            this.populateList({ status_code: 200, resp: [], offset: 0, count: 0 })
+            return
+        }
+        let param = { folder_name: folder, q: filesSearch.value, offset: offset }
+        let cached = this.cache.get(param)
+        if (cached) {
+            this.populateList(cached)
+            return
+        }
+        let controller = new AbortController()
+        this.controller = controller
+        this.request(param, controller.signal)
+            // url in ajax request is not correct
+            .catch(err => (err.name === "AbortError" ? null : {}))
+            .then((data) => {
+                // drop responses of a folder or search term that changed meanwhile
+                if (data && !controller.signal.aborted
+                    && folder === this.node.value && param.q === filesSearch.value) {
+                    this.controller = null
+                    this.populateList(data)
+                }
             })
     }
+
     /**
-     * populate drop-down menu with files for a given folder if status OK
-     * otherwise TODO: determine DOM elem to show error msg
+     * populate drop-down menu with a page of files for a given folder if status OK;
+     * selected files are kept when the search term changes
      */
     populateList(data) {
         if (data.status_code === 200) {
-            // reset drop-down menu for list of files  
-            filesListMenu.innerHTML = '<option value="">Files in folder</option>';
+            errorLi.textContent = ""
+            if (data.offset === 0) {
+                // reset drop-down menu for list of files
+                Array.from(filesListMenu.options)
+                    .filter(option => !option.selected)
+                    .forEach(option => option.remove())
+            }
+            let present = new Set(Array.from(filesListMenu.options, option => option.value))
             data.resp.forEach((item) => {
-                filesListMenu.innerHTML += `<option value="${item}">${item}</option>`
+                if (!present.has(item)) {
+                    filesListMenu.add(new Option(item, item))
+                }
             })
+            this.loaded = data.offset + data.resp.length
+            loadMoreButton.hidden = this.loaded >= data.count
 
         } else if (data.status_code == 400) {
             errorLi.textContent = `${data.error}`
@@ -95,4 +291,3 @@ class TrackFolderMenu {
     }
 }
 new TrackFolderMenu(AJAX_SELECT);
-
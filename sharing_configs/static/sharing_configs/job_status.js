@@ -0,0 +1,64 @@
+// poll the status of a background job until it has finished and show its messages
+
+(function() {
+    const node = document.getElementById("sc-job-status")
+    if (!node) {
+        return
+    }
+    const text = node.querySelector(".sc-job-status__text")
+    const list = node.querySelector(".sc-job-status__messages")
+
+    function showMessages(messages) {
+        messages.forEach(function(message) {
+            let item = document.createElement("li")
+            item.className = message.level
+            // messages are escaped by the server
+            item.innerHTML = message.message
+            list.appendChild(item)
+        })
+    }
+
+    // the job is gone or the response is not its status, e.g. a login page
+    class StatusError extends Error {}
+
+    function showError() {
+        text.textContent = node.dataset.error
+        node.classList.add("errornote")
+    }
+
+    function poll() {
+        fetch(node.dataset.statusUrl, {
+            headers: {"Accept": "application/json"},
+            credentials: "same-origin",
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new StatusError(`Status response ${response.status}`)
+                }
+                return response.json().catch(err => {
+                    throw new StatusError(err.message)
+                })
+            })
+            .then(job => {
+                if (!(job.status in node.dataset)) {
+                    throw new StatusError(`Unknown job status ${job.status}`)
+                }
+                text.textContent = node.dataset[job.status]
+                if (job.finished) {
+                    showMessages(job.messages || [])
+                } else {
+                    setTimeout(poll, 1000)
+                }
+            })
+            .catch(err => {
+                if (err instanceof StatusError) {
+                    showError()
+                } else {
+                    // network error, retried
+                    setTimeout(poll, 5000)
+                }
+            })
+    }
+
+    poll()
+})()
@@ -1,17 +1,19 @@
-//enable/disable a button with jq (methods attr,removeAttr)  
-// submit button form gets enabled if file field present 
-      
+//enable/disable a button with jq (methods attr,removeAttr)
+// submit button form gets enabled if files are selected or the whole folder is imported
+
 (function($){
-    $("#id_file_name").change(function(){
-        console.log("state input file:",$(this).val())
-        if($(this).val()==""){            
+    function toggleSubmit(){
+        let files = $("#id_file_name").val() || []
+        let importFolder = $("#id_import_folder").prop("checked")
+        if(files.length == 0 && !importFolder){
             $(".enableOnInput").prop("disabled",true)
         }
-        else{            
+        else{
             $(".enableOnInput").prop("disabled",false)
         }
     }
-    )
+    $("#id_file_name").change(toggleSubmit)
+    $("#id_import_folder").change(toggleSubmit)
 })(django.jQuery)
 
 
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import metrics_view
+
+app_name = "sharing_configs"
+
+urlpatterns = [
+    path("metrics/", metrics_view, name="metrics"),
+]
@@ -1,27 +1,83 @@
 import base64
-from typing import Optional
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.backends import BaseBackend, get_client
+from sharing_configs.cache import (
+    get_cache,
+    get_cached_folders_choices,
+    get_files_index_cache_key,
+)
+from sharing_configs.catalog import get_catalog_files_index, get_catalog_folders_choices
+from sharing_configs.client_util import AsyncSharingConfigsClient
+from sharing_configs.conf import get_setting
+from sharing_configs.exceptions import ApiException
+from sharing_configs.files import ImportedFile
+
+try:
+    from asgiref.sync import async_to_sync, sync_to_async
+except ImportError:  # pragma: no cover
+    async_to_sync = sync_to_async = None
+
+# maximum number of filenames the file picker asks for at once
+FILE_PICKER_MAX_LIMIT = 500
 
 
 def get_imported_folders_choices(permission: Optional[str]) -> list:
     """
     create list of tuples (folders name) based on api response
-    ex:[('folder_one', 'folder_one'), ('folder_two', 'folder_two')]
+    ex:[('folder_one', 'folder_one'), ('folder_two', 'folder_two')];
+    the choices are cached per label and permission, or read from the local
+    catalog when it is used
     """
-    client = SharingConfigsClient()
+    client = get_client()
+    choices = get_catalog_folders_choices(client.label, permission)
+    if choices is not None:
+        return choices
+    return get_cached_folders_choices(
+        client.label, permission, lambda: fetch_folders_choices(permission)
+    )
+
+
+def fetch_folders_choices(permission: Optional[str]) -> list:
+    """retrieve the folder choices from the API, bypassing the cache"""
+    results = list(get_client().iter_folders(permission))
+    return FolderTree.from_results(results).choices()
 
-    api_dict = client.get_folders(permission)
-    results_list = api_dict.get("results", "No results in your dict")
 
-    folders_choices = []
-    if results_list is not None:
-        lst = FolderList()
-        all_folders = lst.folder_collector(results_list)
-        for folder in all_folders:
-            folders_choices.append((folder, folder))
+async def aget_imported_folders_choices(
+    client: AsyncSharingConfigsClient, permission: Optional[str]
+) -> list:
+    """
+    async variant of get_imported_folders_choices; missing choices are retrieved
+    with the async client, expired ones are refreshed in the background with the
+    sync client as there is no event loop there
+    """
+    choices = await sync_to_async(get_catalog_folders_choices)(client.label, permission)
+    if choices is not None:
+        return choices
 
-    return folders_choices
+    async def afetch():
+        results = [item async for item in client.iter_folders(permission)]
+        return FolderTree.from_results(results).choices()
+
+    return await sync_to_async(get_cached_folders_choices)(
+        client.label,
+        permission,
+        async_to_sync(afetch),
+        lambda: fetch_folders_choices(permission),
+    )
 
 
 def get_imported_files_choices(folder: str) -> list:
@@ -29,20 +85,185 @@ def get_imported_files_choices(folder: str) -> list:
     create list of filenames based on api response and to be passed to js
 
     """
-    client = SharingConfigsClient()
+    return list(iter_filenames(get_client(), folder))
+
+
+async def aget_imported_files_choices(
+    client: AsyncSharingConfigsClient, folder: str
+) -> list:
+    """async variant of get_imported_files_choices"""
+    return [filename async for filename in aiter_filenames(client, folder)]
+
+
+def iter_filenames(client: BaseBackend, folder: str) -> Iterator[str]:
+    """
+    yield the filenames of a folder, fetching the pages of the listing as they
+    are consumed
+    """
+    for item in client.iter_files(folder):
+        yield item.get("filename")
+
+
+async def aiter_filenames(
+    client: AsyncSharingConfigsClient, folder: str
+) -> AsyncIterator[str]:
+    """async variant of iter_filenames"""
+    async for item in client.iter_files(folder):
+        yield item.get("filename")
+
+
+class FileIndex(NamedTuple):
+    """
+    filenames of a folder sorted case-insensitively, with their casefolded keys,
+    to search them as the user types
+    """
+
+    keys: List[str]
+    names: List[str]
+
+    @classmethod
+    def from_filenames(cls, filenames) -> "FileIndex":
+        names = sorted(filenames, key=lambda name: (name.casefold(), name))
+        return cls([name.casefold() for name in names], names)
+
+    def search(self, q: str) -> List[str]:
+        """
+        return the filenames starting with q, followed by the other filenames
+        containing it; both in sorted order
+        """
+        q = q.casefold()
+        if not q:
+            return self.names
+        # the keys starting with q are contiguous in the sorted keys
+        start = bisect_left(self.keys, q)
+        end = bisect_left(self.keys, q + "\U0010ffff", start)
+        contained = [
+            name
+            for i, (key, name) in enumerate(zip(self.keys, self.names))
+            if q in key and not start <= i < end
+        ]
+        return self.names[start:end] + contained
+
+
+def get_files_index(client: BaseBackend, folder: str) -> FileIndex:
+    """
+    return the cached file index of a folder, listing the folder when missing;
+    the files are searched in the local catalog when it is used
+    """
+    catalog_index = get_catalog_files_index(client.label, folder)
+    if catalog_index is not None:
+        return catalog_index
+    cache = get_cache()
+    key = get_files_index_cache_key(client.label, folder)
+    index = cache.get(key)
+    if index is None:
+        index = FileIndex.from_filenames(iter_filenames(client, folder))
+        cache.set(key, index, timeout=get_setting("FILES_INDEX_CACHE_TIMEOUT"))
+    return index
+
+
+async def aget_files_index(client: AsyncSharingConfigsClient, folder: str) -> FileIndex:
+    """async variant of get_files_index"""
+    catalog_index = await sync_to_async(get_catalog_files_index)(client.label, folder)
+    if catalog_index is not None:
+        return catalog_index
+    cache = get_cache()
+    key = await sync_to_async(get_files_index_cache_key)(client.label, folder)
+    index = await sync_to_async(cache.get)(key)
+    if index is None:
+        filenames = [filename async for filename in aiter_filenames(client, folder)]
+        index = FileIndex.from_filenames(filenames)
+        await sync_to_async(cache.set)(
+            key, index, timeout=get_setting("FILES_INDEX_CACHE_TIMEOUT")
+        )
+    return index
+
+
+def get_file_picker_params(query) -> Tuple[str, int, int]:
+    """
+    return the search term, offset and limit of a request of the file picker;
+    missing or invalid numbers fall back to the first page
+    """
+    q = query.get("q", "").strip()
+    try:
+        offset = max(int(query.get("offset", 0)), 0)
+    except ValueError:
+        offset = 0
+    try:
+        limit = int(query.get("limit", get_setting("FILE_PICKER_PAGE_SIZE")))
+    except ValueError:
+        limit = get_setting("FILE_PICKER_PAGE_SIZE")
+    return q, offset, min(max(limit, 1), FILE_PICKER_MAX_LIMIT)
+
+
+def get_file_picker_page(index: FileIndex, query) -> dict:
+    """JSON response of the file picker: one page of the matching filenames"""
+    q, offset, limit = get_file_picker_params(query)
+    matches = index.search(q)
+    return {
+        "resp": matches[offset : offset + limit],
+        "count": len(matches),
+        "offset": offset,
+        "limit": limit,
+        "status_code": 200,
+    }
+
+
+class Folder(NamedTuple):
+    path: str
+    name: str
+    depth: int
+    parent: Optional[str]
+
+
+class FolderTree:
+    """
+    Flattened tree of folders: the folders in depth-first order and an index
+    of the folders by their full path ("parent/child").
+    """
+
+    def __init__(self, folders: List[Folder]) -> None:
+        self.folders = folders
+        self.index = {folder.path: folder for folder in folders}
+
+    @classmethod
+    def from_results(cls, results: list) -> "FolderTree":
+        """
+        flatten the (nested) folders of an api response without recursion,
+        so deep trees do not hit the recursion limit
+        """
+        folders = []
+        stack = [(None, 0, item) for item in reversed(results)]
+        while stack:
+            parent, depth, item = stack.pop()
+            name = item["name"]
+            path = f"{parent}/{name}" if parent is not None else name
+            folders.append(Folder(path, name, depth, parent))
+            children = item.get("children") or ()
+            stack.extend((path, depth + 1, child) for child in reversed(children))
+        return cls(folders)
+
+    def __iter__(self) -> Iterator[Folder]:
+        return iter(self.folders)
+
+    def __len__(self) -> int:
+        return len(self.folders)
 
-    api_dict = client.get_files(folder)
-    results_list = api_dict.get("results", None)
+    def __contains__(self, path: str) -> bool:
+        return path in self.index
 
-    file_choices = []
-    if results_list is not None:
-        for item in results_list:
-            file_choices.append(item.get("filename"))
+    def children(self, path: Optional[str]) -> List[Folder]:
+        """return the direct sub-folders of a folder, or the root folders for None"""
+        return [folder for folder in self.folders if folder.parent == path]
 
-    return file_choices
+    def choices(self) -> list:
+        """return the folder paths as choices for a form field"""
+        return [(folder.path, folder.path) for folder in self.folders]
 
 
 class FolderList:
+    """collect folder names; kept for backwards compatibility, use FolderTree"""
+
     def __init__(self) -> None:
         self.folders_lst = []
 
@@ -50,14 +271,61 @@ class FolderList:
         """
         Take a list and extract all (nested)folders from it.
         """
-
-        for item in lst:
-            self.folders_lst.append(item["name"])
-            if len(item.get("children")) != 0:
-                self.folder_collector(lst=item.get("children"))
+        self.folders_lst.extend(folder.name for folder in FolderTree.from_results(lst))
         return self.folders_lst
 
 
 def get_str_from_encoded64_object(content: bytes) -> str:
     """return string as a result of decoding (base64) byte object"""
     return base64.b64encode(content).decode("utf-8")
+
+
+def get_max_workers(client: BaseBackend) -> int:
+    """number of concurrent requests, bounded by the connection pool of the client"""
+    return max(min(get_setting("MAX_WORKERS"), client.config.pool_size), 1)
+
+
+def export_concurrently(
+    client: BaseBackend, folder: str, items: List[Tuple[Any, dict]]
+) -> List[Tuple[Any, Union[dict, ApiException]]]:
+    """
+    upload the data of several (object, data) items to a folder over a bounded pool
+    of threads; return (object, response) tuples, response is the error if an
+    upload failed
+    """
+
+    def upload(item):
+        obj, data = item
+        try:
+            return (obj, client.export(folder, data))
+        except ApiException as exc:
+            return (obj, exc)
+
+    with ThreadPoolExecutor(max_workers=get_max_workers(client)) as executor:
+        return list(executor.map(upload, items))
+
+
+def import_concurrently(
+    client: BaseBackend,
+    folder: str,
+    filenames: List[str],
+    etags: Optional[Dict[str, str]] = None,
+) -> List[Tuple[str, Union[ImportedFile, ApiException, None]]]:
+    """
+    download several files of a folder over a bounded pool of threads;
+    return (filename, file) tuples, file is the error if a download failed and
+    None if the file did not change since it was downloaded with the given ETag
+    """
+    etags = etags or {}
+
+    def download(filename):
+        try:
+            return (
+                filename,
+                client.import_file(folder, filename, etag=etags.get(filename)),
+            )
+        except ApiException as exc:
+            return (filename, exc)
+
+    with ThreadPoolExecutor(max_workers=get_max_workers(client)) as executor:
+        return list(executor.map(download, filenames))
@@ -0,0 +1,25 @@
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .conf import get_setting
+from .metrics import metrics
+
+
+def is_metrics_allowed(request) -> bool:
+    """staff users and scrapers sending the SHARING_CONFIGS_METRICS_TOKEN may read"""
+    token = get_setting("METRICS_TOKEN")
+    if token:
+        authorization = request.headers.get("Authorization", "")
+        if constant_time_compare(authorization, f"Bearer {token}"):
+            return True
+    user = request.user
+    return user.is_active and user.is_staff
+
+
+def metrics_view(request):
+    """expose the metrics of the calls to the API to Prometheus"""
+    if not is_metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.to_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,6 +1,11 @@
-# import pytest
+import pytest
 
+from sharing_configs.cache import get_cache
 
-# @pytest.fixture
-# def some_fixture(request):
-#     return "foo"
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """the cached folders should not leak between tests"""
+    get_cache().clear()
+    yield
+    get_cache().clear()
@@ -0,0 +1,235 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from ..factories import SharingConfigsConfigFactory
+from .mock_util import get_mock_folders
+
+
+class StandInApi:
+    """
+    Local stand-in of the Sharing Configs API served over real HTTP.
+
+    Listings and files carry an ETag and answer conditional requests with 304; every
+    request is recorded so tests can assert on what went over the wire. With
+    compression, responses are compressed with zstd or gzip for clients accepting
+    it and compressed request bodies are accepted; otherwise those are answered
+    with 415. With a
+    page size, listings are paginated with an offset and a "next" link.
+    """
+
+    def __init__(
+        self, label="label", folders=None, files=None, latency=0, compression=False
+    ):
+        self.label = label
+        self.folders = (
+            folders if folders is not None else get_mock_folders("export")["results"]
+        )
+        # {folder: {filename: bytes}}
+        self.files = files if files is not None else {}
+        self.latency = latency
+        self.compression = compression
+        self.cache_control = None
+        self.page_size = None
+        self.requests = []
+        self._server = None
+
+    @property
+    def api_endpoint(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/v1/"
+
+    def start(self) -> "StandInApi":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInApi":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def requests_to(self, method: str) -> list:
+        return [request for request in self.requests if request["method"] == method]
+
+
+class StandInApiTestMixin:
+    """
+    Run a StandInApi for each test, with the config pointing at it; override
+    get_stand_in_api to serve other folders or files
+    """
+
+    # values of the config besides the endpoint and label of the stand-in
+    stand_in_config = {}
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.api = self.get_stand_in_api().start()
+        self.addCleanup(self.api.stop)
+        self.config_object = SharingConfigsConfigFactory(
+            api_endpoint=self.api.api_endpoint,
+            label=self.api.label,
+            **self.stand_in_config,
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def api(self) -> StandInApi:
+        return self.server.api
+
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self):
+        """return (folder, filename) of the request; both are None for the folders"""
+        path = unquote(urlsplit(self.path).path)
+        prefix = f"/api/v1/config/{self.api.label}/folder/"
+        if not path.startswith(prefix):
+            return None
+        rest = path[len(prefix) :]
+        if not rest:
+            return (None, None)
+        folder, sep, filename = rest.rpartition("/files/")
+        if not sep:
+            return None
+        return (folder, filename or None)
+
+    def _record(self, body=b""):
+        self._entry = {
+            "method": self.command,
+            "path": self.path,
+            "headers": dict(self.headers),
+            "body": body,
+        }
+        self.api.requests.append(self._entry)
+        if self.api.latency:
+            time.sleep(self.api.latency)
+
+    def _send(self, status, body=b"", headers=None):
+        headers = dict(headers or {})
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        if self.api.compression and body:
+            if zstandard is not None and "zstd" in accept_encoding:
+                body = zstandard.ZstdCompressor().compress(body)
+                headers["Content-Encoding"] = "zstd"
+            elif "gzip" in accept_encoding:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+        self._entry["response_length"] = len(body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_versioned(self, body, content_type):
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        headers = {"ETag": etag}
+        if self.api.cache_control:
+            headers["Cache-Control"] = self.api.cache_control
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers=headers)
+        else:
+            headers["Content-Type"] = content_type
+            self._send(200, body, headers)
+
+    def _send_listing(self, results):
+        data = {"count": len(results), "next": None, "results": results}
+        if self.api.page_size:
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            offset = int(query.pop("offset", ["0"])[0])
+            end = offset + self.api.page_size
+            data["results"] = results[offset:end]
+            if end < len(results):
+                query = urlencode({**query, "offset": end}, doseq=True)
+                host = "http://%s:%d" % self.server.server_address[:2]
+                data["next"] = f"{host}{url.path}?{query}"
+        self._send_versioned(json.dumps(data).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        self._record()
+        route = self._route()
+        if route is None:
+            return self._send(404)
+        folder, filename = route
+        if folder is None:
+            permission = parse_qs(urlsplit(self.path).query).get("permission")
+            folders = [
+                item
+                for item in self.api.folders
+                if not permission or item.get("permission") == permission[0]
+            ]
+            return self._send_listing(folders)
+        files = self.api.files.get(folder)
+        if files is None:
+            return self._send(404)
+        if filename is None:
+            return self._send_listing([{"filename": name} for name in sorted(files)])
+        if filename not in files:
+            return self._send(404)
+        self._send_versioned(files[filename], "application/octet-stream")
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b""
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            chunk = self.rfile.read(size + 2)[:size]
+            if not size:
+                return body
+            body += chunk
+
+    def do_POST(self):
+        body = self._read_body()
+        self._record(body)
+        if self.headers.get("Content-Encoding"):
+            if not self.api.compression:
+                return self._send(415)
+            if self.headers["Content-Encoding"] == "zstd":
+                body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+            else:
+                body = gzip.decompress(body)
+        route = self._route()
+        if route is None or route[0] is None or route[1] is not None:
+            return self._send(404)
+        data = json.loads(body)
+        folder = route[0]
+        self.api.files.setdefault(folder, {})[data["filename"]] = base64.b64decode(
+            data["content"]
+        )
+        resp = {
+            "download_url": self.path + data["filename"],
+            "filename": data["filename"],
+        }
+        self._send(
+            201, json.dumps(resp).encode("utf-8"), {"Content-Type": "application/json"}
+        )
@@ -0,0 +1,263 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+from django.contrib.admin.sites import site
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from sharing_configs.admin import async_admin_view
+from sharing_configs.breaker import CircuitOpen
+from sharing_configs.client_util import AsyncSharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.files import ExportPayload
+from testapp.admin import ThemeAdmin
+from testapp.models import Configuration, Theme
+
+from .factories import (
+    SharingConfigsConfigFactory,
+    SuperUserFactory,
+    ThemeFactory,
+    UserFactory,
+)
+from .mock_data_api.mock_util import get_mock_folders
+
+
+class AsyncThemeAdmin(ThemeAdmin):
+    sharing_configs_async_views = True
+
+
+class TestAsyncClient(TestCase):
+    """Test the async client against a mocked transport"""
+
+    def setUp(self) -> None:
+        self.config_object = SharingConfigsConfigFactory()
+        self.requests = []
+
+    def get_client(self, *responses) -> AsyncSharingConfigsClient:
+        responses = list(responses)
+
+        def handler(request):
+            self.requests.append(request)
+            return responses.pop(0)
+
+        transport = httpx.MockTransport(handler)
+        return AsyncSharingConfigsClient(
+            self.config_object, client=httpx.AsyncClient(transport=transport)
+        )
+
+    async def test_get_folders_with_permission(self):
+        folders = get_mock_folders("export")
+        client = self.get_client(httpx.Response(200, json=folders))
+
+        resp = await client.get_folders(permission="write")
+
+        self.assertEqual(resp, folders)
+        request = self.requests[0]
+        self.assertEqual(request.url.params["permission"], "write")
+        self.assertEqual(
+            request.headers["authorization"], f"Token {self.config_object.api_key}"
+        )
+
+    async def test_import_data(self):
+        client = self.get_client(httpx.Response(200, content=b"some-string"))
+
+        content = await client.import_data("folder_one", "test.txt")
+
+        self.assertEqual(content, b"some-string")
+        self.assertEqual(
+            str(self.requests[0].url), client.get_import_url("folder_one", "test.txt")
+        )
+
+    @patch("sharing_configs.client_util.RETRY_BACKOFF_FACTOR", 0)
+    async def test_get_retried_on_service_unavailable(self):
+        client = self.get_client(
+            httpx.Response(503), httpx.Response(200, json={"results": []})
+        )
+
+        resp = await client.get_files("folder_one")
+
+        self.assertEqual(resp, {"results": []})
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_export_not_retried(self):
+        client = self.get_client(httpx.Response(503))
+
+        with self.assertRaises(ApiException):
+            await client.export("folder_one", {"filename": "file.txt"})
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(json.loads(self.requests[0].content), {"filename": "file.txt"})
+
+    async def test_export_streamed(self):
+        client = self.get_client(httpx.Response(201, json={"filename": "file.txt"}))
+        payload = ExportPayload(b"some-content", "file.txt", "admin")
+
+        await client.export("folder_one", payload)
+
+        request = self.requests[0]
+        self.assertEqual(request.headers["Content-Length"], str(payload.len))
+        self.assertEqual(json.loads(request.content)["content"], "c29tZS1jb250ZW50")
+
+
+class TestAsyncAdminViews(TestCase):
+    """Test the async variants of the import and export views"""
+
+    def setUp(self) -> None:
+        self.user = SuperUserFactory()
+        self.user_not_staff = UserFactory()
+        self.theme = ThemeFactory()
+        self.configuration = Configuration.objects.create(theme=self.theme)
+        self.model_admin = AsyncThemeAdmin(Theme, site)
+
+    def get_request(self, method, url, data=None):
+        request = getattr(RequestFactory(), method)(url, data=data or {})
+        request.user = self.user
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        request._dont_enforce_csrf_checks = True
+        return request
+
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        return_value=get_mock_folders("import"),
+    )
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "import_file",
+        new_callable=AsyncMock,
+        return_value=ContentFile(
+            b'{"accent": "#f8f8f8", "name": "spring", "primary": "#8d979c", '
+            b'"primary_fg": "#1a2b3c", "secondary": "#315980"}',
+            name="zoo.txt",
+        ),
+    )
+    async def test_import_downloads_and_validates(self, mock_import, mock_folders):
+        url = reverse("admin:testapp_theme_sc_import")
+        request = self.get_request(
+            "post", url, {"folder": "folder_one", "file_name": "zoo.txt"}
+        )
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        resp = await view(request)
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, url)
+        self.assertIn("no-cache", resp["Cache-Control"])
+        mock_folders.assert_awaited_once_with(None)
+        mock_import.assert_awaited_once_with("folder_one", "zoo.txt", etag=None)
+        exists = sync_to_async(Theme.objects.filter(name="spring").exists)
+        self.assertTrue(await exists())
+
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        return_value=get_mock_folders("import"),
+    )
+    @patch.object(AsyncSharingConfigsClient, "import_file", new_callable=AsyncMock)
+    async def test_import_folder_not_in_choices(self, mock_import, mock_folders):
+        url = reverse("admin:testapp_theme_sc_import")
+        request = self.get_request(
+            "post", url, {"folder": "other_folder", "file_name": "zoo.txt"}
+        )
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        resp = await view(request)
+
+        self.assertEqual(resp.status_code, 200)
+        mock_import.assert_not_awaited()
+
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        return_value=get_mock_folders("import"),
+    )
+    async def test_import_folders_cached(self, mock_folders):
+        url = reverse("admin:testapp_theme_sc_import")
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        await view(self.get_request("get", url))
+        resp = await view(self.get_request("get", url))
+
+        self.assertContains(resp, "folder_two")
+        mock_folders.assert_awaited_once_with(None)
+
+    @patch.object(AsyncSharingConfigsClient, "is_available", return_value=False)
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        side_effect=CircuitOpen,
+    )
+    async def test_import_api_unavailable(self, mock_folders, mock_available):
+        url = reverse("admin:testapp_theme_sc_import")
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        resp = await view(self.get_request("get", url))
+
+        self.assertContains(resp, "currently unavailable")
+
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        side_effect=ApiException,
+    )
+    async def test_import_invalid_form_without_folders(self, mock_folders):
+        url = reverse("admin:testapp_theme_sc_import")
+        request = self.get_request("get", url)
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        resp = await view(request)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Choose a folder")
+
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "get_folders",
+        new_callable=AsyncMock,
+        return_value=get_mock_folders("export"),
+    )
+    @patch.object(
+        AsyncSharingConfigsClient,
+        "export",
+        new_callable=AsyncMock,
+        return_value={"download_url": "http://example.com", "filename": "zoo.txt"},
+    )
+    async def test_export(self, mock_export, mock_folders):
+        url = reverse(
+            "admin:testapp_theme_sc_export", kwargs={"object_id": self.theme.id}
+        )
+        request = self.get_request(
+            "post", url, {"folder": "folder_one", "file_name": "zoo.txt"}
+        )
+        view = async_admin_view(site, self.model_admin.asharing_configs_export_view)
+
+        resp = await view(request, object_id=str(self.theme.id))
+
+        self.assertEqual(resp.status_code, 302)
+        mock_folders.assert_awaited_once_with("write")
+        folder, data = mock_export.await_args.args
+        self.assertEqual(folder, "folder_one")
+        self.assertEqual(data.filename, "zoo.txt")
+        self.assertEqual(data.author, str(self.user))
+
+    async def test_permission_required(self):
+        url = reverse("admin:testapp_theme_sc_import")
+        request = self.get_request("get", url)
+        request.user = self.user_not_staff
+        view = async_admin_view(site, self.model_admin.aimport_from_view)
+
+        resp = await view(request)
+
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith(reverse("admin:login")))
@@ -0,0 +1,95 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.admin import helpers
+from django.test import TestCase
+from django.urls import reverse
+
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from testapp.models import Configuration
+
+from .factories import SuperUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApiTestMixin
+
+
+class TestBulkExportAction(StandInApiTestMixin, TestCase):
+    """Test exporting selected objects from the changelist"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = SuperUserFactory()
+        self.client.force_login(self.user)
+        self.themes = [ThemeFactory(name=f"theme-{i}") for i in range(5)]
+        self.configuration = Configuration.objects.create(theme=self.themes[0])
+        self.url = reverse("admin:testapp_theme_changelist")
+
+    def get_data(self, **extra):
+        return {
+            "action": "sharing_configs_bulk_export",
+            helpers.ACTION_CHECKBOX_NAME: [theme.pk for theme in self.themes],
+            **extra,
+        }
+
+    def test_action_asks_for_folder(self):
+        resp = self.client.post(self.url, data=self.get_data())
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "sharing_configs/admin/bulk_export.html")
+        self.assertContains(resp, "theme-4")
+        self.assertEqual(
+            resp.context["form"].fields["folder"].choices[1],
+            ("folder_one", "folder_one"),
+        )
+
+    def test_export_selected_objects(self):
+        resp = self.client.post(
+            self.url, data=self.get_data(apply="Export", folder="folder_one")
+        )
+
+        self.assertRedirects(resp, self.url)
+        exported = self.api.files["folder_one"]
+        self.assertEqual(
+            sorted(exported), [f"theme-{i}.json" for i in range(len(self.themes))]
+        )
+        self.assertEqual(json.loads(exported["theme-3.json"])["name"], "theme-3")
+        uploads = self.api.requests_to("POST")
+        self.assertEqual(len(uploads), 5)
+        self.assertEqual(json.loads(uploads[0]["body"])["author"], str(self.user))
+        messages = [str(msg) for msg in resp.wsgi_request._messages]
+        self.assertTrue(messages[0].startswith("5 of 5 objects have been exported in"))
+        self.assertTrue(
+            messages[0].endswith("seconds: theme-4, theme-3, theme-2, theme-1, theme-0")
+        )
+
+    def test_failed_uploads_reported_per_object(self):
+        export = SharingConfigsClient.export
+
+        def fail_theme_two(client, folder, data):
+            if data.filename == "theme-2.json":
+                raise ApiException
+            return export(client, folder, data)
+
+        with patch.object(SharingConfigsClient, "export", fail_theme_two):
+            resp = self.client.post(
+                self.url,
+                data=self.get_data(apply="Export", folder="folder_one"),
+                follow=True,
+            )
+
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertEqual(messages[0], "Export of theme-2 failed")
+        self.assertTrue(messages[1].startswith("4 of 5 objects have been exported"))
+        self.assertTrue(
+            messages[1].endswith("seconds: theme-4, theme-3, theme-1, theme-0")
+        )
+        self.assertNotIn("theme-2.json", self.api.files["folder_one"])
+
+    def test_invalid_folder(self):
+        resp = self.client.post(
+            self.url, data=self.get_data(apply="Export", folder="unknown")
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.context["form"].errors["folder"])
+        self.assertEqual(self.api.requests_to("POST"), [])
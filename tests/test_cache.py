@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+import requests_mock
+
+from sharing_configs.cache import (
+    get_cached_folders_choices,
+    invalidate_folders_cache,
+    revalidation_executor,
+)
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.utils import get_imported_folders_choices
+
+from .factories import SharingConfigsConfigFactory
+from .mock_data_api.mock_util import export_api_response, get_mock_folders
+
+
+def wait_for_revalidation():
+    revalidation_executor.submit(lambda: None).result()
+
+
+class TestFoldersCache(TestCase):
+    """Test caching the folder choices"""
+
+    def setUp(self) -> None:
+        self.config_object = SharingConfigsConfigFactory()
+
+    @patch(
+        "sharing_configs.client_util.SharingConfigsClient.get_folders",
+        return_value=get_mock_folders("import"),
+    )
+    def test_folders_cached_per_permission(self, mock_folders):
+        get_imported_folders_choices(None)
+        choices = get_imported_folders_choices(None)
+        get_imported_folders_choices("write")
+
+        self.assertEqual(
+            choices, [("folder_one", "folder_one"), ("folder_two", "folder_two")]
+        )
+        self.assertEqual(mock_folders.call_count, 2)
+        mock_folders.assert_any_call(None)
+        mock_folders.assert_any_call("write")
+
+    @override_settings(SHARING_CONFIGS_FOLDERS_CACHE_TIMEOUT=0)
+    def test_stale_folders_returned_while_refreshed(self):
+        fetch = iter([["old"], ["new"]]).__next__
+
+        first = get_cached_folders_choices("label", None, fetch)
+        second = get_cached_folders_choices("label", None, fetch)
+        wait_for_revalidation()
+        third = get_cached_folders_choices("label", None, fetch)
+
+        self.assertEqual(first, ["old"])
+        self.assertEqual(second, ["old"])
+        self.assertEqual(third, ["new"])
+
+    @override_settings(SHARING_CONFIGS_FOLDERS_CACHE_TIMEOUT=0)
+    def test_stale_folders_refreshed_with_refetch(self):
+        get_cached_folders_choices("label", None, lambda: ["old"])
+        get_cached_folders_choices("label", None, lambda: ["fetched"], lambda: ["new"])
+        wait_for_revalidation()
+
+        self.assertEqual(get_cached_folders_choices("label", None, list), ["new"])
+
+    @override_settings(SHARING_CONFIGS_FOLDERS_CACHE_TIMEOUT=0)
+    def test_failed_refresh_keeps_stale_folders(self):
+        def fail():
+            raise ApiException
+
+        get_cached_folders_choices("label", None, lambda: ["old"])
+        get_cached_folders_choices("label", None, fail)
+        wait_for_revalidation()
+
+        self.assertEqual(get_cached_folders_choices("label", None, fail), ["old"])
+
+    def test_invalidate(self):
+        get_cached_folders_choices("label", "write", lambda: ["old"])
+
+        invalidate_folders_cache("label")
+
+        self.assertEqual(
+            get_cached_folders_choices("label", "write", lambda: ["new"]), ["new"]
+        )
+
+    @requests_mock.Mocker()
+    def test_export_invalidates_folders(self, mock_api):
+        client = SharingConfigsClient()
+        mock_api.get(client.get_list_folders_url(), json=get_mock_folders("export"))
+        mock_api.post(client.get_export_url("folder_one"), json=export_api_response())
+
+        get_imported_folders_choices("write")
+        client.export("folder_one", {"filename": "file.txt"})
+        get_imported_folders_choices("write")
+
+        self.assertEqual(
+            [r.method for r in mock_api.request_history], ["GET", "POST", "GET"]
+        )
@@ -0,0 +1,329 @@
+import datetime
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from asgiref.sync import sync_to_async
+
+from sharing_configs.cache import (
+    get_cache,
+    get_catalog_synced_key,
+    invalidate_folders_cache,
+    revalidation_executor,
+)
+from sharing_configs.catalog import get_file_values, sync_catalog, sync_executor
+from sharing_configs.client_util import AsyncSharingConfigsClient, SharingConfigsClient
+from sharing_configs.files import ExportPayload
+from sharing_configs.forms import ExportToForm, ImportForm
+from sharing_configs.models import CatalogFile, CatalogFolder
+from sharing_configs.utils import aget_files_index, get_file_picker_page
+from testapp.models import Configuration
+
+from .factories import StaffUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+class TestFileValues(SimpleTestCase):
+    """Test reading the metadata of the files of a listing"""
+
+    @override_settings(USE_TZ=True)
+    def test_metadata(self):
+        values = get_file_values(
+            {
+                "filename": "Theme.JSON",
+                "size": "120",
+                "author": "admin",
+                "modified": "2022-05-01T10:00:00",
+            }
+        )
+
+        self.assertEqual(
+            values,
+            {
+                "key": "theme.json",
+                "size": 120,
+                "author": "admin",
+                "modified": datetime.datetime(
+                    2022, 5, 1, 10, tzinfo=datetime.timezone.utc
+                ),
+            },
+        )
+
+    @override_settings(USE_TZ=False, TIME_ZONE="UTC")
+    def test_naive_modified(self):
+        values = get_file_values(
+            {"filename": "a.json", "modified": "2022-05-01T12:00+02:00"}
+        )
+
+        self.assertEqual(values["modified"], datetime.datetime(2022, 5, 1, 10))
+
+    def test_missing_metadata(self):
+        values = get_file_values({"filename": "a.json", "size": "?", "modified": "?"})
+
+        self.assertEqual((values["size"], values["author"]), (None, ""))
+        self.assertIsNone(values["modified"])
+
+
+class CatalogTestMixin(StandInApiTestMixin):
+    def get_stand_in_api(self) -> StandInApi:
+        files = {
+            "folder_one": {
+                "a.json": b"{}",
+                "theme-b.json": b"{}",
+                "blue-theme.json": b"",
+            },
+            "folder_one/sub-folder-1.1": {},
+            "folder_two": {"c.json": b"{}"},
+        }
+        return StandInApi(files=files)
+
+
+class TestSyncCatalog(CatalogTestMixin, TestCase):
+    """Test mirroring the folders and files of the API in the local catalog"""
+
+    def test_sync(self):
+        result = sync_catalog()
+
+        folders = CatalogFolder.objects.all()
+        self.assertEqual(
+            [(folder.path, folder.name) for folder in folders],
+            [
+                ("folder_one", "folder_one"),
+                ("folder_one/sub-folder-1.1", "sub-folder-1.1"),
+                ("folder_two", "folder_two"),
+            ],
+        )
+        self.assertEqual(folders[1].parent, folders[0])
+        self.assertEqual(folders[1].permission, "write")
+        self.assertEqual(
+            sorted(folders[0].files.values_list("filename", flat=True)),
+            ["a.json", "blue-theme.json", "theme-b.json"],
+        )
+        self.assertEqual((result.folders_created, result.files_created), (3, 4))
+        self.assertEqual(result.failed, [])
+
+    def test_unchanged_listings_not_written(self):
+        sync_catalog()
+        requests = len(self.api.requests)
+
+        # the folders are read in a transaction, nothing is written
+        with self.assertNumQueries(3):
+            result = sync_catalog()
+
+        self.assertEqual(result.folders_unchanged, 3)
+        self.assertEqual(
+            (result.folders_updated, result.files_created, result.files_updated),
+            (0, 0, 0),
+        )
+        self.assertEqual(len(self.api.requests), requests + 4)
+
+    def test_incremental_changes(self):
+        sync_catalog()
+        files = self.api.files["folder_one"]
+        del files["a.json"]
+        files["d.json"] = b"{}"
+        self.api.folders = self.api.folders[:1]
+
+        result = sync_catalog()
+
+        self.assertEqual(
+            sorted(CatalogFile.objects.values_list("filename", flat=True)),
+            ["blue-theme.json", "d.json", "theme-b.json"],
+        )
+        self.assertEqual((result.files_created, result.files_deleted), (1, 1))
+        self.assertEqual(result.folders_deleted, 1)
+        self.assertFalse(CatalogFolder.objects.filter(path="folder_two").exists())
+
+    def test_changed_metadata_updated(self):
+        sync_catalog()
+        get_files = SharingConfigsClient.get_files
+
+        def get_files_with_author(client, folder):
+            resp = get_files(client, folder)
+            for item in resp["results"]:
+                item["author"] = "admin"
+            return resp
+
+        with patch.object(SharingConfigsClient, "get_files", get_files_with_author):
+            result = sync_catalog()
+
+        self.assertEqual(result.files_updated, 4)
+        self.assertEqual(CatalogFile.objects.filter(author="admin").count(), 4)
+
+    def test_failed_folder_keeps_files(self):
+        sync_catalog()
+        self.api.files["folder_one"]["new.json"] = b"{}"
+        del self.api.files["folder_two"]
+
+        result = sync_catalog()
+
+        self.assertEqual(result.failed, ["folder_two"])
+        self.assertTrue(CatalogFile.objects.filter(filename="c.json").exists())
+        self.assertTrue(CatalogFile.objects.filter(filename="new.json").exists())
+
+    def test_sync_selected_folders(self):
+        sync_catalog(folders=["folder_two"])
+
+        self.assertEqual(CatalogFolder.objects.count(), 3)
+        self.assertEqual(
+            list(CatalogFile.objects.values_list("filename", flat=True)), ["c.json"]
+        )
+
+    def test_long_paths_skipped(self):
+        self.api.folders[0]["children"].append(
+            {"name": "x" * 500, "children": [{"name": "sub", "children": []}]}
+        )
+
+        with self.assertLogs("sharing_configs.catalog", "WARNING"):
+            sync_catalog()
+
+        self.assertEqual(CatalogFolder.objects.count(), 3)
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command("sharing_configs_sync_catalog", stdout=out)
+
+        self.assertIn("Folders: 3 created, 0 updated, 0 deleted", out.getvalue())
+        self.assertIn("Files: 4 created, 0 updated, 0 deleted", out.getvalue())
+
+    def test_command_failed_folder(self):
+        del self.api.files["folder_two"]
+
+        with self.assertRaisesMessage(CommandError, "1 folders could not be synced"):
+            call_command("sharing_configs_sync_catalog", stdout=StringIO())
+
+
+@override_settings(SHARING_CONFIGS_CATALOG=True)
+class TestReadCatalog(CatalogTestMixin, TestCase):
+    """Test reading the folders and files from the local catalog"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        sync_catalog()
+        self.api.requests.clear()
+        self.client.force_login(StaffUserFactory())
+        Configuration.objects.create(theme=ThemeFactory())
+
+    def test_folder_choices(self):
+        CatalogFolder.objects.filter(path="folder_two").update(permission="read")
+
+        import_choices = ImportForm().fields["folder"].choices
+        export_choices = ExportToForm().fields["folder"].choices
+
+        self.assertEqual(
+            [path for path, _label in import_choices[1:]],
+            ["folder_one", "folder_one/sub-folder-1.1", "folder_two"],
+        )
+        self.assertEqual(
+            [path for path, _label in export_choices[1:]],
+            ["folder_one", "folder_one/sub-folder-1.1"],
+        )
+        self.assertEqual(self.api.requests, [])
+
+    def test_file_picker(self):
+        url = reverse("admin:testapp_theme_sc_ajax")
+
+        resp = self.client.get(url, {"folder_name": "folder_one", "q": "THEME"})
+
+        self.assertEqual(resp.json()["resp"], ["theme-b.json", "blue-theme.json"])
+        self.assertEqual(resp.json()["count"], 2)
+        self.assertEqual(self.api.requests, [])
+
+    def test_file_picker_pages(self):
+        url = reverse("admin:testapp_theme_sc_ajax")
+        params = {"folder_name": "folder_one", "q": "e", "limit": 1}
+
+        pages = [
+            self.client.get(url, {**params, "offset": offset}).json()["resp"]
+            for offset in range(3)
+        ]
+
+        self.assertEqual(pages, [["blue-theme.json"], ["theme-b.json"], []])
+
+    def test_not_synced_folder_read_from_api(self):
+        CatalogFolder.objects.filter(path="folder_two").update(synced=None)
+        url = reverse("admin:testapp_theme_sc_ajax")
+
+        resp = self.client.get(url, {"folder_name": "folder_two"})
+
+        self.assertEqual(resp.json()["resp"], ["c.json"])
+        self.assertEqual(len(self.api.requests), 1)
+
+    @override_settings(SHARING_CONFIGS_CATALOG=False)
+    def test_catalog_not_used(self):
+        ImportForm()
+
+        self.assertEqual(len(self.api.requests), 1)
+
+    async def test_async_file_picker(self):
+        client = AsyncSharingConfigsClient(self.config_object)
+
+        index = await aget_files_index(client, "folder_one")
+        page = await sync_to_async(get_file_picker_page)(index, {"q": "a."})
+
+        self.assertEqual(page["resp"], ["a.json"])
+        self.assertEqual(self.api.requests, [])
+
+    def test_exported_folder_read_from_api(self):
+        SharingConfigsClient().export(
+            "folder_two", ExportPayload(b"{}", "d.json", "admin")
+        )
+        url = reverse("admin:testapp_theme_sc_ajax")
+
+        resp = self.client.get(url, {"folder_name": "folder_two"})
+        self.client.get(url, {"folder_name": "folder_one"})
+
+        self.assertEqual(resp.json()["resp"], ["c.json", "d.json"])
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
+
+        sync_catalog()
+        self.api.requests.clear()
+        resp = self.client.get(url, {"folder_name": "folder_two", "q": "d"})
+
+        self.assertEqual(resp.json()["resp"], ["d.json"])
+        self.assertEqual(self.api.requests, [])
+
+    @override_settings(SHARING_CONFIGS_CATALOG_SYNC_INTERVAL=60)
+    def test_periodic_sync(self):
+        with patch.object(sync_executor, "submit") as submit:
+            ImportForm()
+            invalidate_folders_cache(self.api.label, "folder_one")
+            ImportForm()
+            get_cache().set(get_catalog_synced_key(self.api.label), 0, timeout=None)
+            ImportForm()
+            ImportForm()
+
+        # synced by setUp, an export does not sync the whole catalog again
+        submit.assert_called_once()
+
+    @override_settings(SHARING_CONFIGS_CATALOG_SYNC_INTERVAL=60)
+    def test_periodic_sync_apart_from_revalidation(self):
+        get_cache().set(get_catalog_synced_key(self.api.label), 0, timeout=None)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_sync(*args, **kwargs):
+            started.set()
+            release.wait(5)
+
+        with patch("sharing_configs.catalog.sync_catalog", slow_sync):
+            ImportForm()
+            started.wait(5)
+            revalidated = revalidation_executor.submit(lambda: True)
+            self.assertTrue(revalidated.result(timeout=1))
+            release.set()
+            sync_executor.submit(lambda: None).result()
+
+    @override_settings(SHARING_CONFIGS_CATALOG_SYNC_INTERVAL=60)
+    def test_background_sync_errors_logged(self):
+        get_cache().set(get_catalog_synced_key(self.api.label), 0, timeout=None)
+
+        with patch("sharing_configs.catalog.sync_catalog", side_effect=KeyError):
+            with self.assertLogs("sharing_configs.catalog", "ERROR"):
+                ImportForm()
+                sync_executor.submit(lambda: None).result()
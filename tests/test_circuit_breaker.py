@@ -0,0 +1,156 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+import requests_mock
+
+from sharing_configs.breaker import CircuitOpen
+from sharing_configs.cache import get_cache
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.forms import ImportForm
+
+from .factories import SharingConfigsConfigFactory
+from .mock_data_api.mock_util import get_mock_folders
+
+
+@override_settings(
+    SHARING_CONFIGS_CIRCUIT_BREAKER_THRESHOLD=2,
+    SHARING_CONFIGS_CIRCUIT_BREAKER_COOLDOWN=30,
+)
+class TestCircuitBreaker(TestCase):
+    """Test failing fast while the API is down"""
+
+    def setUp(self) -> None:
+        get_cache().clear()
+        self.addCleanup(get_cache().clear)
+        self.config_object = SharingConfigsConfigFactory()
+        self.client_api = SharingConfigsClient()
+        self.url = self.client_api.get_folder_files_url("folder_one")
+
+    def assert_call_fails(self, client=None):
+        with self.assertRaises(ApiException):
+            (client or self.client_api).get_files("folder_one")
+
+    @requests_mock.Mocker()
+    def test_opens_after_threshold(self, m):
+        m.get(self.url, status_code=503)
+
+        self.assert_call_fails()
+        self.assertEqual(self.client_api.breaker.get_state(), "closed")
+        self.assert_call_fails()
+
+        self.assertEqual(self.client_api.breaker.get_state(), "open")
+        self.assertFalse(self.client_api.is_available())
+        with self.assertRaises(CircuitOpen):
+            self.client_api.get_files("folder_one")
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_state_shared_between_clients(self, m):
+        m.get(self.url, status_code=503)
+
+        self.assert_call_fails()
+        self.assert_call_fails(SharingConfigsClient())
+
+        with self.assertRaises(CircuitOpen):
+            SharingConfigsClient().get_files("folder_one")
+
+    @requests_mock.Mocker()
+    def test_success_resets_failures(self, m):
+        m.get(
+            self.url,
+            [
+                {"status_code": 503},
+                {"json": {"results": []}},
+                {"status_code": 503},
+            ],
+        )
+
+        self.assert_call_fails()
+        self.client_api.get_files("folder_one")
+        self.assert_call_fails()
+
+        self.assertEqual(self.client_api.breaker.get_state(), "closed")
+
+    @requests_mock.Mocker()
+    def test_client_errors_not_counted(self, m):
+        m.get(self.url, status_code=404)
+
+        for _ in range(3):
+            self.assert_call_fails()
+
+        self.assertEqual(self.client_api.breaker.get_state(), "closed")
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_half_open_probe(self, m):
+        m.get(self.url, status_code=503)
+        self.assert_call_fails()
+        self.assert_call_fails()
+        later = time.time() + 31
+
+        with patch("sharing_configs.breaker.time.time", return_value=later):
+            self.assertEqual(self.client_api.breaker.get_state(), "half-open")
+            # the failing probe opens the breaker again
+            self.assert_call_fails()
+            self.assertEqual(m.call_count, 3)
+            self.assertEqual(self.client_api.breaker.get_state(), "open")
+
+        m.get(self.url, json={"results": []})
+        with patch("sharing_configs.breaker.time.time", return_value=later + 31):
+            self.assertEqual(self.client_api.get_files("folder_one"), {"results": []})
+
+        self.assertEqual(self.client_api.breaker.get_state(), "closed")
+
+    @requests_mock.Mocker()
+    def test_one_probe_at_a_time(self, m):
+        m.get(self.url, status_code=503)
+        self.assert_call_fails()
+        self.assert_call_fails()
+        breaker = self.client_api.breaker
+
+        with patch("sharing_configs.breaker.time.time", return_value=time.time() + 31):
+            breaker.before_call()
+            with self.assertRaises(CircuitOpen):
+                SharingConfigsClient().breaker.before_call()
+
+    @override_settings(SHARING_CONFIGS_CIRCUIT_BREAKER_THRESHOLD=0)
+    @requests_mock.Mocker()
+    def test_disabled(self, m):
+        m.get(self.url, status_code=503)
+
+        for _ in range(3):
+            self.assert_call_fails(SharingConfigsClient())
+
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_cached_folders_served_while_open(self, m):
+        url = self.client_api.get_list_folders_url()
+        folders = get_mock_folders("import")
+        m.get(url, json=folders, headers={"ETag": '"folders"'})
+        self.client_api.get_folders(permission=None)
+        m.get(url, status_code=503)
+        for _ in range(2):
+            with self.assertRaises(ApiException):
+                self.client_api.get_folders(permission=None)
+
+        resp = self.client_api.get_folders(permission=None)
+
+        self.assertEqual(resp, folders)
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def test_form_fails_fast_with_message(self, m):
+        m.get(self.url, status_code=503)
+        m.get(self.client_api.get_list_folders_url(), status_code=503)
+        self.assert_call_fails()
+        self.assert_call_fails()
+
+        form = ImportForm()
+
+        self.assertEqual(form.fields["folder"].choices, [(None, "Choose a folder")])
+        self.assertIn("currently unavailable", str(form.fields["folder"].help_text))
+        self.assertEqual(m.call_count, 2)
@@ -0,0 +1,69 @@
+from django.test import TestCase
+
+import requests
+import requests_mock
+
+from sharing_configs.client_util import (
+    RETRY_STATUS_CODES,
+    SharingConfigsClient,
+    get_session,
+)
+from sharing_configs.exceptions import ApiException
+
+from .factories import SharingConfigsConfigFactory
+
+
+class TestClientSession(TestCase):
+    """Test the pooled session used by the client"""
+
+    def setUp(self) -> None:
+        self.config_object = SharingConfigsConfigFactory(
+            connect_timeout=2, read_timeout=10, max_retries=4, pool_size=7
+        )
+
+    def test_session_shared_between_clients(self):
+        """clients with the same connection settings reuse one session"""
+        client_one = SharingConfigsClient()
+        client_two = SharingConfigsClient()
+
+        self.assertIs(client_one.session, client_two.session)
+
+    def test_session_per_connection_settings(self):
+        """changing pool size or retries gives a new session"""
+        session = get_session(self.config_object)
+
+        self.config_object.pool_size = 3
+        self.config_object.save()
+
+        self.assertIsNot(get_session(self.config_object), session)
+
+    def test_adapter_pool_and_retry_policy(self):
+        client = SharingConfigsClient()
+
+        adapter = client.session.get_adapter(client.base_url)
+
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertEqual(
+            set(adapter.max_retries.status_forcelist), set(RETRY_STATUS_CODES)
+        )
+        self.assertNotIn("POST", adapter.max_retries.allowed_methods)
+
+    @requests_mock.Mocker()
+    def test_timeout_passed_to_requests(self, mock_get):
+        client = SharingConfigsClient()
+        mock_get.get(client.get_list_folders_url(), json={"results": []})
+
+        client.get_folders(permission=None)
+
+        self.assertEqual(mock_get.last_request.timeout, (2, 10))
+
+    @requests_mock.Mocker()
+    def test_read_timeout_raises_api_exception(self, mock_get):
+        client = SharingConfigsClient()
+        mock_get.get(
+            client.get_folder_files_url("folder_one"), exc=requests.ReadTimeout
+        )
+
+        with self.assertRaises(ApiException):
+            client.get_files("folder_one")
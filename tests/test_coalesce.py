@@ -0,0 +1,182 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from sharing_configs.cache import get_cache
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.coalesce import SingleFlight, coalesce, share_across_processes
+from sharing_configs.exceptions import ApiException
+
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+def call_concurrently(func, times=5):
+    barrier = threading.Barrier(times)
+
+    def call():
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=times) as executor:
+        futures = [executor.submit(call) for _ in range(times)]
+    return futures
+
+
+class ThreadFlight(SingleFlight, threading.local):
+    pass
+
+
+class TestSingleFlight(SimpleTestCase):
+    """Test sharing a call between concurrent identical calls"""
+
+    def setUp(self) -> None:
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def slow_call(self, result=None, error=None):
+        def call():
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return result
+
+        return call
+
+    def test_result_shared(self):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(
+                self.flight.do, "key", self.slow_call({"results": []})
+            )
+            self.started.wait(5)
+            followers = [
+                executor.submit(self.flight.do, "key", self.slow_call())
+                for _ in range(2)
+            ]
+            self.release.set()
+
+        results = [future.result() for future in [leader, *followers]]
+        self.assertEqual(results, [{"results": []}] * 3)
+        self.assertEqual(self.calls, 1)
+        # every caller gets its own copy
+        self.assertIsNot(results[0], results[1])
+        self.assertIsNot(results[1], results[2])
+
+    def test_error_shared(self):
+        error = ApiException("down")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(self.flight.do, "key", self.slow_call(error=error))
+            self.started.wait(5)
+            follower = executor.submit(self.flight.do, "key", self.slow_call())
+            self.release.set()
+
+        self.assertIs(leader.exception(), error)
+        self.assertIs(follower.exception(), error)
+        self.assertEqual(self.calls, 1)
+
+    def test_different_keys_not_shared(self):
+        self.release.set()
+
+        self.flight.do("one", self.slow_call(1))
+        self.flight.do("two", self.slow_call(2))
+
+        self.assertEqual(self.calls, 2)
+
+    def test_sequential_calls_not_shared(self):
+        self.release.set()
+
+        self.flight.do("key", self.slow_call(1))
+        self.flight.do("key", self.slow_call(2))
+
+        self.assertEqual(self.calls, 2)
+
+
+class TestShareAcrossProcesses(SimpleTestCase):
+    """Test sharing a call with other processes through the cache"""
+
+    def setUp(self) -> None:
+        self.cache = get_cache()
+
+    def test_result_shared(self):
+        self.cache.add("key:flight", 1)
+        self.cache.set("key:flight:result", {"result": {"results": ["a"]}})
+
+        result = share_across_processes("key", lambda: {"results": ["b"]}, timeout=1)
+
+        self.assertEqual(result, {"results": ["a"]})
+
+    def test_called_when_other_process_failed(self):
+        self.cache.add("key:flight", 1)
+        threading.Timer(0.1, self.cache.delete, ["key:flight"]).start()
+
+        result = share_across_processes("key", lambda: "called", timeout=5)
+
+        self.assertEqual(result, "called")
+
+    def test_called_when_other_process_too_slow(self):
+        self.cache.add("key:flight", 1)
+
+        result = share_across_processes("key", lambda: "called", timeout=0.1)
+
+        self.assertEqual(result, "called")
+
+    def test_result_stored_and_lock_released(self):
+        self.cache.set("key:flight:result", {"result": "stale"})
+
+        result = share_across_processes("key", lambda: "fresh", timeout=1)
+
+        self.assertEqual(result, "fresh")
+        self.assertEqual(self.cache.get("key:flight:result"), {"result": "fresh"})
+        self.assertIsNone(self.cache.get("key:flight"))
+
+    def test_lock_released_on_error(self):
+        def fail():
+            raise ApiException("down")
+
+        with self.assertRaises(ApiException):
+            coalesce(SingleFlight(), "key", fail, timeout=1)
+
+        self.assertIsNone(self.cache.get("key:flight"))
+        self.assertIsNone(self.cache.get("key:flight:result"))
+
+
+class TestClientCoalescing(StandInApiTestMixin, TestCase):
+    """Test sharing the GET requests of concurrent identical client calls"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(files={"folder_one": {"a.json": b"{}"}}, latency=0.3)
+
+    def test_one_request(self):
+        client = SharingConfigsClient(self.config_object)
+
+        futures = call_concurrently(lambda: client.get_files("folder_one"))
+
+        results = [future.result()["results"] for future in futures]
+        self.assertEqual(results, [[{"filename": "a.json"}]] * 5)
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
+
+    @override_settings(SHARING_CONFIGS_COALESCE_ACROSS_PROCESSES=True)
+    def test_one_request_across_processes(self):
+        client = SharingConfigsClient(self.config_object)
+
+        # every thread has its own calls in flight, like a process
+        with patch("sharing_configs.client_util._in_flight", new=ThreadFlight()):
+            futures = call_concurrently(lambda: client.get_files("folder_one"))
+
+        results = [future.result()["results"] for future in futures]
+        self.assertEqual(results, [[{"filename": "a.json"}]] * 5)
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
+
+    def test_error_raised_in_every_call(self):
+        client = SharingConfigsClient(self.config_object)
+
+        futures = call_concurrently(lambda: client.get_files("missing"))
+
+        for future in futures:
+            self.assertIsInstance(future.exception(), ApiException)
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
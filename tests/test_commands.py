@@ -0,0 +1,139 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from sharing_configs.management.base import get_percentile
+from sharing_configs.models import ExportLedgerEntry, ImportLedgerEntry
+from testapp.models import Theme
+
+from .factories import SuperUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+from .test_multi_import import theme_file
+
+
+class TestExportCommand(StandInApiTestMixin, TestCase):
+    """Test exporting objects with the sharing_configs_export command"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.themes = [ThemeFactory(name=f"theme-{i}") for i in range(4)]
+
+    def call(self, *args, **kwargs):
+        out = StringIO()
+        call_command(
+            "sharing_configs_export",
+            "testapp.Theme",
+            "--folder=folder_one",
+            *args,
+            stdout=out,
+            **kwargs,
+        )
+        return out.getvalue()
+
+    def test_export_all_objects(self):
+        output = self.call("--workers=2")
+
+        exported = self.api.files["folder_one"]
+        self.assertEqual(sorted(exported), [f"theme-{i}.json" for i in range(4)])
+        self.assertEqual(json.loads(exported["theme-1.json"])["name"], "theme-1")
+        self.assertEqual(ExportLedgerEntry.objects.count(), 4)
+        self.assertIn("[4/4]", output)
+        self.assertIn("Exported 4 of 4 in", output)
+        self.assertIn("objects/s", output)
+        self.assertIn("p95 latency", output)
+
+    def test_filter_and_author(self):
+        user = SuperUserFactory()
+
+        self.call("--filter=name=theme-2", f"--user={user.username}")
+
+        self.assertEqual(list(self.api.files["folder_one"]), ["theme-2.json"])
+        upload = self.api.requests_to("POST")[0]
+        self.assertEqual(json.loads(upload["body"])["author"], user.username)
+
+    def test_unchanged_objects_skipped(self):
+        self.call()
+
+        output = self.call()
+
+        self.assertEqual(len(self.api.requests_to("POST")), 4)
+        self.assertIn("4 objects have not changed since their last export", output)
+
+        self.call("--force")
+
+        self.assertEqual(len(self.api.requests_to("POST")), 8)
+
+    def test_failed_exports(self):
+        self.api.stop()
+
+        with self.assertRaisesMessage(CommandError, "4 of 4 exports failed"):
+            self.call()
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            self.call("--filter=name")
+        with self.assertRaises(CommandError):
+            call_command("sharing_configs_export", "testapp.Unknown", "--folder=x")
+        with self.assertRaises(CommandError):
+            self.call("--user=unknown")
+
+
+class TestImportCommand(StandInApiTestMixin, TestCase):
+    """Test importing files with the sharing_configs_import command"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {f"theme-{i}.json": theme_file(f"theme-{i}") for i in range(3)}
+        files["other.json"] = theme_file("other")
+        return StandInApi(files={"folder_one": files})
+
+    def call(self, *args, **kwargs):
+        out = StringIO()
+        call_command(
+            "sharing_configs_import",
+            "testapp.Theme",
+            "--folder=folder_one",
+            *args,
+            stdout=out,
+            **kwargs,
+        )
+        return out.getvalue()
+
+    def test_import_matching_files(self):
+        output = self.call("--pattern=theme-*.json", "--workers=3")
+
+        self.assertEqual(
+            sorted(Theme.objects.values_list("name", flat=True)),
+            ["theme-0", "theme-1", "theme-2"],
+        )
+        self.assertEqual(ImportLedgerEntry.objects.count(), 3)
+        self.assertIn("[3/3]", output)
+        self.assertIn("The item theme-1 has been imported successfully!", output)
+        self.assertIn("Imported 3 of 3 in", output)
+
+    def test_unchanged_files_skipped(self):
+        self.call()
+
+        output = self.call()
+
+        self.assertEqual(Theme.objects.count(), 4)
+        self.assertIn(
+            "The file other.json has not changed since its last import", output
+        )
+        self.assertIn("Imported 0 of 0 in", output)
+
+    def test_failed_import(self):
+        self.api.files["folder_one"]["broken.json"] = b'{"name": "broken", "foo": 1}'
+
+        with self.assertRaisesMessage(CommandError, "1 of 1 imports failed"):
+            self.call("--pattern=broken.json")
+
+        self.assertFalse(Theme.objects.filter(name="broken").exists())
+
+
+class TestPercentile(SimpleTestCase):
+    def test_percentile(self):
+        self.assertEqual(get_percentile([], 95), 0.0)
+        self.assertEqual(get_percentile([3.0], 95), 3.0)
+        self.assertEqual(get_percentile([float(i) for i in range(1, 101)], 95), 95.0)
@@ -0,0 +1,144 @@
+import json
+from unittest import mock, skipIf
+
+from django.test import TestCase
+
+from asgiref.sync import async_to_sync
+
+from sharing_configs.client_util import AsyncSharingConfigsClient, SharingConfigsClient
+from sharing_configs.files import ExportPayload, zstandard
+
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+THEME = json.dumps(
+    [
+        {"name": f"theme-{i}", "primary": "#8d979c", "accent": "#f8f8f8"}
+        for i in range(500)
+    ]
+).encode("utf-8")
+
+
+class TestCompression(StandInApiTestMixin, TestCase):
+    """Test compressed uploads and downloads against the stand-in API"""
+
+    stand_in_config = {"compression": "gzip"}
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(
+            files={"folder_one": {"themes.json": THEME}}, compression=True
+        )
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client_api = SharingConfigsClient()
+
+    def test_export_compressed(self):
+        payload = ExportPayload(THEME, "themes.json", "admin")
+
+        self.client_api.export("folder_two", payload)
+
+        self.assertEqual(self.api.files["folder_two"]["themes.json"], THEME)
+        request = self.api.requests_to("POST")[0]
+        self.assertEqual(request["headers"]["content-encoding"], "gzip")
+        self.assertLess(len(request["body"]) * 10, payload.len)
+
+    def test_export_dict_compressed(self):
+        data = {"filename": "zoo.json", "content": "c29tZS1jb250ZW50"}
+
+        self.client_api.export("folder_two", data)
+
+        self.assertEqual(self.api.files["folder_two"]["zoo.json"], b"some-content")
+
+    def test_import_compressed(self):
+        with self.client_api.import_file("folder_one", "themes.json") as file:
+            self.assertEqual(file.read(), THEME)
+            self.assertEqual(file.size, len(THEME))
+
+        request = self.api.requests_to("GET")[0]
+        self.assertEqual(request["headers"]["accept-encoding"], "gzip")
+        self.assertLess(request["response_length"] * 10, len(THEME))
+
+    def test_listing_compressed(self):
+        resp = self.client_api.get_files("folder_one")
+
+        self.assertEqual(resp["results"], [{"filename": "themes.json"}])
+        self.assertEqual(self.api.requests[0]["headers"]["accept-encoding"], "gzip")
+
+    def test_async_client(self):
+        async def transfer():
+            client = AsyncSharingConfigsClient(self.config_object)
+            payload = ExportPayload(THEME, "copy.json", "admin")
+            await client.export("folder_one", payload)
+            return await client.import_data("folder_one", "themes.json")
+
+        content = async_to_sync(transfer)()
+
+        self.assertEqual(content, THEME)
+        self.assertEqual(self.api.files["folder_one"]["copy.json"], THEME)
+        upload, download = self.api.requests_to("POST")[0], self.api.requests[-1]
+        self.assertEqual(upload["headers"]["content-encoding"], "gzip")
+        self.assertLess(download["response_length"] * 10, len(THEME))
+
+    def test_fall_back_to_uncompressed(self):
+        self.api.compression = False
+
+        self.client_api.export("folder_two", ExportPayload(THEME, "a.json", "admin"))
+        self.client_api.export("folder_two", ExportPayload(THEME, "b.json", "admin"))
+
+        self.assertEqual(self.api.files["folder_two"]["b.json"], THEME)
+        encodings = [
+            request["headers"].get("content-encoding")
+            for request in self.api.requests_to("POST")
+        ]
+        self.assertEqual(encodings, ["gzip", None, None])
+
+    def test_compression_off_by_default(self):
+        self.config_object.compression = ""
+        self.config_object.save()
+        client = SharingConfigsClient()
+
+        client.export("folder_two", ExportPayload(THEME, "a.json", "admin"))
+
+        request = self.api.requests_to("POST")[0]
+        self.assertNotIn("content-encoding", request["headers"])
+        self.assertNotIn("accept-encoding", client.headers)
+
+
+@skipIf(zstandard is None, "zstd compression requires the zstandard package")
+class TestZstdCompression(StandInApiTestMixin, TestCase):
+    """Test zstd compression against the stand-in API"""
+
+    stand_in_config = {"compression": "zstd"}
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(
+            files={"folder_one": {"themes.json": THEME}}, compression=True
+        )
+
+    @mock.patch("sharing_configs.files.zstd_decoding_supported", return_value=True)
+    def test_zstd_responses_decoded(self, m):
+        client = SharingConfigsClient()
+
+        client.export("folder_two", ExportPayload(THEME, "themes.json", "admin"))
+        with client.import_file("folder_one", "themes.json") as file:
+            self.assertEqual(file.read(), THEME)
+        content = async_to_sync(
+            AsyncSharingConfigsClient(self.config_object).import_data
+        )("folder_one", "themes.json")
+
+        self.assertEqual(content, THEME)
+        self.assertEqual(self.api.files["folder_two"]["themes.json"], THEME)
+        upload, download = self.api.requests_to("POST")[0], self.api.requests[-1]
+        self.assertEqual(upload["headers"]["content-encoding"], "zstd")
+        self.assertEqual(download["headers"]["accept-encoding"], "zstd, gzip")
+        self.assertLess(download["response_length"] * 10, len(THEME))
+
+    @mock.patch("sharing_configs.files.zstd_decoding_supported", return_value=False)
+    def test_gzip_responses_without_zstd_decoding(self, m):
+        client = SharingConfigsClient()
+
+        with client.import_file("folder_one", "themes.json") as file:
+            self.assertEqual(file.read(), THEME)
+
+        request = self.api.requests_to("GET")[0]
+        self.assertEqual(request["headers"]["accept-encoding"], "gzip")
@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from sharing_configs.client_util import SharingConfigsClient
+
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+class TestConditionalRequests(StandInApiTestMixin, TestCase):
+    """Test the response cache of the client against a local stand-in API"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(files={"folder_one": {"a.json": b"{}", "b.json": b"{}"}})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client_api = SharingConfigsClient()
+
+    def test_revalidated_with_etag(self):
+        first = self.client_api.get_files("folder_one")
+        second = self.client_api.get_files("folder_one")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(first["results"]), 2)
+        first_request, second_request = self.api.requests
+        self.assertNotIn("If-None-Match", first_request["headers"])
+        self.assertIn("If-None-Match", second_request["headers"])
+
+    def test_changed_listing_downloaded_again(self):
+        self.client_api.get_files("folder_one")
+        self.api.files["folder_one"]["c.json"] = b"{}"
+
+        resp = self.client_api.get_files("folder_one")
+
+        self.assertEqual(len(resp["results"]), 3)
+
+    def test_fresh_response_skips_network(self):
+        self.api.cache_control = "max-age=60"
+
+        self.client_api.get_folders(permission="write")
+        resp = self.client_api.get_folders(permission="write")
+
+        self.assertEqual(len(resp["results"]), 2)
+        self.assertEqual(len(self.api.requests), 1)
+
+    def test_cached_per_query(self):
+        self.api.cache_control = "max-age=60"
+
+        self.client_api.get_folders(permission="write")
+        self.client_api.get_folders(permission=None)
+
+        self.assertEqual(len(self.api.requests), 2)
+
+    def test_no_store_not_cached(self):
+        self.api.cache_control = "no-store"
+
+        self.client_api.get_files("folder_one")
+        self.client_api.get_files("folder_one")
+
+        self.assertNotIn("If-None-Match", self.api.requests[1]["headers"])
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from asgiref.sync import async_to_sync
+
+from sharing_configs.backends import (
+    CONFIG_VERSION_KEY,
+    aget_config,
+    config_cache,
+    get_client,
+    get_config,
+)
+from sharing_configs.cache import get_cache
+from sharing_configs.models import SharingConfigsConfig
+
+from .factories import SharingConfigsConfigFactory
+
+
+class TestConfigCache(TestCase):
+    """Test memoising the config and the client built from it"""
+
+    def setUp(self) -> None:
+        self.config = SharingConfigsConfigFactory(label="first")
+        self.addCleanup(config_cache.invalidate)
+
+    def test_config_memoised(self):
+        get_config()
+
+        with self.assertNumQueries(0):
+            config = get_config()
+
+        self.assertEqual(config.label, "first")
+
+    def test_async_config_memoised(self):
+        config = get_config()
+
+        with self.assertNumQueries(0):
+            self.assertIs(async_to_sync(aget_config)(), config)
+
+    def test_saving_invalidates(self):
+        get_config()
+
+        self.config.label = "second"
+        self.config.save()
+
+        self.assertEqual(get_config().label, "second")
+
+    def test_saved_in_other_process(self):
+        shared_cache = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tempfile.mkdtemp(),
+        }
+        self.addCleanup(shutil.rmtree, shared_cache["LOCATION"])
+        with override_settings(
+            CACHES={**settings.CACHES, "shared": shared_cache},
+            SHARING_CONFIGS_CACHE_ALIAS="shared",
+            SHARING_CONFIGS_CONFIG_CHECK_INTERVAL=0,
+        ):
+            get_config()
+            SharingConfigsConfig.objects.update(label="second")
+            self.assertEqual(get_config().label, "first")
+
+            get_cache().set(CONFIG_VERSION_KEY, 1, timeout=None)
+            config = get_config()
+
+        self.assertEqual(config.label, "second")
+
+    @override_settings(SHARING_CONFIGS_CONFIG_CHECK_INTERVAL=0)
+    def test_local_cache_reads_row(self):
+        client = get_client()
+        self.assertIs(get_client(), client)
+
+        # saved in another process, whose local cache is not seen here
+        SharingConfigsConfig.objects.update(label="second")
+
+        self.assertEqual(get_config().label, "second")
+        self.assertIsNot(get_client(), client)
+
+    def test_version_checked_after_interval(self):
+        get_config()
+        get_cache().incr(CONFIG_VERSION_KEY)
+
+        with patch.object(SharingConfigsConfig, "get_solo") as get_solo:
+            get_config()
+
+        get_solo.assert_not_called()
+
+    def test_client_shared_until_saved(self):
+        client = get_client()
+
+        self.assertIs(get_client(), client)
+        with ThreadPoolExecutor(4) as executor:
+            clients = list(executor.map(lambda i: get_client(), range(8)))
+        self.assertTrue(all(other is client for other in clients))
+
+        self.config.save()
+        self.assertIsNot(get_client(), client)
+
+    def test_explicit_config_not_shared(self):
+        client = get_client()
+
+        self.assertIsNot(get_client(self.config), client)
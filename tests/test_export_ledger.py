@@ -0,0 +1,126 @@
+import io
+import json
+
+from django.contrib.admin import helpers
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from sharing_configs.ledger import get_content_hash
+from sharing_configs.models import ExportLedgerEntry
+from testapp.models import Configuration
+
+from .factories import SuperUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApiTestMixin
+
+
+class TestContentHash(SimpleTestCase):
+    def test_bytes_and_file_hash_alike(self):
+        file = io.BytesIO(b"skip-content")
+        file.seek(5)
+
+        self.assertEqual(get_content_hash(file), get_content_hash(b"content"))
+        self.assertEqual(file.tell(), 5)
+
+    def test_unseekable_file(self):
+        file = io.BufferedReader(io.BytesIO(b"content"))
+        file.seekable = lambda: False
+
+        self.assertIsNone(get_content_hash(file))
+
+
+class TestExportLedger(StandInApiTestMixin, TestCase):
+    """Test skipping uploads of objects that did not change"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = SuperUserFactory()
+        self.client.force_login(self.user)
+        self.themes = [ThemeFactory(name=f"theme-{i}") for i in range(5)]
+        self.configuration = Configuration.objects.create(theme=self.themes[0])
+        self.theme = self.themes[0]
+        self.url = reverse(
+            "admin:testapp_theme_sc_export", kwargs={"object_id": self.theme.id}
+        )
+        self.data = {"folder": "folder_one", "file_name": "theme.json"}
+
+    def test_unchanged_object_not_uploaded_again(self):
+        self.client.post(self.url, data=self.data)
+
+        resp = self.client.post(self.url, data=self.data, follow=True)
+
+        self.assertEqual(len(self.api.requests_to("POST")), 1)
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertEqual(
+            messages[-1],
+            f"The object {self.theme} has not changed since its last export",
+        )
+        entry = ExportLedgerEntry.objects.get()
+        self.assertEqual(entry.object_id, str(self.theme.pk))
+        self.assertEqual(entry.folder, "folder_one")
+        self.assertEqual(entry.filename, "theme.json")
+        self.assertEqual(json.loads(entry.response)["filename"], "theme.json")
+
+    def test_changed_object_uploaded(self):
+        self.client.post(self.url, data=self.data)
+        self.theme.primary = "#000000"
+        self.theme.save()
+
+        self.client.post(self.url, data=self.data)
+
+        self.assertEqual(len(self.api.requests_to("POST")), 2)
+        self.assertEqual(ExportLedgerEntry.objects.count(), 1)
+
+    def test_other_file_uploaded(self):
+        self.client.post(self.url, data=self.data)
+
+        self.client.post(self.url, data={**self.data, "file_name": "copy.json"})
+
+        self.assertEqual(len(self.api.requests_to("POST")), 2)
+
+    def test_force(self):
+        self.client.post(self.url, data=self.data)
+
+        self.client.post(self.url, data={**self.data, "force": "on"})
+
+        self.assertEqual(len(self.api.requests_to("POST")), 2)
+
+    def test_failed_upload_not_recorded(self):
+        resp = self.client.post(self.url, data={**self.data, "folder": "unknown"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ExportLedgerEntry.objects.exists())
+
+    def get_bulk_data(self, **extra):
+        return {
+            "action": "sharing_configs_bulk_export",
+            helpers.ACTION_CHECKBOX_NAME: [theme.pk for theme in self.themes],
+            "apply": "Export",
+            "folder": "folder_one",
+            **extra,
+        }
+
+    def test_bulk_export_skips_unchanged(self):
+        url = reverse("admin:testapp_theme_changelist")
+        self.client.post(url, data=self.get_bulk_data())
+        self.themes[3].primary = "#000000"
+        self.themes[3].save()
+
+        resp = self.client.post(url, data=self.get_bulk_data(), follow=True)
+
+        uploads = self.api.requests_to("POST")
+        self.assertEqual(len(uploads), 6)
+        self.assertEqual(json.loads(uploads[-1]["body"])["filename"], "theme-3.json")
+        messages = [str(msg) for msg in resp.context["messages"]][-2:]
+        self.assertEqual(
+            messages[0], "4 of 5 objects have not changed since their last export"
+        )
+        self.assertTrue(messages[1].startswith("1 of 1 objects have been exported"))
+
+    def test_bulk_export_force(self):
+        url = reverse("admin:testapp_theme_changelist")
+        self.client.post(url, data=self.get_bulk_data())
+
+        self.client.post(url, data=self.get_bulk_data(force="on"))
+
+        self.assertEqual(len(self.api.requests_to("POST")), 10)
+        self.assertEqual(ExportLedgerEntry.objects.count(), 5)
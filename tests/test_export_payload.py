@@ -0,0 +1,115 @@
+import base64
+import io
+import json
+import tracemalloc
+from tempfile import TemporaryFile
+
+from django.test import SimpleTestCase, TestCase
+
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.files import ExportPayload
+
+from .mock_data_api.server import StandInApiTestMixin
+
+
+class ShortReads(io.RawIOBase):
+    """non-seekable stream returning fewer bytes than requested"""
+
+    def __init__(self, content: bytes) -> None:
+        self.stream = io.BytesIO(content)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self.stream.read(min(size, 1000) if size > 0 else size)
+
+
+class TestExportPayload(SimpleTestCase):
+    """Test encoding the export body as a stream"""
+
+    content = bytes(range(256)) * 1001
+
+    def get_expected(self, content: bytes) -> dict:
+        return {
+            "overwrite": True,
+            "author": "admin",
+            "filename": "theme.json",
+            "content": base64.b64encode(content).decode("utf-8"),
+        }
+
+    def test_bytes(self):
+        payload = ExportPayload(self.content, "theme.json", "admin", overwrite=True)
+
+        body = b"".join(payload)
+
+        self.assertEqual(json.loads(body), self.get_expected(self.content))
+        self.assertEqual(payload.len, len(body))
+
+    def test_seekable_file(self):
+        file = io.BytesIO(b"skip" + self.content)
+        file.seek(4)
+        payload = ExportPayload(file, "theme.json", "admin", overwrite=True)
+
+        body = b"".join(payload)
+
+        self.assertEqual(json.loads(body), self.get_expected(self.content))
+        self.assertEqual(payload.len, len(body))
+        self.assertEqual(b"".join(payload), body)
+
+    def test_short_reads(self):
+        for size in (0, 1, 2, 3, 4000, 4001):
+            with self.subTest(size=size):
+                content = self.content[:size]
+                payload = ExportPayload(
+                    ShortReads(content), "theme.json", "admin", overwrite=True
+                )
+
+                self.assertIsNone(payload.len)
+                self.assertEqual(
+                    json.loads(b"".join(payload)), self.get_expected(content)
+                )
+
+    def test_flat_memory(self):
+        with TemporaryFile() as file:
+            for _ in range(80):
+                file.write(self.content)
+            file.seek(0)
+            payload = ExportPayload(file, "theme.json", "admin")
+
+            tracemalloc.start()
+            try:
+                size = sum(len(chunk) for chunk in payload)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertGreater(size, 25_000_000)
+        self.assertLess(peak, 1_000_000)
+
+
+class TestStreamingExport(StandInApiTestMixin, TestCase):
+    """Test uploading a streamed export body"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client_api = SharingConfigsClient()
+
+    def test_export_with_content_length(self):
+        payload = ExportPayload(io.BytesIO(b"some-content"), "zoo.json", "admin")
+
+        resp = self.client_api.export("folder_one", payload)
+
+        self.assertEqual(resp["filename"], "zoo.json")
+        self.assertEqual(self.api.files["folder_one"]["zoo.json"], b"some-content")
+        request = self.api.requests_to("POST")[0]
+        self.assertEqual(request["headers"]["Content-Length"], str(payload.len))
+
+    def test_export_chunked(self):
+        payload = ExportPayload(ShortReads(b"x" * 5000), "zoo.json", "admin")
+
+        self.client_api.export("folder_one", payload)
+
+        self.assertEqual(self.api.files["folder_one"]["zoo.json"], b"x" * 5000)
+        request = self.api.requests_to("POST")[0]
+        self.assertEqual(request["headers"]["Transfer-Encoding"], "chunked")
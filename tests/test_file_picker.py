@@ -0,0 +1,127 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from sharing_configs.cache import invalidate_folders_cache
+from sharing_configs.client_util import AsyncSharingConfigsClient
+from sharing_configs.utils import FileIndex, aget_files_index
+from testapp.models import Configuration
+
+from .factories import StaffUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+FILENAMES = [
+    "blue-theme.json",
+    "readme.txt",
+    "Theme-dark.json",
+    "theme-light.json",
+    "theme-spring.json",
+    "winter.json",
+]
+
+
+class TestFileIndex(TestCase):
+    """Test searching the filenames of a folder"""
+
+    def setUp(self) -> None:
+        self.index = FileIndex.from_filenames(reversed(FILENAMES))
+
+    def test_sorted_case_insensitively(self):
+        self.assertEqual(self.index.search(""), FILENAMES)
+
+    def test_prefix_matches_first(self):
+        self.assertEqual(
+            self.index.search("THEME"),
+            [
+                "Theme-dark.json",
+                "theme-light.json",
+                "theme-spring.json",
+                "blue-theme.json",
+            ],
+        )
+
+    def test_substring_matches(self):
+        self.assertEqual(self.index.search("ing"), ["theme-spring.json"])
+        self.assertEqual(self.index.search("zzz"), [])
+
+
+class TestFilePickerView(StandInApiTestMixin, TestCase):
+    """Test the ajax endpoint of the file picker"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {filename: b"{}" for filename in FILENAMES}
+        return StandInApi(files={"folder_one": files})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(StaffUserFactory())
+        Configuration.objects.create(theme=ThemeFactory())
+        self.url = reverse("admin:testapp_theme_sc_ajax")
+
+    def fetch(self, **params):
+        return self.client.get(self.url, {"folder_name": "folder_one", **params})
+
+    def test_page_of_matches(self):
+        resp = self.fetch(q="theme", offset=1, limit=2)
+
+        self.assertEqual(
+            resp.json(),
+            {
+                "resp": ["theme-light.json", "theme-spring.json"],
+                "count": 4,
+                "offset": 1,
+                "limit": 2,
+                "status_code": 200,
+            },
+        )
+
+    @override_settings(SHARING_CONFIGS_FILE_PICKER_PAGE_SIZE=3)
+    def test_default_page(self):
+        data = self.fetch(offset="foo", limit="bar").json()
+
+        self.assertEqual(data["resp"], FILENAMES[:3])
+        self.assertEqual((data["count"], data["offset"], data["limit"]), (6, 0, 3))
+
+    def test_no_matches(self):
+        data = self.fetch(q="autumn").json()
+
+        self.assertEqual((data["status_code"], data["resp"]), (200, []))
+
+    def test_index_cached(self):
+        self.fetch(q="theme")
+        self.fetch(q="winter")
+        self.fetch(offset=2)
+
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
+
+    def test_index_invalidated_by_export(self):
+        self.fetch()
+        self.api.files["folder_one"]["autumn.json"] = b"{}"
+        invalidate_folders_cache(self.api.label)
+
+        self.assertEqual(self.fetch(q="autumn").json()["resp"], ["autumn.json"])
+
+    def test_unknown_folder(self):
+        data = self.fetch(folder_name="unknown").json()
+
+        self.assertEqual(data["status_code"], 400)
+
+    def test_without_folder(self):
+        data = self.client.get(self.url).json()
+
+        self.assertEqual(data["status_code"], 400)
+        self.assertEqual(self.api.requests, [])
+
+    async def test_async_index(self):
+        client = AsyncSharingConfigsClient(self.config_object)
+
+        index = await aget_files_index(client, "folder_one")
+        await aget_files_index(client, "folder_one")
+
+        self.assertEqual(index.search("w"), ["winter.json"])
+        self.assertEqual(len(self.api.requests_to("GET")), 1)
+
+    @override_settings(SHARING_CONFIGS_FILES_INDEX_CACHE_TIMEOUT=30)
+    def test_browser_cache_ttl(self):
+        resp = self.client.get(reverse("admin:testapp_theme_sc_import"))
+
+        self.assertContains(resp, 'data-cache-ttl="30"')
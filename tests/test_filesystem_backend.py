@@ -0,0 +1,262 @@
+import base64
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from sharing_configs.backends import (
+    AsyncFilesystemBackend,
+    FilesystemBackend,
+    aget_client,
+    get_client,
+    list_directory,
+)
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.files import ExportPayload
+from sharing_configs.models import SharingConfigsConfig
+from testapp.models import Configuration, Theme
+
+from .factories import SharingConfigsConfigFactory, SuperUserFactory, ThemeFactory
+from .test_multi_import import theme_file
+
+
+class FilesystemTestMixin:
+    def setUp(self) -> None:
+        super().setUp()
+        self.storage_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_path)
+        self.config_object = SharingConfigsConfigFactory(
+            backend="filesystem",
+            storage_path=self.storage_path,
+            api_endpoint="",
+            api_key="",
+            label="label",
+        )
+        self.root = os.path.join(self.storage_path, "label")
+        os.makedirs(os.path.join(self.root, "folder_one", "sub"))
+        os.makedirs(os.path.join(self.root, "folder_two"))
+
+    def write(self, path: str, content: bytes) -> str:
+        path = os.path.join(self.root, path)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+
+class TestFilesystemBackend(FilesystemTestMixin, TestCase):
+    """Test storing the shared configurations in a local directory tree"""
+
+    def test_selected_in_config(self):
+        self.assertIsInstance(get_client(), FilesystemBackend)
+
+        self.config_object.backend = "api"
+        self.config_object.save()
+
+        self.assertIsInstance(get_client(), SharingConfigsClient)
+
+    async def test_async_selected_in_config(self):
+        client = await aget_client()
+
+        self.assertIsInstance(client, AsyncFilesystemBackend)
+        resp = await client.get_files("folder_one")
+        self.assertEqual(resp["results"], [])
+
+    def test_get_folders(self):
+        resp = get_client().get_folders(permission="write")
+
+        self.assertEqual(
+            resp["results"],
+            [
+                {
+                    "name": "folder_one",
+                    "children": [
+                        {"name": "sub", "children": [], "permission": "write"}
+                    ],
+                    "permission": "write",
+                },
+                {"name": "folder_two", "children": [], "permission": "write"},
+            ],
+        )
+
+    def test_get_files(self):
+        self.write("folder_one/b.json", b"{}")
+        self.write("folder_one/a.json", b"{}")
+        self.write("folder_one/.a.json.tmp", b"")
+
+        resp = get_client().get_files("folder_one")
+
+        self.assertEqual(
+            resp["results"], [{"filename": "a.json"}, {"filename": "b.json"}]
+        )
+
+    def test_missing_folder(self):
+        with self.assertRaises(ApiException):
+            get_client().get_files("unknown")
+
+    def test_paths_outside_the_folders_refused(self):
+        client = get_client()
+
+        for folder, filename in [
+            ("..", "secret"),
+            ("folder_one/..", "secret"),
+            ("folder_one", "../secret"),
+            ("/etc", "passwd"),
+            ("folder_one", ".hidden"),
+        ]:
+            with self.subTest(folder=folder, filename=filename):
+                with self.assertRaises(ApiException):
+                    client.import_file(folder, filename)
+
+    def test_export_payload(self):
+        payload = ExportPayload(b"some-content", "file.json", "admin")
+
+        resp = get_client().export("folder_one/sub", payload)
+
+        path = os.path.join(self.root, "folder_one", "sub", "file.json")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"some-content")
+        self.assertEqual(resp["filename"], "file.json")
+        self.assertTrue(resp["download_url"].startswith("file://"))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["file.json"])
+
+    def test_export_dict(self):
+        data = {
+            "filename": "file.json",
+            "content": base64.b64encode(b"some-content").decode("utf-8"),
+        }
+
+        get_client().export("folder_one", data)
+
+        self.assertEqual(
+            get_client().import_data("folder_one", "file.json"), b"some-content"
+        )
+
+    def test_export_overwrite(self):
+        path = self.write("folder_one/file.json", b"old")
+        client = get_client()
+
+        with self.assertRaises(ApiException):
+            client.export("folder_one", ExportPayload(b"new", "file.json", "admin"))
+        client.export(
+            "folder_one", ExportPayload(b"new", "file.json", "admin", overwrite=True)
+        )
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"new")
+
+    def test_export_file_created_meanwhile_not_overwritten(self):
+        path = self.write("folder_one/file.json", b"old")
+        client = get_client()
+
+        # created by a concurrent export after the check of the file
+        with patch("os.path.exists", return_value=False):
+            with self.assertRaisesMessage(ApiException, "already exists"):
+                client.export("folder_one", ExportPayload(b"new", "file.json", "a"))
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(path))), ["file.json", "sub"]
+        )
+
+    def test_export_error_not_hidden_by_cleanup(self):
+        def chunks():
+            yield b"some"
+            raise OSError("disk full")
+
+        payload = ExportPayload(b"", "file.json", "admin")
+        with patch.object(payload, "iter_content", chunks):
+            with patch("os.unlink", side_effect=OSError("busy")):
+                with self.assertRaisesMessage(ApiException, "Could not export"):
+                    get_client().export("folder_one", payload)
+
+    def test_import_file_etag(self):
+        path = self.write("folder_one/file.json", b"content")
+        client = get_client()
+
+        file = client.import_file("folder_one", "file.json")
+
+        self.assertEqual(file.read(), b"content")
+        self.assertEqual(file.size, 7)
+        self.assertIsNone(client.import_file("folder_one", "file.json", etag=file.etag))
+
+        self.write("folder_one/file.json", b"changed")
+        os.utime(path, ns=(0, 10**9))
+
+        changed = client.import_file("folder_one", "file.json", etag=file.etag)
+        self.assertEqual(changed.read(), b"changed")
+
+    def test_listing_cached_until_directory_changes(self):
+        directory = os.path.join(self.root, "folder_one")
+        self.write("folder_one/a.json", b"{}")
+        os.utime(directory, ns=(0, 10**9))
+
+        self.assertEqual(list_directory(directory), (["sub"], ["a.json"]))
+
+        # an unchanged modification time serves the cached listing
+        self.write("folder_one/b.json", b"{}")
+        os.utime(directory, ns=(0, 10**9))
+        self.assertEqual(list_directory(directory), (["sub"], ["a.json"]))
+
+        os.utime(directory, ns=(0, 2 * 10**9))
+        self.assertEqual(list_directory(directory), (["sub"], ["a.json", "b.json"]))
+
+
+class TestFilesystemAdmin(FilesystemTestMixin, TestCase):
+    """Test the admin views on the filesystem backend"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(SuperUserFactory())
+        self.theme = ThemeFactory(name="theme")
+        Configuration.objects.create(theme=self.theme)
+
+    def test_export(self):
+        url = reverse(
+            "admin:testapp_theme_sc_export", kwargs={"object_id": self.theme.id}
+        )
+
+        resp = self.client.post(
+            url, data={"folder": "folder_one", "file_name": "theme.json"}
+        )
+
+        self.assertRedirects(resp, url)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.root, "folder_one", "theme.json"))
+        )
+
+    def test_import(self):
+        self.write("folder_one/imported.json", theme_file("imported"))
+        url = reverse("admin:testapp_theme_sc_import")
+
+        resp = self.client.post(
+            url, data={"folder": "folder_one", "file_name": ["imported.json"]}
+        )
+
+        self.assertRedirects(resp, url)
+        self.assertTrue(Theme.objects.filter(name="imported").exists())
+
+
+class TestBackendValidation(TestCase):
+    def test_api_requires_endpoint_and_key(self):
+        config = SharingConfigsConfig(label="label", backend="api")
+
+        with self.assertRaises(ValidationError) as cm:
+            config.full_clean()
+
+        self.assertEqual(set(cm.exception.message_dict), {"api_endpoint", "api_key"})
+
+    def test_filesystem_requires_absolute_path(self):
+        config = SharingConfigsConfig(
+            label="label", backend="filesystem", storage_path="relative"
+        )
+
+        with self.assertRaises(ValidationError) as cm:
+            config.full_clean()
+
+        self.assertEqual(set(cm.exception.message_dict), {"storage_path"})
@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from sharing_configs.utils import FolderList
+from sharing_configs.utils import FolderList, FolderTree
 
 
 class MyFolderCollecorTest(TestCase):
@@ -103,3 +103,71 @@ class MyFolderCollecorTest(TestCase):
 
         self.assertEqual(len(calc_collection), 5)
         self.assertEqual(calc_collection, expected_list)
+
+
+class FolderTreeTest(TestCase):
+    """Test flattening the folders into paths with an index"""
+
+    def test_paths_depth_and_parents(self):
+        results = [
+            {
+                "name": "parent-folder1",
+                "children": [
+                    {
+                        "name": "sub-folder-1.1",
+                        "children": [{"name": "sub-folder-1.2", "children": []}],
+                    }
+                ],
+            },
+            {"name": "parent-folder2", "children": []},
+        ]
+
+        tree = FolderTree.from_results(results)
+
+        self.assertEqual(
+            [folder.path for folder in tree],
+            [
+                "parent-folder1",
+                "parent-folder1/sub-folder-1.1",
+                "parent-folder1/sub-folder-1.1/sub-folder-1.2",
+                "parent-folder2",
+            ],
+        )
+        folder = tree.index["parent-folder1/sub-folder-1.1/sub-folder-1.2"]
+        self.assertEqual(folder.name, "sub-folder-1.2")
+        self.assertEqual(folder.depth, 2)
+        self.assertEqual(folder.parent, "parent-folder1/sub-folder-1.1")
+        self.assertEqual(
+            [folder.path for folder in tree.children(None)],
+            ["parent-folder1", "parent-folder2"],
+        )
+
+    def test_same_name_in_different_folders(self):
+        results = [
+            {"name": "one", "children": [{"name": "themes", "children": []}]},
+            {"name": "two", "children": [{"name": "themes", "children": []}]},
+        ]
+
+        tree = FolderTree.from_results(results)
+
+        self.assertEqual(len(tree.index), 4)
+        self.assertIn("one/themes", tree)
+        self.assertIn("two/themes", tree)
+        self.assertEqual(tree.choices()[1], ("one/themes", "one/themes"))
+
+    def test_missing_children(self):
+        tree = FolderTree.from_results([{"name": "folder"}])
+
+        self.assertEqual([folder.path for folder in tree], ["folder"])
+
+    def test_deep_tree(self):
+        root = node = {"name": "0", "children": []}
+        for i in range(1, 5000):
+            child = {"name": str(i), "children": []}
+            node["children"].append(child)
+            node = child
+
+        tree = FolderTree.from_results([root])
+
+        self.assertEqual(len(tree), 5000)
+        self.assertEqual(tree.folders[-1].depth, 4999)
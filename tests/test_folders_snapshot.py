@@ -0,0 +1,120 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from sharing_configs.forms import ExportToForm, ImportForm, dump_folders_snapshot
+from testapp.models import Configuration
+
+from .factories import SuperUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApiTestMixin
+
+
+@override_settings(
+    SHARING_CONFIGS_FOLDERS_CACHE_TIMEOUT=0,
+    SHARING_CONFIGS_FOLDERS_CACHE_STALE_TIMEOUT=0,
+)
+class TestFoldersSnapshot(StandInApiTestMixin, TestCase):
+    """Test validating forms against the folders they were rendered with"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(SuperUserFactory())
+        self.theme = ThemeFactory(name="theme")
+        Configuration.objects.create(theme=self.theme)
+        self.url = reverse(
+            "admin:testapp_theme_sc_export", kwargs={"object_id": self.theme.id}
+        )
+
+    def get_folder_requests(self) -> list:
+        return [
+            request
+            for request in self.api.requests_to("GET")
+            if "/files/" not in request["path"]
+        ]
+
+    def test_post_validated_against_snapshot(self):
+        resp = self.client.get(self.url)
+        snapshot = resp.context["form"].folders_snapshot
+        self.assertContains(resp, f'name="folders_snapshot" value="{snapshot}"')
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+        resp = self.client.post(
+            self.url,
+            data={
+                "folder": "folder_one",
+                "file_name": "theme.json",
+                "folders_snapshot": snapshot,
+            },
+        )
+
+        self.assertRedirects(resp, self.url, fetch_redirect_response=False)
+        self.assertIn("theme.json", self.api.files["folder_one"])
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+    def test_folder_not_in_snapshot(self):
+        snapshot = dump_folders_snapshot([("folder_two", "folder_two")], "write")
+
+        form = ExportToForm(
+            {"folder": "folder_one", "file_name": "a", "folders_snapshot": snapshot}
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("folder", form.errors)
+        self.assertEqual(self.get_folder_requests(), [])
+
+    def test_tampered_snapshot_ignored(self):
+        snapshot = dump_folders_snapshot([("folder_two", "folder_two")], "write")
+
+        form = ExportToForm(
+            {"folder": "folder_one", "file_name": "a", "folders_snapshot": snapshot[1:]}
+        )
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+    def test_snapshot_bound_to_permission(self):
+        snapshot = dump_folders_snapshot([("other", "other")], "write")
+
+        form = ImportForm(
+            {"folder": "other", "file_name": ["a"], "folders_snapshot": snapshot}
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+    def test_expired_snapshot_falls_back_to_api(self):
+        snapshot = dump_folders_snapshot([("folder_two", "folder_two")], "write")
+        data = {"folder": "folder_one", "file_name": "a", "folders_snapshot": snapshot}
+
+        with patch("django.core.signing.time.time", return_value=time.time() + 601):
+            form = ExportToForm(data)
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+    def test_rerendered_form_keeps_snapshot(self):
+        snapshot = dump_folders_snapshot([("folder_two", "folder_two")], "write")
+        data = {"folder": "folder_one", "file_name": "a", "folders_snapshot": snapshot}
+
+        with patch("django.core.signing.time.time", return_value=time.time() + 300):
+            form = ExportToForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.folders_snapshot, snapshot)
+
+        data["folders_snapshot"] = form.folders_snapshot
+        with patch("django.core.signing.time.time", return_value=time.time() + 601):
+            form = ExportToForm(data)
+
+        self.assertTrue(form.is_valid())
+        self.assertNotEqual(form.folders_snapshot, snapshot)
+        self.assertEqual(len(self.get_folder_requests()), 1)
+
+    def test_no_snapshot_without_folders(self):
+        self.api.stop()
+        self.addCleanup(self.api.start)
+
+        form = ExportToForm()
+
+        self.assertEqual(form.folders_snapshot, "")
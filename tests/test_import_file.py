@@ -0,0 +1,50 @@
+import hashlib
+
+from django.test import TestCase, override_settings
+
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+class TestImportFile(StandInApiTestMixin, TestCase):
+    """Test downloading files in chunks into a temporary file"""
+
+    content = b"0123456789" * 20_000
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(files={"folder_one": {"big.bin": self.content}})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client_api = SharingConfigsClient()
+
+    def test_size_and_checksum(self):
+        with self.client_api.import_file("folder_one", "big.bin") as file:
+            self.assertEqual(file.name, "big.bin")
+            self.assertEqual(file.size, len(self.content))
+            self.assertEqual(file.checksum, hashlib.sha256(self.content).hexdigest())
+            self.assertEqual(file.read(), self.content)
+
+    @override_settings(SHARING_CONFIGS_IMPORT_SPOOL_SIZE=1024)
+    def test_large_file_spooled_to_disk(self):
+        with self.client_api.import_file("folder_one", "big.bin") as file:
+            self.assertTrue(file.file._rolled)
+            self.assertEqual(file.read(), self.content)
+
+    def test_import_data_returns_bytes(self):
+        content = self.client_api.import_data("folder_one", "big.bin")
+
+        self.assertEqual(content, self.content)
+
+    @override_settings(SHARING_CONFIGS_IMPORT_MAX_SIZE=1000)
+    def test_max_size(self):
+        with self.assertRaisesMessage(
+            ApiException, "The file big.bin is larger than the maximum import size."
+        ):
+            self.client_api.import_file("folder_one", "big.bin")
+
+    def test_missing_file(self):
+        with self.assertRaises(ApiException):
+            self.client_api.import_file("folder_one", "missing.bin")
@@ -0,0 +1,164 @@
+from django.contrib.admin.sites import site
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from sharing_configs.client_util import AsyncSharingConfigsClient, SharingConfigsClient
+from sharing_configs.models import ImportLedgerEntry
+from testapp.admin import ThemeAdmin
+from testapp.models import Configuration, Theme
+
+from .factories import SharingConfigsConfigFactory, StaffUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+from .test_multi_import import theme_file
+
+
+class TestImportLedger(StandInApiTestMixin, TestCase):
+    """Test skipping downloads and imports of files that did not change"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {f"theme-{i}.json": theme_file(f"theme-{i}") for i in range(3)}
+        return StandInApi(files={"folder_one": files})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = StaffUserFactory()
+        self.client.force_login(self.user)
+        self.configuration = Configuration.objects.create(theme=ThemeFactory())
+        self.url = reverse("admin:testapp_theme_sc_import")
+        self.data = {"folder": "folder_one", "file_name": ["theme-0.json"]}
+
+    def get_downloads(self):
+        return [
+            request
+            for request in self.api.requests_to("GET")
+            if request["path"].endswith(".json")
+        ]
+
+    def test_unchanged_file_skipped(self):
+        self.client.post(self.url, data=self.data)
+
+        resp = self.client.post(self.url, data=self.data, follow=True)
+
+        self.assertRedirects(resp, self.url)
+        self.assertEqual(Theme.objects.filter(name="theme-0").count(), 1)
+        entry = ImportLedgerEntry.objects.get()
+        self.assertEqual(entry.filename, "theme-0.json")
+        self.assertEqual(entry.object_id, str(Theme.objects.get(name="theme-0").pk))
+        second = self.get_downloads()[1]
+        self.assertEqual(second["headers"]["If-None-Match"], entry.etag)
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertEqual(
+            messages[-1], "The file theme-0.json has not changed since its last import"
+        )
+
+    def test_changed_file_imported(self):
+        self.client.post(self.url, data=self.data)
+        self.api.files["folder_one"]["theme-0.json"] = theme_file("theme-0-changed")
+
+        self.client.post(self.url, data=self.data)
+
+        self.assertTrue(Theme.objects.filter(name="theme-0-changed").exists())
+        entry = ImportLedgerEntry.objects.get()
+        self.assertEqual(
+            entry.object_id, str(Theme.objects.get(name="theme-0-changed").pk)
+        )
+
+    def test_same_content_not_applied(self):
+        self.client.post(self.url, data=self.data)
+        ImportLedgerEntry.objects.update(etag='"stale"')
+
+        self.client.post(self.url, data=self.data)
+
+        self.assertEqual(Theme.objects.filter(name="theme-0").count(), 1)
+        self.assertEqual(len(self.get_downloads()), 2)
+        self.assertNotEqual(ImportLedgerEntry.objects.get().etag, '"stale"')
+
+    def test_deleted_object_imported_again(self):
+        self.client.post(self.url, data=self.data)
+        Theme.objects.filter(name="theme-0").delete()
+
+        self.client.post(self.url, data=self.data)
+
+        self.assertTrue(Theme.objects.filter(name="theme-0").exists())
+        self.assertNotIn("If-None-Match", self.get_downloads()[1]["headers"])
+
+    def test_files_imported_into_same_object(self):
+        data = {"folder": "folder_one", "file_name": ["theme-0.json", "theme-1.json"]}
+        self.client.post(self.url, data=data)
+        ImportLedgerEntry.objects.update(
+            object_id=str(Theme.objects.get(name="theme-0").pk)
+        )
+
+        self.client.post(self.url, data=data)
+
+        downloads = self.get_downloads()[2:]
+        self.assertEqual(len(downloads), 2)
+        for download in downloads:
+            self.assertIn("If-None-Match", download["headers"])
+
+    def test_force(self):
+        self.client.post(self.url, data=self.data)
+
+        self.client.post(self.url, data={**self.data, "force": "on"})
+
+        self.assertEqual(Theme.objects.filter(name="theme-0").count(), 2)
+        self.assertNotIn("If-None-Match", self.get_downloads()[1]["headers"])
+
+    def test_whole_folder_imports_only_changed_files(self):
+        self.client.post(self.url, data=self.data)
+
+        self.client.post(self.url, data={"folder": "folder_one", "import_folder": "on"})
+
+        for i in range(3):
+            self.assertEqual(Theme.objects.filter(name=f"theme-{i}").count(), 1)
+        self.assertEqual(ImportLedgerEntry.objects.count(), 3)
+
+    def test_conditional_download(self):
+        file = SharingConfigsClient().import_file("folder_one", "theme-1.json")
+
+        unchanged = SharingConfigsClient().import_file(
+            "folder_one", "theme-1.json", etag=file.etag
+        )
+
+        self.assertIsNone(unchanged)
+        self.assertEqual(self.get_downloads()[1]["response_length"], 0)
+
+    async def test_async_conditional_download(self):
+        client = await AsyncSharingConfigsClient.create()
+        file = await client.import_file("folder_one", "theme-1.json")
+
+        unchanged = await client.import_file(
+            "folder_one", "theme-1.json", etag=file.etag
+        )
+
+        self.assertIsNotNone(file.etag)
+        self.assertIsNone(unchanged)
+
+
+class ImportedFromThemeAdmin(ThemeAdmin):
+    list_display = ("name", "sharing_configs_imported_from")
+
+
+class TestImportedFromColumn(TestCase):
+    def test_imported_from_annotated(self):
+        SharingConfigsConfigFactory()
+        imported, other = ThemeFactory(), ThemeFactory()
+        ImportLedgerEntry.objects.create(
+            label="label",
+            content_type=ContentType.objects.get_for_model(Theme),
+            folder="folder_one",
+            filename="theme.json",
+            object_id=str(imported.pk),
+        )
+        model_admin = ImportedFromThemeAdmin(Theme, site)
+        request = RequestFactory().get("/")
+
+        with self.assertNumQueries(1):
+            columns = {
+                theme.pk: model_admin.sharing_configs_imported_from(theme)
+                for theme in model_admin.get_queryset(request)
+            }
+
+        self.assertEqual(columns[imported.pk], "folder_one/theme.json")
+        self.assertEqual(columns[other.pk], "-")
@@ -0,0 +1,165 @@
+import json
+import time
+from unittest.mock import patch
+
+from django.contrib.admin import helpers, site
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from sharing_configs.client_util import SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.jobs import ThreadPoolJobExecutor, enqueue_job, run_job
+from sharing_configs.models import Job
+from testapp.admin import ThemeAdmin
+from testapp.models import Configuration, Theme
+
+from .factories import StaffUserFactory, SuperUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+from .test_multi_import import theme_file
+
+
+@override_settings(
+    SHARING_CONFIGS_JOB_EXECUTOR="sharing_configs.jobs.ImmediateJobExecutor"
+)
+@patch.object(ThemeAdmin, "sharing_configs_background_jobs", True)
+class TestBackgroundJobs(StandInApiTestMixin, TestCase):
+    """Test running exports and imports as jobs with an in-process executor"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {f"theme-{i}.json": theme_file(f"theme-{i}") for i in range(2)}
+        return StandInApi(files={"folder_one": files})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = SuperUserFactory()
+        self.client.force_login(self.user)
+        self.themes = [ThemeFactory(name=f"local-{i}") for i in range(3)]
+        self.configuration = Configuration.objects.create(theme=self.themes[0])
+
+    def get_status(self, job):
+        url = reverse("admin:testapp_theme_sc_job", args=[job.pk])
+        return self.client.get(url).json()
+
+    def test_export(self):
+        theme = self.themes[0]
+        url = reverse("admin:testapp_theme_sc_export", kwargs={"object_id": theme.id})
+        data = {"folder": "folder_one", "file_name": "theme.json"}
+
+        resp = self.client.post(url, data=data)
+
+        job = Job.objects.get()
+        self.assertRedirects(resp, f"{url}?sc_job={job.pk}")
+        self.assertIn("theme.json", self.api.files["folder_one"])
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.kind, Job.EXPORT)
+        status = self.get_status(job)
+        self.assertEqual(status["status"], "succeeded")
+        self.assertTrue(status["finished"])
+        self.assertEqual(
+            status["messages"],
+            [
+                {
+                    "level": "success",
+                    "message": f"The object {theme} has been exported successfully",
+                }
+            ],
+        )
+        page = self.client.get(f"{url}?sc_job={job.pk}")
+        self.assertContains(page, reverse("admin:testapp_theme_sc_job", args=[job.pk]))
+
+    def test_failed_export(self):
+        theme = self.themes[0]
+        url = reverse("admin:testapp_theme_sc_export", kwargs={"object_id": theme.id})
+        with patch.object(SharingConfigsClient, "export", side_effect=ApiException):
+            self.client.post(url, data={"folder": "folder_one", "file_name": "t.json"})
+
+        status = self.get_status(Job.objects.get())
+        self.assertEqual(status["status"], "failed")
+        self.assertEqual(status["messages"][0]["level"], "error")
+
+    def test_import(self):
+        url = reverse("admin:testapp_theme_sc_import")
+        data = {"folder": "folder_one", "import_folder": "on"}
+
+        resp = self.client.post(url, data=data)
+
+        job = Job.objects.get()
+        self.assertRedirects(resp, f"{url}?sc_job={job.pk}")
+        self.assertTrue(Theme.objects.filter(name="theme-0").exists())
+        self.assertTrue(Theme.objects.filter(name="theme-1").exists())
+        self.assertEqual(self.get_status(job)["status"], "succeeded")
+
+    def test_bulk_export(self):
+        url = reverse("admin:testapp_theme_changelist")
+        data = {
+            "action": "sharing_configs_bulk_export",
+            helpers.ACTION_CHECKBOX_NAME: [theme.pk for theme in self.themes],
+            "apply": "Export",
+            "folder": "folder_one",
+        }
+
+        resp = self.client.post(url, data=data)
+
+        job = Job.objects.get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["job_status_url"], f"{url}sc_jobs/{job.pk}/")
+        self.assertContains(resp, "The status of the job could not be retrieved.")
+        self.assertEqual(len(self.api.requests_to("POST")), 3)
+        self.assertEqual(self.get_status(job)["status"], "succeeded")
+
+    def test_status_of_other_users_job(self):
+        job = enqueue_job(self.get_request(), site._registry[Theme], "export", {})
+        self.client.force_login(StaffUserFactory())
+
+        resp = self.client.get(reverse("admin:testapp_theme_sc_job", args=[job.pk]))
+
+        self.assertEqual(resp.status_code, 404)
+
+    def get_request(self):
+        request = self.client.get("/").wsgi_request
+        request.user = self.user
+        return request
+
+
+class TestThreadPoolJobExecutor(StandInApiTestMixin, TransactionTestCase):
+    def test_job_run_in_thread(self):
+        theme = ThemeFactory()
+        job = Job.objects.create(
+            kind=Job.EXPORT,
+            content_type=ContentType.objects.get_for_model(Theme),
+            admin_site="admin",
+            parameters=json.dumps(
+                {
+                    "object_ids": [str(theme.pk)],
+                    "folder": "folder_one",
+                    "filename": "theme.json",
+                    "overwrite": False,
+                    "force": False,
+                }
+            ),
+        )
+
+        ThreadPoolJobExecutor().submit(job)
+
+        for _ in range(100):
+            job.refresh_from_db()
+            if job.status in (Job.SUCCEEDED, Job.FAILED):
+                break
+            time.sleep(0.05)
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertIn("theme.json", self.api.files["folder_one"])
+
+    def test_job_run_once(self):
+        job = Job.objects.create(
+            kind=Job.EXPORT,
+            content_type=ContentType.objects.get_for_model(Theme),
+            admin_site="admin",
+            status=Job.SUCCEEDED,
+        )
+
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertIsNone(job.started)
@@ -0,0 +1,247 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+import httpx
+
+from sharing_configs.client_util import AsyncSharingConfigsClient, SharingConfigsClient
+from sharing_configs.exceptions import ApiException
+from sharing_configs.files import ExportPayload
+from sharing_configs.metrics import MetricsAggregator, metrics
+from sharing_configs.signals import api_call
+
+from .factories import SharingConfigsConfigFactory, StaffUserFactory, UserFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+class SignalCollector:
+    def __init__(self, test_case):
+        self.calls = []
+        api_call.connect(self.receive)
+        test_case.addCleanup(api_call.disconnect, self.receive)
+
+    def receive(self, sender, **kwargs):
+        self.calls.append(kwargs)
+
+
+class TestApiCallSignal(StandInApiTestMixin, TestCase):
+    """Test the api_call signal sent around the calls of the clients"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        return StandInApi(files={"folder_one": {"file.json": b'{"a": 1}'}})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.collector = SignalCollector(self)
+
+    def test_get_folders(self):
+        SharingConfigsClient().get_folders(permission="write")
+
+        call = self.collector.calls[0]
+        self.assertEqual(call["operation"], "get_folders")
+        self.assertEqual(call["method"], "GET")
+        self.assertEqual(call["url_template"], "config/{label}/folder/")
+        self.assertEqual(call["status"], 200)
+        self.assertGreater(call["response_bytes"], 0)
+        self.assertEqual(call["retries"], 0)
+        self.assertGreater(call["duration"], 0)
+        self.assertIsNone(call["error"])
+
+    def test_export_and_import_file(self):
+        client = SharingConfigsClient()
+        payload = ExportPayload(b"some-content", "theme.json", "admin")
+
+        client.export("folder_one", payload)
+        client.import_file("folder_one", "file.json")
+
+        export, download = self.collector.calls
+        self.assertEqual(export["operation"], "export")
+        self.assertEqual(export["status"], 201)
+        self.assertEqual(export["request_bytes"], payload.len)
+        self.assertEqual(download["operation"], "import_file")
+        self.assertEqual(download["response_bytes"], len(b'{"a": 1}'))
+
+    def test_compressed_export_counted(self):
+        self.api.compression = True
+        config = SharingConfigsConfigFactory.build(
+            api_endpoint=self.api.api_endpoint, label=self.api.label, compression="gzip"
+        )
+
+        payload = ExportPayload(b"a" * 1000, "theme.json", "admin")
+
+        SharingConfigsClient(config).export("folder_one", payload)
+
+        self.assertLess(0, self.collector.calls[0]["request_bytes"])
+        self.assertLess(self.collector.calls[0]["request_bytes"], payload.len)
+
+    def test_failed_call(self):
+        self.api.stop()
+        self.addCleanup(self.api.start)
+
+        with self.assertRaises(ApiException):
+            SharingConfigsClient().get_files("folder_one")
+
+        call = self.collector.calls[0]
+        self.assertEqual(call["operation"], "get_files")
+        self.assertIsNone(call["status"])
+        self.assertIsInstance(call["error"], ApiException)
+
+
+class TestAsyncApiCallSignal(TestCase):
+    def setUp(self) -> None:
+        self.config_object = SharingConfigsConfigFactory()
+        self.collector = SignalCollector(self)
+        self.requests = []
+
+    def get_client(self, *responses) -> AsyncSharingConfigsClient:
+        responses = list(responses)
+
+        def handler(request):
+            self.requests.append(request)
+            return responses.pop(0)
+
+        transport = httpx.MockTransport(handler)
+        return AsyncSharingConfigsClient(
+            self.config_object, client=httpx.AsyncClient(transport=transport)
+        )
+
+    @patch("sharing_configs.client_util.RETRY_BACKOFF_FACTOR", 0)
+    async def test_retries_counted(self):
+        client = self.get_client(
+            httpx.Response(503), httpx.Response(200, json={"results": []})
+        )
+
+        await client.get_files("folder_one")
+
+        call = self.collector.calls[0]
+        self.assertEqual(call["operation"], "get_files")
+        self.assertEqual(call["status"], 200)
+        self.assertEqual(call["retries"], 1)
+        self.assertEqual(call["response_bytes"], len(b'{"results":[]}'))
+
+    async def test_export(self):
+        client = self.get_client(httpx.Response(201, json={"filename": "file.txt"}))
+        data = {"filename": "file.txt"}
+
+        await client.export("folder_one", data)
+
+        call = self.collector.calls[0]
+        self.assertEqual(call["status"], 201)
+        self.assertEqual(call["request_bytes"], len(self.requests[0].content))
+
+
+class TestMetricsAggregator(SimpleTestCase):
+    def record(self, aggregator, duration, status=200, operation="get_files"):
+        aggregator.record(
+            None,
+            operation=operation,
+            method="GET",
+            url_template="config/{label}/folder/{folder}/files/",
+            status=status,
+            duration=duration,
+            request_bytes=10,
+            response_bytes=100,
+            retries=1,
+            error=None,
+        )
+
+    def test_snapshot(self):
+        aggregator = MetricsAggregator(buckets=(0.1, 1))
+        self.record(aggregator, 0.05)
+        self.record(aggregator, 0.5)
+        self.record(aggregator, 5, status=None)
+
+        snapshot = aggregator.snapshot()
+
+        template = "config/{label}/folder/{folder}/files/"
+        self.assertEqual(
+            snapshot["calls"],
+            {
+                ("get_files", "GET", template, "200"): 2,
+                ("get_files", "GET", template, "error"): 1,
+            },
+        )
+        self.assertEqual(snapshot["response_bytes"], {"get_files": 300})
+        self.assertEqual(snapshot["retries"], {"get_files": 3})
+        durations = snapshot["durations"]["get_files"]
+        self.assertEqual(durations["buckets"], [(0.1, 1), (1, 2)])
+        self.assertEqual(durations["count"], 3)
+        self.assertAlmostEqual(durations["sum"], 5.55)
+
+    def test_prometheus_text(self):
+        aggregator = MetricsAggregator(buckets=(0.1, 1))
+        self.record(aggregator, 0.5)
+
+        text = aggregator.to_prometheus()
+
+        self.assertIn(
+            'sharing_configs_api_calls_total{operation="get_files",method="GET",'
+            'url="config/{label}/folder/{folder}/files/",status="200"} 1\n',
+            text,
+        )
+        self.assertIn(
+            "# TYPE sharing_configs_api_call_duration_seconds histogram", text
+        )
+        self.assertIn(
+            'sharing_configs_api_call_duration_seconds_bucket{operation="get_files",'
+            'le="0.1"} 0\n',
+            text,
+        )
+        self.assertIn(
+            'sharing_configs_api_call_duration_seconds_bucket{operation="get_files",'
+            'le="+Inf"} 1\n',
+            text,
+        )
+        self.assertIn(
+            'sharing_configs_api_request_bytes_total{operation="get_files"} 10\n', text
+        )
+
+
+class TestMetricsView(StandInApiTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_calls_exposed(self):
+        SharingConfigsClient().get_folders(permission=None)
+        self.client.force_login(StaffUserFactory())
+
+        resp = self.client.get(reverse("sharing_configs:metrics"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertContains(
+            resp,
+            'sharing_configs_api_calls_total{operation="get_folders",method="GET",'
+            'url="config/{label}/folder/",status="200"} 1',
+        )
+
+    def test_anonymous_forbidden(self):
+        resp = self.client.get(reverse("sharing_configs:metrics"))
+
+        self.assertEqual(resp.status_code, 403)
+
+    def test_not_staff_forbidden(self):
+        self.client.force_login(UserFactory())
+
+        resp = self.client.get(reverse("sharing_configs:metrics"))
+
+        self.assertEqual(resp.status_code, 403)
+
+    @override_settings(SHARING_CONFIGS_METRICS_TOKEN="secret")
+    def test_token(self):
+        url = reverse("sharing_configs:metrics")
+
+        resp = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        wrong = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(wrong.status_code, 403)
+
+    @override_settings(SHARING_CONFIGS_COLLECT_METRICS=False)
+    def test_collection_disabled(self):
+        SharingConfigsClient().get_folders(permission=None)
+
+        self.assertEqual(metrics.snapshot()["calls"], {})
@@ -1,5 +1,5 @@
 import json
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 from urllib.parse import urljoin
 
 from django.contrib.auth import get_user_model
@@ -87,13 +87,13 @@ class TestExportMixinPatch(TestCase):
         "sharing_configs.client_util.SharingConfigsClient.get_folders",
         return_value=get_mock_folders(mode="export"),
     )
-    @patch("sharing_configs.client_util.requests.post")
+    @patch("sharing_configs.client_util.requests.Session.post")
     def test_export_valid_form(self, mock_export_data, mocked_folders):
         """if export form valid response success and re-direct to the same export url;
         (mock)get_folders method also called by re-direct to supply template dropdown-menu with folders"""
         data = {"folder": "folder_one", "file_name": "zoo.txt"}
         mock_export_data.raise_for_status = 200
-        mock_export_data.json.return_value = {
+        mock_export_data.return_value.json.return_value = {
             "download_url": "http://example.com",
             "filename": "string",
         }
@@ -121,7 +121,13 @@ class TestExportMixinPatch(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
-            json={
+            timeout=self.client_api.timeout,
+            data=ANY,
+        )
+        payload = mock_export_data.call_args.kwargs["data"]
+        self.assertEqual(
+            json.loads(b"".join(payload)),
+            {
                 f"overwrite": False,
                 "content": content,
                 "author": str(self.user),
@@ -151,7 +157,7 @@ class TestExportMixinPatch(TestCase):
         get_mock_data.assert_called_with("write")
         self.assertEqual(get_mock_data.call_count, 1)
 
-    @patch("sharing_configs.client_util.requests.get")
+    @patch("sharing_configs.client_util.requests.Session.get")
     def test_query_params_requesting_list_folders_for_export(self, mock_get):
         """permissions in query params present to get list of available folders in export"""
         mock_get.return_value.status_code = 200
@@ -169,6 +175,7 @@ class TestExportMixinPatch(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
+            timeout=self.client_api.timeout,
             params={"permission": "write"},
         )
 
@@ -198,7 +205,7 @@ class TestExportMixinPatch(TestCase):
         return_value=get_mock_folders(mode="export"),
     )
     @patch(
-        "sharing_configs.client_util.requests.post",
+        "sharing_configs.client_util.requests.Session.post",
         side_effect=requests.exceptions.ConnectionError,
     )
     def test_partial_network_problem_export(self, mock_export_data, mocked_folders):
@@ -227,7 +234,13 @@ class TestExportMixinPatch(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
-            json={
+            timeout=self.client_api.timeout,
+            data=ANY,
+        )
+        payload = mock_export_data.call_args.kwargs["data"]
+        self.assertEqual(
+            json.loads(b"".join(payload)),
+            {
                 f"overwrite": False,
                 "content": content,
                 "author": str(self.user),
@@ -244,7 +257,7 @@ class TestExportMixinPatch(TestCase):
         side_effect=requests.exceptions.ConnectionError,
     )
     @patch(
-        "sharing_configs.client_util.requests.get",
+        "sharing_configs.client_util.requests.Session.get",
         side_effect=requests.exceptions.ConnectionError,
     )
     def test_total_network_problem_export(self, mocked_folders, mock_export_data):
@@ -273,6 +286,7 @@ class TestExportMixinPatch(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
+            timeout=self.client_api.timeout,
             params={"permission": "write"},
         )
         self.assertTrue(resp.status_code, 200)
@@ -303,7 +317,7 @@ class TestExportMixinPatch(TestCase):
         )
         self.assertEqual(
             folder_field.choices[2],
-            ("sub-folder-1.1", "sub-folder-1.1"),
+            ("folder_one/sub-folder-1.1", "folder_one/sub-folder-1.1"),
         )
         self.assertEqual(
             folder_field.choices[3],
@@ -3,6 +3,7 @@ from unittest.mock import patch
 from urllib.parse import urljoin
 
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.test import TestCase
 from django.urls import reverse
 
@@ -88,7 +89,7 @@ class TestImportMixinPatchFuncs(TestCase):
         data = resp_data.get("resp")
 
         self.assertEqual(resp.status_code, 200)
-        self.assertEqual(data, ["folder_one.json", "folder_one.html"])
+        self.assertEqual(data, ["folder_one.html", "folder_one.json"])
         self.assertEqual(2, len(data))
         get_mock_data.assert_called_once_with("folder_one")
 
@@ -117,21 +118,23 @@ class TestImportMixinPatchFuncs(TestCase):
         return_value=get_mock_folders("import"),
     )
     @patch(
-        "sharing_configs.client_util.SharingConfigsClient.import_data",
-        return_value=b'{"accent": "#f8f8f8","name": "spring", "primary": "#8d979c", \
+        "sharing_configs.client_util.SharingConfigsClient.import_file",
+        return_value=ContentFile(
+            b'{"accent": "#f8f8f8","name": "spring", "primary": "#8d979c", \
         "primary_fg": "#1a2b3c", "secondary": "#315980"}',
+            name="zoo.txt",
+        ),
     )
     def test_import_valid_form(self, mock_import, get_mock_data_folders):
         """if import form is valid -> success response and redirect to the same import url;
-        (mock)get_folders method also called by re-direct to supply template dropdown-menu with folders
+        the re-direct gets the dropdown-menu folders from cache
         """
         url = reverse("admin:testapp_theme_sc_import")
         data = {"folder": "folder_one", "file_name": "zoo.txt"}
         resp = self.client.post(url, data=data)
         self.assertEqual(resp.status_code, 302)
         self.assertRedirects(resp, url, status_code=302, target_status_code=200)
-        get_mock_data_folders.assert_called_with(None)
-        self.assertEqual(get_mock_data_folders.call_count, 2)
+        get_mock_data_folders.assert_called_once_with(None)
 
 
 class TestImportMixinRequestsMock(TestCase):
@@ -217,7 +220,7 @@ class TestImportMixinRequestsMock(TestCase):
         self.assertTrue(mock_get.called)
         self.assertEqual(resp, return_value)
 
-    @patch("sharing_configs.client_util.requests.get")
+    @patch("sharing_configs.client_util.requests.Session.get")
     def test_query_params_list_folders_for_import(self, mock_get):
         """no permissions in query params to get list of available folders in import"""
         mock_get.return_value.status_code = 200
@@ -235,6 +238,7 @@ class TestImportMixinRequestsMock(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
+            timeout=self.client_api.timeout,
         )
 
     @patch(
@@ -242,7 +246,7 @@ class TestImportMixinRequestsMock(TestCase):
         return_value=get_mock_folders(mode="import"),
     )
     @patch(
-        "sharing_configs.client_util.requests.get",
+        "sharing_configs.client_util.requests.Session.get",
         side_effect=requests.exceptions.ConnectionError,
     )
     def test_partial_network_problem_import(self, mock_import_data, mocked_folders):
@@ -263,19 +267,22 @@ class TestImportMixinRequestsMock(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
+            timeout=self.client_api.timeout,
+            stream=True,
         )
 
     @patch(
-        "sharing_configs.client_util.SharingConfigsClient.import_data",
+        "sharing_configs.client_util.SharingConfigsClient.import_file",
         side_effect=requests.exceptions.ConnectionError,
     )
     @patch(
-        "sharing_configs.client_util.requests.get",
+        "sharing_configs.client_util.requests.Session.get",
         side_effect=requests.exceptions.ConnectionError,
     )
     def test_total_network_problem_import(self, mocked_folders, mock_import_data):
         """if connection problem occures not only during import data but also during fetching folders
-        a generic error message(error,'no folders_available') displayed on import template"""
+        a generic error message(error,'no folders_available') displayed on import template
+        """
         data = {"folder": "folder_one", "file_name": "zoo.txt"}
         url = reverse("admin:testapp_theme_sc_import")
         url_list_folders = self.client_api.get_list_folders_url()
@@ -296,6 +303,7 @@ class TestImportMixinRequestsMock(TestCase):
                 "content-type": "application/json",
                 "authorization": f"Token {self.config_object.api_key}",
             },
+            timeout=self.client_api.timeout,
         )
 
 
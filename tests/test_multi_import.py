@@ -0,0 +1,89 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from testapp.models import Configuration, Theme
+
+from .factories import StaffUserFactory, ThemeFactory
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+def theme_file(name: str) -> bytes:
+    theme = {
+        "name": name,
+        "primary": "#8d979c",
+        "secondary": "#315980",
+        "accent": "#f8f8f8",
+        "primary_fg": "#1a2b3c",
+    }
+    return json.dumps(theme).encode("utf-8")
+
+
+class TestMultiFileImport(StandInApiTestMixin, TestCase):
+    """Test importing several files or a whole folder at once"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {f"theme-{i}.json": theme_file(f"theme-{i}") for i in range(4)}
+        return StandInApi(files={"folder_one": files})
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = StaffUserFactory()
+        self.client.force_login(self.user)
+        self.configuration = Configuration.objects.create(theme=ThemeFactory())
+        self.url = reverse("admin:testapp_theme_sc_import")
+
+    def test_import_selected_files(self):
+        data = {"folder": "folder_one", "file_name": ["theme-0.json", "theme-2.json"]}
+
+        resp = self.client.post(self.url, data=data)
+
+        self.assertRedirects(resp, self.url)
+        self.assertEqual(
+            set(Theme.objects.values_list("name", flat=True)),
+            {str(self.configuration.theme), "theme-0", "theme-2"},
+        )
+        downloads = [r["path"] for r in self.api.requests_to("GET")]
+        self.assertEqual(len([path for path in downloads if ".json" in path]), 2)
+
+    def test_import_whole_folder(self):
+        data = {"folder": "folder_one", "import_folder": "on"}
+
+        resp = self.client.post(self.url, data=data)
+
+        self.assertRedirects(resp, self.url)
+        for i in range(4):
+            self.assertTrue(Theme.objects.filter(name=f"theme-{i}").exists())
+
+    def test_failing_file_rolled_back_separately(self):
+        self.api.files["folder_one"]["broken.json"] = b'{"name": "broken", "foo": 1}'
+        data = {"folder": "folder_one", "file_name": ["broken.json", "theme-1.json"]}
+
+        resp = self.client.post(self.url, data=data, follow=True)
+
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertEqual(messages[0], "The import of broken.json failed.")
+        self.assertEqual(
+            messages[1], "The item theme-1 has been imported successfully!"
+        )
+        self.assertFalse(Theme.objects.filter(name="broken").exists())
+        self.assertTrue(Theme.objects.filter(name="theme-1").exists())
+
+    def test_missing_file_reported(self):
+        data = {"folder": "folder_one", "file_name": ["missing.json", "theme-3.json"]}
+
+        resp = self.client.post(self.url, data=data, follow=True)
+
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertIn("The import of missing.json failed.", messages)
+        self.assertTrue(Theme.objects.filter(name="theme-3").exists())
+
+    def test_all_files_failed(self):
+        data = {"folder": "folder_one", "file_name": ["missing.json"]}
+
+        resp = self.client.post(self.url, data=data)
+
+        self.assertEqual(resp.status_code, 200)
+        messages = [str(msg) for msg in resp.context["messages"]]
+        self.assertEqual(messages, ["The import of the selected item failed."])
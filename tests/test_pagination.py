@@ -0,0 +1,123 @@
+import time
+from itertools import islice
+
+from django.test import TestCase
+
+import requests_mock
+
+from sharing_configs.client_util import AsyncSharingConfigsClient, SharingConfigsClient
+from sharing_configs.utils import (
+    aget_imported_files_choices,
+    get_imported_files_choices,
+    get_imported_folders_choices,
+)
+
+from .mock_data_api.server import StandInApi, StandInApiTestMixin
+
+
+class TestPagination(StandInApiTestMixin, TestCase):
+    """Test following the pages of the folder and file listings"""
+
+    def get_stand_in_api(self) -> StandInApi:
+        files = {f"file-{i}.json": b"{}" for i in range(7)}
+        api = StandInApi(files={"folder_one": files})
+        api.page_size = 3
+        return api
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client_api = SharingConfigsClient()
+
+    def test_iter_files(self):
+        filenames = [
+            item["filename"] for item in self.client_api.iter_files("folder_one")
+        ]
+
+        self.assertEqual(filenames, [f"file-{i}.json" for i in range(7)])
+        self.assertEqual(len(self.api.requests_to("GET")), 3)
+
+    def test_iter_files_lazy(self):
+        files = self.client_api.iter_files("folder_one")
+
+        self.assertEqual(self.api.requests, [])
+        items = list(islice(files, 2))
+        files.close()
+
+        self.assertEqual(len(items), 2)
+        # only the second page may have been prefetched
+        time.sleep(0.2)
+        paths = [request["path"] for request in self.api.requests_to("GET")]
+        self.assertLessEqual(len(paths), 2)
+        self.assertFalse(any("offset=6" in path for path in paths))
+
+    def test_iter_folders(self):
+        self.api.page_size = 1
+
+        folders = list(self.client_api.iter_folders(None))
+
+        self.assertEqual(folders, self.api.folders)
+        self.assertEqual(len(self.api.requests_to("GET")), len(self.api.folders))
+
+    def test_choices_of_all_pages(self):
+        self.api.page_size = 1
+
+        self.assertEqual(
+            get_imported_files_choices("folder_one"),
+            [f"file-{i}.json" for i in range(7)],
+        )
+        self.assertIn(("folder_two", "folder_two"), get_imported_folders_choices(None))
+
+    @requests_mock.Mocker()
+    def test_next_page_outside_api_not_followed(self, m):
+        url = self.client_api.get_folder_files_url("folder_one")
+        m.get(
+            url,
+            json={
+                "count": 4,
+                "next": "http://api.example.org/files/?page=2",
+                "results": [{"filename": "a.json"}, {"filename": "b.json"}],
+            },
+        )
+
+        with self.assertLogs("sharing_configs.client_util", "WARNING"):
+            files = list(self.client_api.iter_files("folder_one"))
+
+        self.assertEqual(len(files), 2)
+        self.assertEqual(m.call_count, 1)
+
+    def test_next_page_on_other_host_not_followed(self):
+        self.config_object.api_endpoint = "https://api.example.com"
+        client = SharingConfigsClient(self.config_object)
+
+        for next_url in [
+            "https://api.example.com.evil.net/config/label/folder/?page=2",
+            "https://api.example.com@evil.net/config/label/folder/?page=2",
+            "http://api.example.com/config/label/folder/?page=2",
+            "https://api.example.com:8443/config/label/folder/?page=2",
+        ]:
+            with self.subTest(next_url=next_url):
+                with self.assertLogs("sharing_configs.client_util", "WARNING"):
+                    self.assertIsNone(client.get_next_url({"next": next_url}))
+
+    def test_next_page_below_endpoint_path_followed(self):
+        self.config_object.api_endpoint = "https://API.example.com/api/v1"
+        client = SharingConfigsClient(self.config_object)
+
+        followed = client.get_next_url(
+            {"next": "https://api.example.com:443/api/v1/config/?page=2"}
+        )
+        with self.assertLogs("sharing_configs.client_util", "WARNING"):
+            sibling = client.get_next_url(
+                {"next": "https://api.example.com/api/v10/config/?page=2"}
+            )
+
+        self.assertEqual(followed, "https://api.example.com:443/api/v1/config/?page=2")
+        self.assertIsNone(sibling)
+
+    async def test_async_iter_files(self):
+        client = AsyncSharingConfigsClient(self.config_object)
+
+        filenames = await aget_imported_files_choices(client, "folder_one")
+
+        self.assertEqual(filenames, [f"file-{i}.json" for i in range(7)])
+        self.assertEqual(len(self.api.requests_to("GET")), 3)